@@ -104,6 +104,19 @@ class CustomEncoder(JSONEncoder):
         return json.loads(self.encode(obj))
 
 
+class CanonicalEncoder(CustomEncoder):
+    """
+    Encoder for fingerprints of meta, represents
+    the objects that cannot be written by their ``str``
+    """
+
+    def default(self, obj: Any) -> Any:
+        try:
+            return super().default(obj)
+        except TypeError:
+            return str(obj)
+
+
 class BaseHandler:
     def read(self, path: str) -> Meta:
         raise NotImplementedError()
@@ -14,12 +14,17 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import functools
+import json
 import os
 import re
 import subprocess
 import sys
-from typing import Any, Dict, List, Optional, Tuple, Union
+import types
+from hashlib import blake2b
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
+import numpy as np
 from coolname import generate
 
 from . import Meta
@@ -199,6 +204,293 @@ def skeleton(meta: Meta, keys: Optional[List[Any]] = None) -> List[List[Dict[Any
     return skel
 
 
+def _code_parts(code: Any) -> List[Any]:
+    consts = [_code_parts(c) if hasattr(c, "co_code") else c for c in code.co_consts]
+    consts = ["..." if c is Ellipsis else c for c in consts]
+    return [code.co_code, consts, list(code.co_names)]
+
+
+def _function_parts(func: Any, seen: Set[int]) -> List[Any]:
+    name = getattr(func, "__qualname__", getattr(func, "__name__", None))
+    parts = [getattr(func, "__module__", None), name]
+    if id(func) in seen:
+        # Recursive references
+        return parts
+    seen = seen | {id(func)}
+
+    if isinstance(func, functools.partial):
+        return parts + [
+            _function_parts(func.func, seen),
+            [_value_parts(arg, seen) for arg in func.args],
+            {key: _value_parts(value, seen) for key, value in func.keywords.items()},
+        ]
+
+    code = getattr(func, "__code__", None)
+    if code is None:
+        if isinstance(func, (type, types.BuiltinFunctionType)) or name is None:
+            # Builtins and classes are identified by their names
+            return parts
+        if callable(func) and type(func).__module__ == "numpy":
+            # numpy ufuncs
+            return parts
+        raise TypeError(f"Cannot identify the callable object of type {type(func)}")
+
+    closure = []
+    for cell in func.__closure__ or ():
+        try:
+            closure.append(_value_parts(cell.cell_contents, seen))
+        except ValueError:
+            # Empty cell
+            closure.append("<empty>")
+
+    defaults = func.__defaults__ or ()
+    kwdefaults = func.__kwdefaults__ or {}
+    return parts + [
+        _code_parts(code),
+        [_value_parts(value, seen) for value in defaults],
+        {key: _value_parts(value, seen) for key, value in kwdefaults.items()},
+        closure,
+    ]
+
+
+def _value_parts(value: Any, seen: Set[int]) -> Any:
+    if isinstance(value, (types.FunctionType, functools.partial, types.BuiltinFunctionType)):
+        return ["<function>", _function_parts(value, seen)]
+    return value
+
+
+def function_key(func: Callable[..., Any]) -> str:
+    """
+    Identifies a function by its name, code, default arguments and values
+    captured by closures. The values are hashed with ``cascade.meta.hash_object``,
+    functions that are captured are identified the same way.
+
+    Parameters
+    ----------
+    func: Callable[..., Any]
+        A function, ``functools.partial`` of it or a builtin
+
+    Returns
+    -------
+    str
+        Hex digest that does not change between runs
+
+    Raises
+    ------
+    TypeError
+        If the function captures a value that cannot be hashed
+        or the callable cannot be identified
+    """
+    from ..meta.hashes import hash_object
+
+    return hash_object(_function_parts(func, set()))
+
+
+def splitmix64(x: np.ndarray) -> np.ndarray:
+    """
+    SplitMix64 finalizer - mixes each 64-bit word so that
+    a change of any input bit changes about half of output bits
+
+    Parameters
+    ----------
+    x: np.ndarray
+        Array of ``np.uint64``, operations wrap around modulo 2 ** 64
+
+    Returns
+    -------
+    np.ndarray
+        Mixed words of the same shape
+    """
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _string_keys(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {
+            key if isinstance(key, str) else json.dumps(key): _string_keys(value)
+            for key, value in obj.items()
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_string_keys(item) for item in obj]
+    return obj
+
+
+def canonical_json(obj: Any) -> str:
+    """
+    Serializes meta into JSON with sorted keys and without spaces, the same
+    meta gives the same string regardless of the order of keys. Values
+    are converted the same way as when meta is written, so meta has
+    the same serialization after being written and read back.
+    Objects that cannot be written are represented by ``str``.
+    """
+    from .meta_handler import CanonicalEncoder
+
+    kwargs = dict(sort_keys=True, cls=CanonicalEncoder, separators=(",", ":"), ensure_ascii=False)
+    try:
+        return json.dumps(obj, **kwargs)
+    except TypeError:
+        # Keys of different types cannot be sorted, JSON turns them into strings anyway
+        return json.dumps(_string_keys(obj), **kwargs)
+
+
+# Is mixed into fingerprints and bumped when the way they are computed changes,
+# so that keys made with previous versions never match
+FINGERPRINT_VERSION = 2
+
+
+def _is_block(obj: Any) -> bool:
+    return isinstance(obj, dict) and "name" in obj
+
+
+def _is_pipeline(obj: Any) -> bool:
+    return isinstance(obj, (list, tuple)) and all(
+        _is_block(item) or _is_pipeline(item) for item in obj
+    )
+
+
+class _Fingerprinter:
+    """
+    Computes the fingerprints of the structure and of the full meta
+    in one walk over the blocks of the pipeline.
+
+    Only blocks - dicts with the name - and lists of them are visited, everything
+    else in a block is serialized by ``canonical_json`` in one call.
+    The digests of visited nodes are memoized, so the same meta
+    referenced from several places is hashed once.
+    """
+
+    _leaf_skel = blake2b(b"V", digest_size=16).digest()
+
+    def __init__(self, keys: List[Any]) -> None:
+        self._keys = keys
+        self._memo: Dict[int, Tuple[bytes, bytes]] = {}
+
+    def walk(self, obj: Any) -> Tuple[bytes, bytes]:
+        memo = self._memo.get(id(obj))
+        if memo is not None:
+            return memo
+
+        if _is_block(obj):
+            result = self._block(obj)
+        elif _is_pipeline(obj):
+            result = self._pipeline(obj)
+        else:
+            full = blake2b(b"V" + canonical_json(obj).encode("utf-8"), digest_size=16)
+            return self._leaf_skel, full.digest()
+
+        self._memo[id(obj)] = result
+        return result
+
+    def _pipeline(self, items: Any) -> Tuple[bytes, bytes]:
+        skel = blake2b(b"L%d;" % len(items), digest_size=16)
+        full = blake2b(b"L%d;" % len(items), digest_size=16)
+        for item in items:
+            item_skel, item_full = self.walk(item)
+            skel.update(item_skel)
+            full.update(item_full)
+        return skel.digest(), full.digest()
+
+    def _block(self, block: Dict[Any, Any]) -> Tuple[bytes, bytes]:
+        nested = sorted(
+            (json.dumps(key), key)
+            for key in self._keys
+            if key in block and (_is_block(block[key]) or _is_pipeline(block[key]))
+        )
+        nested_keys = {key for _, key in nested}
+        payload = {key: value for key, value in block.items() if key not in nested_keys}
+
+        name = canonical_json(block["name"]).encode("utf-8")
+        skel = blake2b(b"D" + name, digest_size=16)
+        full = blake2b(b"D" + canonical_json(payload).encode("utf-8"), digest_size=16)
+        for key_str, key in nested:
+            key_skel, key_full = self.walk(block[key])
+            skel.update(key_str.encode("utf-8") + key_skel)
+            full.update(key_str.encode("utf-8") + key_full)
+        return skel.digest(), full.digest()
+
+
+def _root_digest(digest: bytes) -> str:
+    return blake2b(b"%d;" % FINGERPRINT_VERSION + digest, digest_size=16).hexdigest()
+
+
+def meta_fingerprints(meta: Meta, keys: Optional[List[Any]] = None) -> Tuple[str, str]:
+    """
+    Computes the fingerprints of the structure and of the full meta
+    of the pipeline in one pass.
+
+    The structure fingerprint depends only on the names of blocks and
+    on how they are nested, like ``skeleton``. The full fingerprint
+    depends on all values. Both do not depend on the order of keys in dicts
+    and do not change after meta is written and read back.
+
+    Parameters
+    ----------
+    meta: Meta
+        Meta of the pipeline
+    keys: List[Any], optional
+        Additional keys in meta where to search for previous dataset's meta,
+        see ``skeleton``
+
+    Returns
+    -------
+    Tuple[str, str]
+        Hex digests of the structure and of the full meta
+    """
+    keys = default_keys + list(keys or [])
+    skel, full = _Fingerprinter(keys).walk(meta)
+    return _root_digest(skel), _root_digest(full)
+
+
+def meta_hash(meta: Meta) -> str:
+    """
+    Returns the hash of the full meta of the pipeline.
+    Identical pipelines with identical meta have the same hash.
+
+    Parameters
+    ----------
+    meta: Meta
+        Meta of the pipeline
+
+    Returns
+    -------
+    str
+        Hex digest of the hash
+
+    See also
+    --------
+    cascade.base.utils.meta_fingerprints
+    """
+    return meta_fingerprints(meta)[1]
+
+
+def is_reproducible(meta: Meta) -> bool:
+    """
+    Checks that no block in the meta has a seed that was chosen
+    randomly - marked with ``"fixed_seed": False``. The order or the items
+    of such pipelines are different on each run, so the data
+    saved under their ``meta_hash`` cannot be reused
+
+    Parameters
+    ----------
+    meta: Meta
+        Meta of the pipeline
+
+    Returns
+    -------
+    bool
+        False if some block was seeded randomly
+    """
+    if isinstance(meta, dict):
+        if meta.get("fixed_seed") is False:
+            return False
+        return all(is_reproducible(value) for value in meta.values())
+    if isinstance(meta, (list, tuple)):
+        return all(is_reproducible(item) for item in meta)
+    return True
+
+
 def migrate_repo_v0_13(path: str) -> None:
     """
     Changes format of meta data files written in previous
@@ -21,23 +21,34 @@ limitations under the License.
 from typing import Union
 
 from .apply_modifier import ApplyModifier
+from .async_dataset import (AsyncAdapter, AsyncDataLoader, AsyncDataset,
+                            AsyncLimiter, AsyncModifier)
 from .bruteforce_cacher import BruteforceCacher
 from .composer import Composer
 from .concatenator import Concatenator
 from .cyclic_sampler import CyclicSampler
 from .data_card import Assessor, DataCard, LabelingInfo
+from .dataloader import DataLoader
 from .dataset import (BaseDataset, Dataset, IteratorDataset, IteratorWrapper,
                       SizedDataset, T, Wrapper)
 from .filter import Filter, IteratorFilter
 from .folder_dataset import FolderDataset
 from .functions import dataset, modifier
-from .modifier import BaseModifier, IteratorModifier, Modifier, Sampler
+from .mmap_dataset import MmapArrayDataset
+from .modifier import (BaseModifier, IndexSampler, IteratorModifier, Modifier,
+                       Sampler)
 from .pickler import Pickler
 from .random_sampler import RandomSampler
 from .range_sampler import RangeSampler
 from .schema import SchemaModifier
 from .sequential_cacher import SequentialCacher
+from .shard import IteratorShard, ShardSampler, shard
+from .shard_dataset import ShardDataset, ShardWriter
 from .simple_dataloader import SimpleDataloader
+from .streams import (IteratorBatch, IteratorInterleave, IteratorMap,
+                      IteratorPrefetch, IteratorShuffle, IteratorSlice, ibatch,
+                      ifilter, iinterleave, imap, iprefetch, iskip, ishuffle,
+                      itake)
 from .utils import split
 from .validation import ValidationError, validate_in
 from .version_assigner import VersionAssigner, version
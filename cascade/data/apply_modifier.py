@@ -14,12 +14,14 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-import random
-from typing import Any, Callable, Iterator, Optional
+from typing import Any, Callable, Iterator, List, Optional, Sequence
 
-from .dataset import T
+import numpy as np
+
+from ..base import Meta
+from .dataset import T, batch_to_list, fetch_batch
 from .modifier import Modifier
-from .utils import DatasetOrIterator
+from .utils import DatasetOrIterator, uniform_by_index
 
 
 class ApplyModifier(Modifier[T]):
@@ -36,6 +38,7 @@ class ApplyModifier(Modifier[T]):
         p: Optional[float] = None,
         seed: Optional[int] = None,
         *args: Any,
+        batched: bool = False,
         **kwargs: Any,
     ) -> None:
         """
@@ -49,7 +52,15 @@ class ApplyModifier(Modifier[T]):
         p: Optional[float], by default None
             The probability [0, 1] with which to apply `func`
         seed: Optional[int], by default None
-            Random seed is used when p is not None
+            Random seed is used when p is not None. Whether ``func`` is applied
+            is decided for each index by the seed, the epoch and the index only,
+            so the results do not depend on the order of access or on
+            the number of workers. If None, a random seed is chosen.
+            The seed and the epoch are recorded in the meta when p is not None
+        batched: bool, by default False
+            Whether ``func`` is vectorized - accepts a batch of items
+            as returned by ``get_batch`` and returns a batch of results
+            of the same length. Single items are passed as batches of one.
 
         Examples
         --------
@@ -60,31 +71,106 @@ class ApplyModifier(Modifier[T]):
         Now function will only be applied when items are retrieved
 
         >>> assert [item for item in ds] == [0, 1, 4, 9, 16]
+
+        Vectorized functions can process whole batches
+
+        >>> import numpy as np
+        >>> ds = cdd.Wrapper(np.arange(5))
+        >>> ds = cdd.ApplyModifier(ds, np.sqrt, batched=True)
+        >>> ds.get_batch([1, 4])
+        array([1., 2.])
+
+        With ``p`` the same indices are selected on each run with the same seed.
+        Set the epoch to get a different selection each epoch
+
+        >>> ds = cdd.Wrapper([0, 1, 2, 3, 4])
+        >>> ds = cdd.ApplyModifier(ds, lambda x: -x, p=0.5, seed=0)
+        >>> ds.set_epoch(1)
         """
         super().__init__(dataset, *args, **kwargs)
         self._func = func
         self._p = p
-        if seed is not None:
-            random.seed(seed)
+        self._batched = batched
+        self._fixed_seed = seed is not None
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1, np.uint64)[0])
+        self._seed = seed
+        self._epoch = 0
 
-    def __getitem__(self, index: int) -> Any:
-        item = self._dataset[index]
+    def set_epoch(self, epoch: int) -> None:
+        """
+        Sets the epoch number that is mixed into random decisions
+        of applying ``func`` with probability ``p`` and passes it
+        to the previous datasets that have ``set_epoch``
+        """
+        self._epoch = epoch
+        set_epoch = getattr(self._dataset, "set_epoch", None)
+        if set_epoch is not None:
+            set_epoch(epoch)
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
         if self._p is not None:
-            rnd = random.random()
-            if rnd > self._p:
-                return item
-            else:
-                return self._func(item)
-        else:
+            meta[0]["p"] = self._p
+            meta[0]["seed"] = self._seed
+            meta[0]["fixed_seed"] = self._fixed_seed
+            meta[0]["epoch"] = self._epoch
+        return meta
+
+    def _selected(self, indices: Sequence[int]) -> np.ndarray:
+        # Boolean mask of indices on which func is applied
+        return uniform_by_index((self._seed, self._epoch), indices) < self._p
+
+    def _apply(self, item: T) -> Any:
+        if not self._batched:
             return self._func(item)
+        if isinstance(item, (np.ndarray, np.generic)):
+            batch = np.asarray(item)[np.newaxis]
+        else:
+            batch = [item]
+        return batch_to_list(self._func(batch))[0]
+
+    def __getitem__(self, index: int) -> Any:
+        if self._p is not None and not self._selected([index])[0]:
+            return self._dataset[index]
+
+        if self._batched:
+            # Batch of one of the same type as get_batch returns
+            batch = fetch_batch(self._dataset, [index])
+            return batch_to_list(self._func(batch))[0]
+        return self._func(self._dataset[index])
+
+    def get_batch(self, indices: Sequence[int]) -> Any:
+        batch = fetch_batch(self._dataset, indices)
+        if self._p is None:
+            if self._batched:
+                return self._func(batch)
+            return [self._func(item) for item in batch_to_list(batch)]
+
+        items = batch_to_list(batch)
+        selected = np.flatnonzero(self._selected(indices)).tolist()
+        if not self._batched:
+            for k in selected:
+                items[k] = self._func(items[k])
+            return items
+
+        if selected:
+            results = batch_to_list(self._func(self._take(batch, items, selected)))
+            for k, result in zip(selected, results):
+                items[k] = result
+        return items
+
+    @staticmethod
+    def _take(batch: Any, items: List[Any], selected: List[int]) -> Any:
+        if isinstance(batch, np.ndarray):
+            return batch[selected]
+        if hasattr(batch, "iloc"):
+            return batch.iloc[selected]
+        return [items[k] for k in selected]
 
     def __iter__(self) -> Iterator[T]:
-        for item in self._dataset:
-            if self._p is not None:
-                rnd = random.random()
-                if rnd > self._p:
-                    yield item
-                else:
-                    yield self._func(item)
+        for index, item in enumerate(self._dataset):
+            if self._p is not None and not self._selected([index])[0]:
+                yield item
             else:
-                yield self._func(item)
+                yield self._apply(item)
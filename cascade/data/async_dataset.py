@@ -0,0 +1,288 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import weakref
+from abc import abstractmethod
+from collections import deque
+from concurrent.futures import Executor
+from typing import (Any, AsyncIterator, List, MutableMapping, Optional,
+                    Sequence, Sized)
+
+from ..base import Meta
+from .dataset import BaseDataset, Dataset, T
+
+
+class AsyncDataset(BaseDataset[T], Sized):
+    """
+    An abstract class to represent a dataset which items
+    are read by coroutines. Useful for I/O-bound sources where
+    many reads can wait at once.
+
+    ``aget`` and ``__len__`` should be defined in subclasses.
+
+    See also
+    --------
+    cascade.data.AsyncAdapter
+    cascade.data.AsyncDataLoader
+    """
+
+    @abstractmethod
+    async def aget(self, index: int) -> T: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    async def aget_batch(self, indices: Sequence[int]) -> List[T]:
+        """
+        Reads items on given indices concurrently
+
+        Parameters
+        ----------
+        indices : Sequence[int]
+            Indices of the items
+
+        Returns
+        -------
+        List[T]
+            Items in the order of indices
+        """
+        return list(await asyncio.gather(*[self.aget(i) for i in indices]))
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        for index in range(len(self)):
+            yield await self.aget(index)
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["len"] = len(self)
+        return meta
+
+
+class AsyncModifier(AsyncDataset[T]):
+    """
+    Modifier for async datasets. Reads items from
+    the previous dataset in the ``_dataset`` field.
+
+    Returns items as is if ``aget`` is not overridden
+
+    See also
+    --------
+    cascade.data.Modifier
+    """
+
+    def __init__(self, dataset: AsyncDataset[T], *args: Any, **kwargs: Any) -> None:
+        """
+        Parameters
+        ----------
+        dataset: AsyncDataset[T]
+            A dataset to modify
+        """
+        self._dataset = dataset
+        super().__init__(*args, **kwargs)
+
+    async def aget(self, index: int) -> T:
+        return await self._dataset.aget(index)
+
+    def __len__(self) -> int:
+        return len(self._dataset)
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta += self._dataset.get_meta()
+        return meta
+
+    def from_meta(self, meta: Meta) -> None:
+        if isinstance(meta, list):
+            super().from_meta(meta[0])
+            if len(meta) > 1:
+                self._dataset.from_meta(meta[1:])
+        else:
+            super().from_meta(meta)
+
+
+class AsyncAdapter(AsyncModifier[T]):
+    """
+    Turns a usual Dataset into AsyncDataset.
+
+    If the dataset defines its own ``aget`` it is used,
+    otherwise ``__getitem__`` is called in a thread executor
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from cascade import data as cdd
+    >>> ds = cdd.AsyncAdapter(cdd.Wrapper([0, 1, 2]))
+    >>> asyncio.run(ds.aget_batch([2, 0]))
+    [2, 0]
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset[T],
+        *args: Any,
+        executor: Optional[Executor] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : Dataset[T]
+            A dataset to read from
+        executor : Optional[Executor], optional
+            The executor to run ``__getitem__`` in,
+            by default the default executor of the event loop
+        """
+        super().__init__(dataset, *args, **kwargs)
+        self._executor = executor
+
+    async def aget(self, index: int) -> T:
+        if hasattr(self._dataset, "aget"):
+            return await self._dataset.aget(index)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._dataset.__getitem__, index)
+
+
+class AsyncLimiter(AsyncModifier[T]):
+    """
+    Limits the number of concurrent reads from the previous dataset,
+    for example to respect the limits of the storage
+
+    Example
+    -------
+    >>> from cascade import data as cdd
+    >>> ds = cdd.AsyncAdapter(cdd.Wrapper([0, 1, 2]))
+    >>> ds = cdd.AsyncLimiter(ds, 2)
+    """
+
+    def __init__(
+        self, dataset: AsyncDataset[T], max_concurrency: int, *args: Any, **kwargs: Any
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : AsyncDataset[T]
+            A dataset to read from
+        max_concurrency : int
+            The maximum number of reads waiting at once
+
+        Raises
+        ------
+        ValueError
+            If ``max_concurrency`` is not positive
+        """
+        if max_concurrency <= 0:
+            raise ValueError(f"max_concurrency should be positive, got {max_concurrency}")
+        super().__init__(dataset, *args, **kwargs)
+        self._max_concurrency = max_concurrency
+        # Semaphores are bound to event loops in older Python versions
+        self._semaphores: MutableMapping[Any, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+    async def aget(self, index: int) -> T:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._semaphores[loop] = semaphore
+        async with semaphore:
+            return await self._dataset.aget(index)
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["max_concurrency"] = self._max_concurrency
+        return meta
+
+
+class AsyncDataLoader:
+    """
+    Reads batches from an async dataset keeping up to ``concurrency``
+    item reads in flight, also across the borders of batches.
+    Batches are delivered in order.
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from cascade import data as cdd
+    >>> async def read_all(dl):
+    ...     return [batch async for batch in dl]
+    ...
+    >>> dl = cdd.AsyncDataLoader(cdd.Wrapper([0, 1, 2]), batch_size=2, concurrency=4)
+    >>> asyncio.run(read_all(dl))
+    [[0, 1], [2]]
+    """
+
+    def __init__(
+        self,
+        data: BaseDataset[T],
+        batch_size: int = 1,
+        concurrency: int = 8,
+        drop_last: bool = False,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data : BaseDataset[T]
+            An async dataset. Usual datasets are wrapped in ``AsyncAdapter``
+        batch_size : int, optional
+            The number of items in a batch, by default 1
+        concurrency : int, optional
+            The maximum number of reads in flight, by default 8
+        drop_last : bool, optional
+            Whether to skip the last incomplete batch, by default False
+
+        Raises
+        ------
+        ValueError
+            If batch size or concurrency are not positive
+        """
+        if batch_size <= 0:
+            raise ValueError(f"Batch size should be positive, got {batch_size}")
+        if concurrency <= 0:
+            raise ValueError(f"Concurrency should be positive, got {concurrency}")
+        if not isinstance(data, AsyncDataset):
+            data = AsyncAdapter(data)
+        self.data = data
+        self._batch_size = batch_size
+        self._concurrency = concurrency
+        self._drop_last = drop_last
+
+    async def __aiter__(self) -> AsyncIterator[List[T]]:
+        pending: deque = deque()
+        batch: List[T] = []
+        stop = len(self) * self._batch_size
+        try:
+            for index in range(min(stop, len(self.data))):
+                if len(pending) >= self._concurrency:
+                    batch.append(await pending.popleft())
+                    if len(batch) == self._batch_size:
+                        yield batch
+                        batch = []
+                pending.append(asyncio.ensure_future(self.data.aget(index)))
+            while pending:
+                batch.append(await pending.popleft())
+                if len(batch) == self._batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def __len__(self) -> int:
+        if self._drop_last:
+            return len(self.data) // self._batch_size
+        return -(-len(self.data) // self._batch_size)
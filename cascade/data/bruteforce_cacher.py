@@ -14,12 +14,25 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Any
+import os
+import warnings
+from copy import deepcopy
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 
-from tqdm import tqdm, trange
+import numpy as np
+from tqdm import tqdm
+from typing_extensions import Literal
 
+from ..base import Meta
+from ..base.utils import is_reproducible, meta_hash
 from .dataset import BaseDataset, T
 from .modifier import Modifier
+from .parallel import Backend, chunk_indices, default_chunk_size, map_chunks
+from .storage import ArrayStorage, MemmapStorage, SharedMemoryStorage
+
+
+def _read_chunk(dataset: BaseDataset[T], chunk: Sequence[int]) -> List[T]:
+    return [dataset[i] for i in chunk]
 
 
 class BruteforceCacher(Modifier[T]):
@@ -27,6 +40,13 @@ class BruteforceCacher(Modifier[T]):
     Special modifier that calls all previous pipeline in __init__ loading everything
     in memory.
 
+    If all items are ``np.ndarray``s or tuples of them with the same shapes and
+    dtypes, they are packed into contiguous arrays and ``__getitem__``
+    returns views of them. This removes per-item object overhead.
+
+    When the data does not fit in memory it can be cached in memory-mapped
+    files on disk instead.
+
     Examples
     --------
     >>> from cascade import data as cdd
@@ -48,28 +68,249 @@ class BruteforceCacher(Modifier[T]):
     >>> ds = cdd.Pickler('ds')
     >>> ds = cdd.RandomSampler(ds, 1000)
 
+    Heavy pipelines can be loaded in parallel. Threads share
+    the pipeline, process workers need it to be picklable,
+    so they do not work with lambdas like the ones above
+
+    >>> ds = cdd.BruteforceCacher(ds, workers=8, backend="thread")
+
+    Large arrays can be cached on disk. Next time the cache will be
+    reopened without calling the pipeline if its meta did not change
+
+    >>> import numpy as np
+    >>> ds = cdd.Wrapper([np.zeros((256, 256)) for _ in range(100)])
+    >>> ds = cdd.BruteforceCacher(ds, storage="memmap", path="./cache")
+
+    To share one copy of the data between worker processes
+    it can be placed in shared memory. Workers attach to it
+    when the dataset is unpickled instead of copying the data.
+    The upstream pipeline is not pickled in this case, only its meta
+
+    >>> ds = cdd.BruteforceCacher(ds, storage="shared")
+    >>> # pass ds to worker processes
+    >>> ds.close()
+
     See also
     --------
     cascade.data.Pickler
     """
 
-    def __init__(self, dataset: BaseDataset[T], *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        dataset: BaseDataset[T],
+        *args: Any,
+        workers: Optional[int] = None,
+        backend: Backend = "thread",
+        chunk_size: Optional[int] = None,
+        pack: bool = True,
+        storage: Literal["memory", "memmap", "shared"] = "memory",
+        path: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
         """
-        Loads every item in dataset in internal list.
+        Loads every item in dataset in internal storage.
+
+        Parameters
+        ----------
+        dataset: BaseDataset[T]
+            A dataset to cache
+        workers: Optional[int], optional
+            The number of workers to load the items with, by default None -
+            loads in the calling thread. Is used only with datasets that
+            have ``__len__`` and ``__getitem__``
+        backend: Literal["thread", "process"], optional
+            The type of worker pool, by default "thread". Process workers
+            get a copy of the pipeline, so it should be picklable
+        chunk_size: Optional[int], optional
+            The number of items each worker loads in one task,
+            by default chosen depending on the number of workers
+        pack: bool, optional
+            Whether to pack the same-shape arrays into contiguous storage,
+            by default True. Is used only with ``storage="memory"``
+        storage: Literal["memory", "memmap", "shared"], optional
+            Where to keep the items, by default "memory".
+            ``"memmap"`` writes items into memory-mapped files in ``path``.
+            ``"shared"`` writes items into ``multiprocessing.shared_memory``
+            blocks that other processes attach to when the cacher is unpickled.
+            Both require items to be arrays or tuples with arrays of the same
+            shapes and dtypes as the first item. Non-array parts of tuples
+            are kept in memory and pickled.
+        path: Optional[str], optional
+            The folder for ``storage="memmap"``. If it already has the cache
+            of the pipeline with the same meta, the cache is reopened
+            without calling the pipeline. The meta includes the seeds and
+            epochs of random stages, if some stage has no seed,
+            the cache is not reopened.
+
+        Raises
+        ------
+        ValueError
+            If ``storage="memmap"`` and no path given or if items
+            do not have the same layout in memmap or shared storage
         """
         super().__init__(dataset, *args, **kwargs)
+        if storage not in ("memory", "memmap", "shared"):
+            raise ValueError(
+                f"Only memory, memmap or shared storages are supported, got: {storage}"
+            )
+        if storage == "memmap" and path is None:
+            raise ValueError("path is required for memmap storage")
+
+        self._pack = pack
+        self._storage = storage
+        self._path = os.path.abspath(path) if path is not None else None
+
+        if self._storage == "memmap":
+            meta = self._dataset.get_meta()
+            self._meta_hash = meta_hash(meta)
+            if is_reproducible(meta):
+                self._data = MemmapStorage.open(self._path, self._meta_hash)
+                if self._data is not None:
+                    return
+            else:
+                warnings.warn(
+                    "The memmap cache is rebuilt on each run, the previous pipeline "
+                    "has a randomly chosen seed, pass the seed to reuse the cache"
+                )
+
         # force calling all previous datasets in the init
         if hasattr(self._dataset, "__len__") and hasattr(self._dataset, "__getitem__"):
-            self._data = [self._dataset[i] for i in trange(len(self._dataset))]
+            length = len(self._dataset)
+            items = self._iter_sized(length, workers, backend, chunk_size)
         elif hasattr(self._dataset, "__iter__"):
-            self._data = [item for item in tqdm(self._dataset)]
+            length = None
+            items = tqdm(self._dataset)
         else:
             raise AttributeError(
                 "Input dataset must provide __len__ and __getitem__ or __iter__"
             )
 
+        if self._storage == "memmap":
+            self._data = self._store_memmap(items, length)
+        elif self._storage == "shared":
+            self._data = self._store_shared(items, length)
+        elif length is None:
+            self._data = self._store_list(items)
+        else:
+            self._data = self._store_packed(items, length)
+
+    def _iter_sized(
+        self,
+        length: int,
+        workers: Optional[int],
+        backend: Backend,
+        chunk_size: Optional[int],
+    ) -> Iterator[T]:
+        if chunk_size is None:
+            chunk_size = default_chunk_size(length, workers)
+        chunks = chunk_indices(length, chunk_size)
+
+        with tqdm(total=length) as pbar:
+            for items in map_chunks(_read_chunk, self._dataset, chunks, workers, backend):
+                yield from items
+                pbar.update(len(items))
+
+    def _store_packed(self, items: Iterable[T], length: int) -> Any:
+        data = []
+        storage = None
+        for index, item in enumerate(items):
+            if storage is None and self._pack and index == 0:
+                storage = ArrayStorage.allocate(item, length)
+
+            if storage is not None:
+                if storage.fits(item):
+                    storage.write(index, item)
+                    continue
+                data = storage.to_list(index)
+                storage = None
+            data.append(item)
+        return storage if storage is not None else data
+
+    def _store_list(self, items: Iterable[T]) -> Any:
+        data = list(items)
+        if not self._pack or len(data) == 0:
+            return data
+
+        storage = ArrayStorage.allocate(data[0], len(data))
+        if storage is None or not all(storage.fits(item) for item in data):
+            return data
+        for index, item in enumerate(data):
+            storage.write(index, item)
+        return storage
+
+    def _store_fixed(
+        self, items: Iterable[T], create: Callable[[T], ArrayStorage]
+    ) -> ArrayStorage:
+        storage = None
+        for index, item in enumerate(items):
+            if storage is None:
+                storage = create(item)
+            if not storage.fits(item):
+                raise ValueError(
+                    f"Item on index {index} has different layout than the first one."
+                    f" {self._storage.capitalize()} storage requires the same shapes"
+                    " and dtypes of arrays"
+                )
+            storage.write(index, item)
+
+        if storage is None:
+            raise ValueError(f"Cannot cache empty dataset in {self._storage} storage")
+        return storage
+
+    def _store_memmap(self, items: Iterable[T], length: Optional[int]) -> MemmapStorage:
+        capacity = length if length is not None else 1024
+        storage = self._store_fixed(
+            items, lambda item: MemmapStorage.create(self._path, item, capacity)
+        )
+        return storage.finalize(self._meta_hash)
+
+    def _store_shared(self, items: Iterable[T], length: Optional[int]) -> SharedMemoryStorage:
+        if length is None:
+            items = list(items)
+            length = len(items)
+        return self._store_fixed(items, lambda item: SharedMemoryStorage.allocate(item, length))
+
     def __getitem__(self, index: int) -> T:
         return self._data[index]
 
     def __len__(self) -> int:
         return len(self._data)
+
+    def get_batch(self, indices: Sequence[int]) -> Any:
+        """
+        Returns an array of items if they are packed arrays
+        """
+        if isinstance(self._data, ArrayStorage) and not self._data.is_tuple:
+            return self._data[np.asarray(indices, dtype=np.intp)]
+        return [self._data[i] for i in indices]
+
+    def close(self) -> None:
+        """
+        Releases the resources of the storage. For the shared storage
+        unlinks the shared memory if called in the process that created it.
+        The dataset cannot be used after this.
+        """
+        if hasattr(self._data, "close"):
+            self._data.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        if self._storage == "shared" and self._dataset is not None:
+            # Everything is in the shared memory already, the pipeline
+            # is only needed for its meta
+            state["_dataset_meta"] = self._dataset.get_meta()
+            state["_dataset"] = None
+        return state
+
+    def get_meta(self) -> Meta:
+        if self._dataset is None:
+            meta = BaseDataset.get_meta(self)
+            meta[0]["len"] = len(self)
+            meta += deepcopy(self._dataset_meta)
+        else:
+            meta = super().get_meta()
+        if self._storage != "memory":
+            meta[0]["storage"] = self._storage
+        if self._storage == "memmap":
+            meta[0]["path"] = self._path
+        return meta
@@ -14,10 +14,33 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Any, List, Tuple
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from ..base import Meta
-from .dataset import Dataset, T
+from .dataset import Dataset, T, batch_to_list, fetch_batch
+
+_shared_executor: Optional[ThreadPoolExecutor] = None
+_shared_executor_lock = threading.Lock()
+# Marks the threads of the shared pool to avoid nested waiting on it
+_worker_state = threading.local()
+
+
+def _get_shared_executor() -> ThreadPoolExecutor:
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(thread_name_prefix="cascade-composer")
+        return _shared_executor
+
+
+def _run_in_worker(func: Callable[..., Any], *args: Any) -> Any:
+    _worker_state.active = True
+    try:
+        return func(*args)
+    finally:
+        _worker_state.active = False
 
 
 class Composer(Dataset[T]):
@@ -31,18 +54,41 @@ class Composer(Dataset[T]):
     >>> labels = cdd.Wrapper([1, 0, 0, 1, 1])
     >>> ds = cdd.Composer((items, labels))
     >>> assert ds[0] == (0, 1)
+
+    If the datasets are I/O bound, read them concurrently
+
+    >>> ds = cdd.Composer((items, labels), parallel=True)
+    >>> assert ds.get_batch([0, 1]) == [(0, 1), (1, 0)]
     """
 
-    def __init__(self, datasets: List[Dataset[Any]], *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        datasets: List[Dataset[Any]],
+        *args: Any,
+        parallel: bool = False,
+        executor: Optional[Executor] = None,
+        **kwargs: Any,
+    ) -> None:
         """
         Parameters
         ----------
         datasets: Iterable[Dataset]
             Datasets of the same length to be unified
+        parallel: bool, optional
+            Whether to read the items of the datasets concurrently,
+            by default False. The first dataset is read in the calling thread
+            and others in a thread pool, so the time of reading is
+            the maximum of the datasets instead of their sum
+        executor: Optional[Executor], optional
+            The executor to use when ``parallel`` is True, by default
+            the thread pool that is shared by all Composers.
+            Is not pickled, the shared pool is used after unpickling
         """
         super().__init__(*args, **kwargs)
         self._validate_input(datasets)
         self._datasets = datasets
+        self._parallel = parallel
+        self._executor = executor
         # Since we checked the same length in all datasets, we can
         # set the length of any dataset as the length of Composer
         self._len = len(self._datasets[0])
@@ -56,8 +102,35 @@ class Composer(Dataset[T]):
                 f"Actual lengths: {lengths}"
             )
 
+    def _fan_out(self, func: Callable[[Dataset[Any], Any], Any], arg: Any) -> List[Any]:
+        # Calls func for every dataset keeping the order of datasets
+        nested = getattr(_worker_state, "active", False)
+        if not self._parallel or len(self._datasets) < 2 or nested:
+            return [func(ds, arg) for ds in self._datasets]
+
+        executor = self._executor if self._executor is not None else _get_shared_executor()
+        futures = [executor.submit(_run_in_worker, func, ds, arg) for ds in self._datasets[1:]]
+        try:
+            first = func(self._datasets[0], arg)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        return [first] + [future.result() for future in futures]
+
     def __getitem__(self, index: int) -> Tuple[T]:
-        return tuple(ds[index] for ds in self._datasets)
+        return tuple(self._fan_out(_get_item, index))
+
+    def get_batch(self, indices: Sequence[int]) -> List[Tuple[T]]:
+        """
+        Retrieves the batch from each dataset and zips them
+        """
+        return list(zip(*self._fan_out(_get_batch, indices)))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
 
     def __len__(self) -> int:
         return self._len
@@ -86,3 +159,11 @@ class Composer(Dataset[T]):
         if "data" in meta[0]:
             for ds, meta in zip(self._datasets, meta[0]["data"]):
                 ds.from_meta(meta)
+
+
+def _get_item(dataset: Dataset[Any], index: int) -> Any:
+    return dataset[index]
+
+
+def _get_batch(dataset: Dataset[Any], indices: Sequence[int]) -> List[Any]:
+    return batch_to_list(fetch_batch(dataset, indices))
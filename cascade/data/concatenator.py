@@ -14,12 +14,13 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Any, List
+from bisect import bisect_right
+from typing import Any, List, Sequence, Union
 
 import numpy as np
 
 from ..base import Meta
-from .dataset import Dataset, T
+from .dataset import Dataset, T, batch_to_list, fetch_batch
 
 
 class Concatenator(Dataset[T]):
@@ -33,11 +34,20 @@ class Concatenator(Dataset[T]):
     >>> ds_2 = Wrapper([2, 1, 0])
     >>> ds = Concatenator((ds_1, ds_2))
     >>> assert [item for item in ds] == [0, 1, 2, 2, 1, 0]
+
+    Negative indices and slices are supported, slices return lists
+
+    >>> ds[-1]
+    0
+    >>> ds[2:4]
+    [2, 2]
     """
 
     def __init__(self, datasets: List[Dataset[T]], *args: Any, **kwargs: Any) -> None:
         """
-        Creates concatenated dataset from the list of datasets provided
+        Creates concatenated dataset from the list of datasets provided.
+        Lengths of the datasets are computed once here,
+        so they should not change afterwards
 
         Parameters
         ----------
@@ -47,20 +57,54 @@ class Concatenator(Dataset[T]):
         self._datasets = datasets
         lengths = [len(ds) for ds in self._datasets]
         self._shifts = np.cumsum([0] + lengths)
+        # Python ints are faster to bisect for single items
+        self._starts = self._shifts[:-1].tolist()
+        self._length = int(self._shifts[-1])
         super().__init__(*args, **kwargs)
 
-    def __getitem__(self, index: int) -> T:
-        ds_index = 0
-        for sh in self._shifts[1:]:
-            if index >= sh:
-                ds_index += 1
-        return self._datasets[ds_index][index - self._shifts[ds_index]]
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return self.get_batch(range(self._length)[index])
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"Index {index} is out of range for length {self._length}")
+
+        ds_index = bisect_right(self._starts, index) - 1
+        return self._datasets[ds_index][index - self._starts[ds_index]]
+
+    def get_batch(self, indices: Sequence[int]) -> List[T]:
+        """
+        Groups indices by the dataset they belong to,
+        retrieves one batch from each and puts the items
+        back in the order of indices
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        indices = np.where(indices < 0, indices + self._length, indices)
+        if len(indices) and (indices.min() < 0 or indices.max() >= self._length):
+            raise IndexError(f"Indices are out of range for length {self._length}")
+
+        ds_indices = np.searchsorted(self._shifts, indices, side="right") - 1
+
+        order = np.argsort(ds_indices, kind="stable")
+        groups, starts = np.unique(ds_indices[order], return_index=True)
+        stops = np.append(starts[1:], len(order))
+
+        result = [None] * len(indices)
+        for ds_index, start, stop in zip(groups, starts, stops):
+            positions = order[start:stop]
+            local = indices[positions] - self._shifts[ds_index]
+            batch = batch_to_list(fetch_batch(self._datasets[ds_index], local.tolist()))
+            for position, item in zip(positions, batch):
+                result[position] = item
+        return result
 
     def __len__(self) -> int:
         """
         Length of Concatenator is a sum of lengths of its datasets
         """
-        return sum([len(ds) for ds in self._datasets])
+        return self._length
 
     def get_meta(self) -> Meta:
         """
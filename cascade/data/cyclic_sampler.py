@@ -14,16 +14,21 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Iterator
+from typing import Any
 
-from .dataset import T
-from .modifier import Sampler
+import numpy as np
 
+from .dataset import Dataset, T
+from .modifier import IndexSampler
 
-class CyclicSampler(Sampler[T]):
+
+class CyclicSampler(IndexSampler[T]):
     """
     A Sampler that iterates ``num_samples`` times through an input Dataset in cyclic manner
 
+    It is an index sampler that keeps an array of ``num_samples`` indices
+    into the input dataset, one 4 or 8 byte integer per sample
+
     Example
     -------
     >>> from cascade.data import CyclicSampler, Wrapper
@@ -32,10 +37,8 @@ class CyclicSampler(Sampler[T]):
     >>> assert [item for item in ds] == [1, 2, 3, 1, 2, 3, 1]
     """
 
-    def __getitem__(self, index: int) -> T:
-        internal_index = index % len(self._dataset)
-        return self._dataset[internal_index]
-
-    def __iter__(self) -> Iterator[T]:
-        for index in range(super().__len__()):
-            yield self.__getitem__(index)
+    def __init__(
+        self, dataset: Dataset[T], num_samples: int, *args: Any, **kwargs: Any
+    ) -> None:
+        indices = np.arange(num_samples, dtype=np.intp) % len(dataset)
+        super().__init__(dataset, indices, *args, **kwargs)
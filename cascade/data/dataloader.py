@@ -0,0 +1,260 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from concurrent.futures import Executor
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+from typing_extensions import Literal
+
+from .dataset import Dataset, T, batch_to_list, fetch_batch
+from .parallel import check_backend, make_executor, map_chunks
+from .utils import to_uint64
+
+
+def default_collate(batch: Any) -> Any:
+    """
+    Converts a batch as returned by ``get_batch`` into arrays
+    when possible.
+
+    Arrays and tables are returned as is. Arrays or numbers of the same
+    shape and dtype are stacked into one contiguous array. Tuples are
+    collated part by part into tuples. Anything else is returned as a list.
+
+    Example
+    -------
+    >>> import numpy as np
+    >>> from cascade.data.dataloader import default_collate
+    >>> batch = [(np.zeros(3), 0), (np.ones(3), 1)]
+    >>> images, labels = default_collate(batch)
+    >>> images.shape, labels.tolist()
+    ((2, 3), [0, 1])
+    """
+    if isinstance(batch, np.ndarray) or hasattr(batch, "iloc"):
+        return batch
+
+    items = batch_to_list(batch)
+    if not items:
+        return items
+
+    first = items[0]
+    if isinstance(first, tuple):
+        if any(not isinstance(item, tuple) or len(item) != len(first) for item in items):
+            return items
+        return tuple(default_collate(list(part)) for part in zip(*items))
+
+    if isinstance(first, (np.ndarray, np.generic)):
+        layout = (np.shape(first), first.dtype)
+        if first.dtype == object:
+            return items
+        for item in items:
+            if not isinstance(item, (np.ndarray, np.generic)) or (item.shape, item.dtype) != layout:
+                return items
+        return np.stack(items)
+
+    if isinstance(first, (bool, int, float)) and all(type(item) is type(first) for item in items):
+        return np.asarray(items)
+    return items
+
+
+def _identity(batch: Any) -> Any:
+    return batch
+
+
+def _load_batch(state: Tuple[Any, Callable[[Any], Any]], indices: Any) -> Any:
+    data, collate_fn = state
+    if isinstance(indices, np.ndarray):
+        indices = indices.tolist()
+    return collate_fn(fetch_batch(data, indices))
+
+
+class DataLoader:
+    """
+    Builds batches of a dataset in a pool of workers ahead of the consumer.
+
+    Workers retrieve batches with ``get_batch`` and collate them, the batches
+    are delivered in order. The number of batches in flight is bounded
+    by ``prefetch`` per worker. Process workers receive their own copy
+    of the dataset once on start, after that only the indices of a batch
+    and the batch itself are transferred.
+
+    Workers are started on the first iteration and reused in the following
+    epochs until ``close()`` is called. The loader can be used as a context
+    manager to close it.
+
+    Example
+    -------
+    >>> import numpy as np
+    >>> from cascade import data as cdd
+    >>> ds = cdd.Wrapper([(np.zeros(2), 0), (np.ones(2), 1), (np.ones(2), 0)])
+    >>> with cdd.DataLoader(ds, batch_size=2, num_workers=2) as dl:
+    ...     for x, y in dl:
+    ...         print(x.shape, y)
+    ...
+    (2, 2) [0 1]
+    (1, 2) [0]
+
+    Shuffling uses its own generator, the order is different each epoch
+    and reproducible with the seed
+
+    >>> dl = cdd.DataLoader(ds, batch_size=2, shuffle=True, drop_last=True, seed=0)
+    >>> len(dl)
+    1
+
+    See also
+    --------
+    cascade.data.SimpleDataloader
+    """
+
+    def __init__(
+        self,
+        data: Dataset[T],
+        batch_size: int = 1,
+        shuffle: bool = False,
+        drop_last: bool = False,
+        num_workers: Optional[int] = None,
+        backend: Literal["thread", "process"] = "thread",
+        prefetch: int = 2,
+        collate_fn: Optional[Callable[[Any], Any]] = default_collate,
+        worker_init_fn: Optional[Callable[[], None]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data : Dataset[T]
+            A dataset or a sequence to load
+        batch_size : int, optional
+            The number of items in a batch, by default 1
+        shuffle : bool, optional
+            Whether to shuffle the order of items on each iteration, by default False
+        drop_last : bool, optional
+            Whether to skip the last incomplete batch, by default False
+        num_workers : Optional[int], optional
+            The number of workers, by default None - batches are built
+            on the calling thread when requested
+        backend : Literal["thread", "process"], optional
+            The type of workers, by default "thread". Process workers need
+            the dataset and ``collate_fn`` to be picklable
+        prefetch : int, optional
+            The number of batches loaded in advance by each worker, by default 2
+        collate_fn : Optional[Callable[[Any], Any]], optional
+            The function to convert a batch as returned by ``get_batch``,
+            by default ``default_collate``. If None, batches are returned as is
+        worker_init_fn : Optional[Callable[[], None]], optional
+            The function to call in each worker on start, by default None.
+            Without workers it is called once before the first batch
+        seed : Optional[int], optional
+            The seed of the shuffling, by default chosen randomly.
+            Negative seeds are taken modulo 2 ** 64
+
+        Raises
+        ------
+        ValueError
+            If batch size or prefetch are not positive or the backend is not supported
+        """
+        if batch_size <= 0:
+            raise ValueError(f"Batch size should be positive, got {batch_size}")
+        if prefetch <= 0:
+            raise ValueError(f"Prefetch should be positive, got {prefetch}")
+        check_backend(backend)
+
+        self.data = data
+        self._batch_size = batch_size
+        self._shuffle = shuffle
+        self._drop_last = drop_last
+        self._num_workers = num_workers
+        self._backend = backend
+        self._prefetch = prefetch
+        self._collate_fn = collate_fn if collate_fn is not None else _identity
+        self._worker_init_fn = worker_init_fn
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1, np.uint64)[0])
+        self._seed = seed
+        self._epoch = 0
+        self._executor: Optional[Executor] = None
+        self._initialized = False
+
+    def set_epoch(self, epoch: int) -> None:
+        """
+        Sets the epoch which order is used on the next iteration.
+        The epoch is incremented after each full iteration
+        """
+        self._epoch = epoch
+
+    def _batches(self, epoch: int) -> Iterator[Sequence[int]]:
+        length = len(self.data)
+        stop = len(self) * self._batch_size
+        if self._shuffle:
+            rng = np.random.default_rng([to_uint64(self._seed), to_uint64(epoch)])
+            order = rng.permutation(length)
+            for start in range(0, stop, self._batch_size):
+                yield order[start:start + self._batch_size]
+        else:
+            for start in range(0, stop, self._batch_size):
+                yield range(start, min(start + self._batch_size, length))
+
+    def _get_executor(self) -> Optional[Executor]:
+        if not self._num_workers:
+            if not self._initialized and self._worker_init_fn is not None:
+                self._worker_init_fn()
+            self._initialized = True
+            return None
+
+        if self._executor is None:
+            self._executor = make_executor(
+                (self.data, self._collate_fn),
+                self._num_workers,
+                self._backend,
+                self._worker_init_fn,
+            )
+        return self._executor
+
+    def __iter__(self) -> Iterator[Any]:
+        epoch = self._epoch
+        yield from map_chunks(
+            _load_batch,
+            (self.data, self._collate_fn),
+            self._batches(epoch),
+            self._num_workers,
+            window=self._prefetch * (self._num_workers or 1),
+            executor=self._get_executor(),
+        )
+        self._epoch = epoch + 1
+
+    def close(self) -> None:
+        """
+        Stops the workers. The next iteration starts them again
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self) -> "DataLoader":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def __len__(self) -> int:
+        if self._drop_last:
+            return len(self.data) // self._batch_size
+        return -(-len(self.data) // self._batch_size)
@@ -13,8 +13,10 @@ limitations under the License.
 
 import warnings
 from abc import ABC, abstractmethod
-from typing import (Any, Generic, Iterable, Iterator, Optional, Sequence,
-                    Sized, TypeVar)
+from typing import (Any, Generic, Iterable, Iterator, List, Optional,
+                    Sequence, Sized, TypeVar)
+
+import numpy as np
 
 from ..base import Meta, Traceable
 from .data_card import DataCard
@@ -22,6 +24,39 @@ from .data_card import DataCard
 T = TypeVar("T", covariant=True)
 
 
+def batch_to_list(batch: Any) -> List[Any]:
+    """
+    Splits a batch returned by ``get_batch`` into the list of items.
+    Lists are returned as is, arrays are split by the first axis
+    and tables by rows.
+    """
+    if isinstance(batch, list):
+        return batch
+    if hasattr(batch, "iterrows"):
+        return [row for _, row in batch.iterrows()]
+    return list(batch)
+
+
+def index_list(indices: Sequence[int]) -> Sequence[int]:
+    """
+    Converts an array of indices into the list of Python ints,
+    so that per-item ``__getitem__`` does not receive numpy integers
+    """
+    if isinstance(indices, np.ndarray):
+        return indices.tolist()
+    return indices
+
+
+def fetch_batch(data: Any, indices: Sequence[int]) -> Any:
+    """
+    Calls ``get_batch`` of the data if it is present, if not
+    retrieves items one by one. Works with any sequence.
+    """
+    if hasattr(data, "get_batch"):
+        return data.get_batch(indices)
+    return [data[i] for i in index_list(indices)]
+
+
 class BaseDataset(ABC, Generic[T], Traceable):
     """
     Base class of any object that constitutes a step in a data-pipeline
@@ -55,9 +90,14 @@ class IteratorDataset(BaseDataset[T], Iterable[T]):
     """
     An abstract class to represent a dataset as
     an iterable object
+
+    Define either ``__iter__`` or ``__next__`` in subclasses.
+    If only ``__next__`` is defined, the dataset is its own iterator
     """
 
     def __iter__(self) -> Iterator[T]:
+        if hasattr(self, "__next__"):
+            return self
         return super().__iter__()
 
 
@@ -85,6 +125,30 @@ class Dataset(BaseDataset[T], Sized):
         for i in range(len(self)):
             yield self.__getitem__(i)
 
+    def get_batch(self, indices: Sequence[int]) -> Any:
+        """
+        Returns items on given indices at once.
+
+        By default calls ``__getitem__`` for each index. Override it
+        when the data can be retrieved in bulk more efficiently.
+
+        Parameters
+        ----------
+        indices: Sequence[int]
+            Indices of items in the order they should be returned
+
+        Returns
+        -------
+        Any
+            A batch - the list of items or an array or a table
+            whose rows are items
+
+        See also
+        --------
+        cascade.data.dataset.batch_to_list
+        """
+        return [self.__getitem__(i) for i in index_list(indices)]
+
     def get_meta(self) -> Meta:
         meta = super().get_meta()
         meta[0]["len"] = len(self)
@@ -125,6 +189,15 @@ class Wrapper(Dataset):
     def __len__(self) -> int:
         return len(self._data)
 
+    def get_batch(self, indices: Sequence[int]) -> Any:
+        """
+        Uses fancy indexing if the wrapped object is ``np.ndarray``
+        returning an array of items
+        """
+        if isinstance(self._data, np.ndarray):
+            return self._data[np.asarray(indices, dtype=np.intp)]
+        return [self._data[i] for i in index_list(indices)]
+
     def get_meta(self) -> Meta:
         meta = super().get_meta()
         meta[0]["obj_type"] = str(type(self._data))
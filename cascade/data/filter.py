@@ -14,19 +14,98 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Any, Callable
+import os
+import warnings
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 
-from .dataset import Dataset, IteratorDataset
-from .modifier import IteratorModifier, Sampler
+import numpy as np
+from typing_extensions import Literal
 
+from ..base.utils import function_key, is_reproducible, meta_hash
+from .dataset import Dataset, IteratorDataset, batch_to_list, fetch_batch
+from .modifier import IndexSampler, IteratorModifier, index_dtype
+from .parallel import chunk_indices, default_chunk_size, map_chunks
 
-class Filter(Sampler):
+
+def _fetch_chunk(dataset: Dataset, chunk: range) -> Any:
+    try:
+        return fetch_batch(dataset, chunk)
+    except Exception as e:
+        # Finds the item that failed to report its index
+        for i in chunk:
+            try:
+                dataset[i]
+            except Exception as item_error:
+                raise RuntimeError(f"Error when filtering dataset on index: {i}") from item_error
+        raise RuntimeError(
+            f"Error when filtering dataset on indices from {chunk.start} to {chunk.stop}"
+        ) from e
+
+
+def _filter_chunk(state: Tuple[Dataset, Callable, bool], chunk: range) -> np.ndarray:
+    dataset, filter_fn, batched = state
+    if batched:
+        batch = _fetch_chunk(dataset, chunk)
+        try:
+            mask = np.asarray(filter_fn(batch), dtype=bool)
+        except Exception as e:
+            raise RuntimeError(
+                f"Error when filtering dataset on indices from {chunk.start} to {chunk.stop}"
+            ) from e
+        if mask.shape != (len(chunk),):
+            raise ValueError(
+                f"Batched filter_fn should return {len(chunk)} values, got shape {mask.shape}"
+            )
+        return mask
+
+    mask = np.zeros(len(chunk), dtype=bool)
+    items = batch_to_list(_fetch_chunk(dataset, chunk))
+    for k, (i, item) in enumerate(zip(chunk, items)):
+        try:
+            mask[k] = bool(filter_fn(item))
+        except Exception as e:
+            raise RuntimeError(f"Error when filtering dataset on index: {i}") from e
+    return mask
+
+
+class Filter(IndexSampler):
     """
     Filter for Datasets with length. Uses a function
     to create a mask of items that will remain
+
+    Example
+    -------
+    >>> from cascade.data import Filter, Wrapper
+    >>> ds = Wrapper([0, 1, 2, 3, 4])
+    >>> ds = Filter(ds, lambda x: x % 2 == 0)
+    >>> assert [item for item in ds] == [0, 2, 4]
+
+    Vectorized predicates receive batches as returned by ``get_batch``
+    and return a boolean mask
+
+    >>> import numpy as np
+    >>> ds = Wrapper(np.arange(5))
+    >>> ds = Filter(ds, lambda batch: batch > 2, batched=True, workers=2)
+    >>> assert [item for item in ds] == [3, 4]
+
+    After ``set_epoch`` that reorders the previous dataset the filter
+    is evaluated again, so it keeps the same items in the new order
     """
 
-    def __init__(self, dataset: Dataset, filter_fn: Callable, *args: Any, **kwargs: Any) -> None:
+    _selects_items = True
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        filter_fn: Callable,
+        *args: Any,
+        workers: Optional[int] = None,
+        backend: Literal["thread", "process"] = "thread",
+        chunk_size: Optional[int] = None,
+        batched: bool = False,
+        cache_dir: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
         """
         Filter a dataset using a filter function.
         Does not accumulate items in memory, will store only an index mask.
@@ -37,25 +116,118 @@ class Filter(Sampler):
             A dataset to filter
         filter_fn: Callable
             A function to be applied to every item of a dataset -
-            should return bool. Will be called on every item on ``__init__``.
+            should return bool. Will be called on every item on ``__init__``
+            and again if ``set_epoch`` changes the previous dataset.
+            It is not pickled with the Filter
+        workers: Optional[int], optional
+            The number of workers that evaluate ``filter_fn``
+            on chunks of the dataset, by default None - evaluates serially
+        backend: Literal["thread", "process"], optional
+            The type of pool, by default "thread". Process workers need
+            the dataset and ``filter_fn`` to be picklable
+        chunk_size: Optional[int], optional
+            The number of items in a chunk, by default chosen
+            from the length of the dataset and the number of workers
+        batched: bool, optional
+            Whether ``filter_fn`` is vectorized - accepts a batch of items as
+            returned by ``get_batch`` and returns a boolean value for each, by default False
+        cache_dir: Optional[str], optional
+            If given, the indices that passed are saved in this folder and
+            loaded on the next run instead of evaluating ``filter_fn``.
+            The file is identified by the meta of the previous pipeline, including
+            the seeds and epochs of random stages, and by the name, code and captured
+            values of ``filter_fn``, so it is not invalidated when ``filter_fn``
+            depends on anything else. If captured values cannot be hashed or
+            a previous stage has no seed, the cache is not used
 
         Raises
         ------
         RuntimeError
             If ``filter_fn`` raises an exception
         """
-        self._mask = []
-        for i in range(len(dataset)):
-            try:
-                result = filter_fn(dataset[i])
-                if result:
-                    self._mask.append(i)
-            except Exception as e:
-                raise RuntimeError(f"Error when filtering dataset on index: {i}") from e
-        super().__init__(dataset, len(self._mask), *args, **kwargs)
+        self._filter_fn = filter_fn
+        self._workers = workers
+        self._backend = backend
+        self._chunk_size = chunk_size
+        self._batched = batched
+        self._cache_dir = cache_dir
+        super().__init__(dataset, self._filter(dataset), *args, **kwargs)
+
+    def _filter(self, dataset: Dataset) -> np.ndarray:
+        path = None
+        if self._cache_dir is not None:
+            key = self._cache_key(dataset, self._filter_fn, self._batched)
+            if key is not None:
+                path = os.path.join(self._cache_dir, f"filter_{key}.npy")
+                if os.path.exists(path):
+                    return np.load(path)
+
+        indices = self._evaluate(
+            dataset, self._filter_fn, self._workers, self._backend, self._chunk_size, self._batched
+        )
+        if path is not None:
+            self._save(path, indices)
+        return indices
 
-    def __getitem__(self, index: Any):
-        return self._dataset[self._mask[index]]
+    def _select(self) -> np.ndarray:
+        if self._filter_fn is None:
+            raise RuntimeError(
+                "Cannot filter the changed dataset, filter_fn is not kept when Filter is pickled"
+            )
+        return self._filter(self._dataset)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # filter_fn is often a lambda, the indices are enough to get items
+        state = self.__dict__.copy()
+        state["_filter_fn"] = None
+        return state
+
+    @staticmethod
+    def _cache_key(dataset: Dataset, filter_fn: Callable, batched: bool) -> Optional[str]:
+        meta = dataset.get_meta()
+        if not is_reproducible(meta):
+            warnings.warn(
+                "Filter cache is disabled, the order of the previous pipeline "
+                "is random on each run, pass seeds to the random stages"
+            )
+            return None
+        try:
+            fn_key = function_key(filter_fn)
+        except TypeError as e:
+            warnings.warn(f"Filter cache is disabled, cannot identify filter_fn: {e}")
+            return None
+        return meta_hash([meta_hash(meta), fn_key, batched])
+
+    @staticmethod
+    def _evaluate(
+        dataset: Dataset,
+        filter_fn: Callable,
+        workers: Optional[int],
+        backend: Literal["thread", "process"],
+        chunk_size: Optional[int],
+        batched: bool,
+    ) -> np.ndarray:
+        length = len(dataset)
+        if chunk_size is None:
+            chunk_size = default_chunk_size(length, workers)
+        chunks = chunk_indices(length, chunk_size)
+
+        mask = np.zeros(length, dtype=bool)
+        results = map_chunks(
+            _filter_chunk, (dataset, filter_fn, batched), chunks, workers, backend
+        )
+        for chunk, chunk_mask in zip(chunks, results):
+            mask[chunk.start:chunk.stop] = chunk_mask
+        return np.flatnonzero(mask).astype(index_dtype(length))
+
+    @staticmethod
+    def _save(path: str, indices: np.ndarray) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so that
+        # the interrupted runs do not leave partial masks
+        tmp_path = path + ".tmp.npy"
+        np.save(tmp_path, indices)
+        os.replace(tmp_path, path)
 
 
 class IteratorFilter(IteratorModifier):
@@ -63,6 +235,10 @@ class IteratorFilter(IteratorModifier):
     Filter for datasets without length
 
     Does not filter on init, returns only items that pass the filter
+
+    See also
+    --------
+    cascade.data.ifilter
     """
     def __init__(
         self, dataset: IteratorDataset, filter_fn: Callable, *args: Any, **kwargs: Any
@@ -70,12 +246,11 @@ class IteratorFilter(IteratorModifier):
         self._filter_fn = filter_fn
         super().__init__(dataset, *args, **kwargs)
 
-    def __next__(self):
-        while True:
-            item = next(self._dataset)
+    def __iter__(self) -> Iterator[Any]:
+        for item in self._dataset:
             try:
                 result = self._filter_fn(item)
-                if result:
-                    return item
             except Exception as e:
                 raise RuntimeError("Error when filtering iterator") from e
+            if result:
+                yield item
@@ -14,42 +14,216 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import fnmatch
+import json
 import os
-from typing import Any, List
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+import numpy as np
 
 from ..base import Meta, raise_not_implemented
 from .dataset import Dataset, T
 
+MANIFEST_NAME = ".cascade_manifest.npz"
+
+
+class _PathList(Sequence[str]):
+    """
+    Full paths of files stored compactly as a root
+    and an array of encoded relative names
+    """
+
+    def __init__(self, root: str, names: np.ndarray) -> None:
+        self._root = root
+        self._names = names
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self._join(name) for name in self._names[index]]
+        return self._join(self._names[index])
+
+    def _join(self, name: bytes) -> str:
+        return os.path.join(self._root, os.fsdecode(name))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._names:
+            yield self._join(name)
+
 
 class FolderDataset(Dataset[T]):
     """
     Basic "folder of files" dataset. Accepts root folder in which considers all files.
     Is abstract - getitem is not defined, since it is specific for each file type.
 
+    Files are listed once on construction in the sorted order of their
+    paths relative to the root. Large listings can be saved to a manifest
+    which is reused while the folders are not changed.
+
+    Example
+    -------
+    >>> from cascade import data as cdd
+    >>> class TextFolder(cdd.FolderDataset):
+    ...     def __getitem__(self, index):
+    ...         with open(self._names[index]) as f:
+    ...             return f.read()
+    ...
+    >>> ds = TextFolder(
+    ...     "./texts", recursive=True, extensions=[".txt"], manifest=True
+    ... )  # doctest: +SKIP
+
     See also
     --------
     cascade.utils.FolderImageDataset
     """
 
-    def __init__(self, root: str, *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        root: str,
+        *args: Any,
+        recursive: bool = False,
+        pattern: Optional[str] = None,
+        extensions: Optional[Sequence[str]] = None,
+        manifest: Union[bool, str] = False,
+        **kwargs: Any,
+    ) -> None:
         """
         Parameters
         ----------
         root: str
             A path to the folder of files
+        recursive: bool, optional
+            Whether to include files in subfolders, by default False
+        pattern: Optional[str], optional
+            Glob pattern that the paths relative to the root should match, for example
+            ``"*/images/*.png"``, by default None - all files are included
+        extensions: Optional[Sequence[str]], optional
+            Extensions of files to include, case-insensitive,
+            for example ``[".jpg", ".png"]``, by default None - all files are included
+        manifest: Union[bool, str], optional
+            Whether to save the listing with sizes and modification times of files
+            and reuse it while the modification times of the folders do not change,
+            by default False. If True, the manifest is saved in the root folder,
+            a path to the file can be passed instead
+
+        Raises
+        ------
+        FileNotFoundError
+            If the root folder does not exist
         """
         super().__init__(*args, **kwargs)
         self._root = os.path.abspath(root)
         if not os.path.exists(self._root):
             raise FileNotFoundError(self._root)
 
-        self._names = sorted(
-            [
-                os.path.join(self._root, name)
-                for name in sorted(os.listdir(self._root))
-                if not os.path.isdir(name)
-            ]
-        )
+        self._listing_params = {
+            "recursive": recursive,
+            "pattern": pattern,
+            "extensions": None if extensions is None else sorted(e.lower() for e in extensions),
+        }
+
+        if manifest is True:
+            manifest = os.path.join(self._root, MANIFEST_NAME)
+        self._manifest_path = manifest or None
+
+        listing = None
+        if self._manifest_path is not None:
+            listing = self._load_manifest(self._manifest_path)
+        if listing is None:
+            listing, dirs = self._list_files(with_stats=self._manifest_path is not None)
+            if self._manifest_path is not None:
+                self._save_manifest(self._manifest_path, listing, dirs)
+
+        names, self._sizes, self._mtimes = listing
+        self._names = _PathList(self._root, names)
+
+    def _included(self, name: str) -> bool:
+        if name == MANIFEST_NAME:
+            return False
+        pattern = self._listing_params["pattern"]
+        if pattern is not None and not fnmatch.fnmatch(name, pattern):
+            return False
+        extensions = self._listing_params["extensions"]
+        if extensions is not None and os.path.splitext(name)[1].lower() not in extensions:
+            return False
+        return True
+
+    def _list_files(
+        self, with_stats: bool = False
+    ) -> Tuple[Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]], List[str]]:
+        # Each folder is scanned once, the types of entries come from the listing
+        # itself and files are stat'ed only if their sizes are needed.
+        # Links to folders are not followed, so that links cannot make a loop
+        recursive = self._listing_params["recursive"]
+        dirs = [""]
+        files = []
+        for folder in dirs:
+            with os.scandir(os.path.join(self._root, folder)) as entries:
+                for entry in entries:
+                    name = os.path.join(folder, entry.name)
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        dirs.append(name)
+                    elif entry.is_file() and self._included(name):
+                        if with_stats:
+                            stat = entry.stat()
+                            files.append((os.fsencode(name), stat.st_size, stat.st_mtime))
+                        else:
+                            files.append((os.fsencode(name), 0, 0.0))
+        files.sort()
+
+        names = np.array([name for name, _, _ in files], dtype=bytes)
+        if not with_stats:
+            return (names, None, None), dirs
+
+        sizes = np.array([size for _, size, _ in files], dtype=np.int64)
+        mtimes = np.array([mtime for _, _, mtime in files], dtype=np.float64)
+        return (names, sizes, mtimes), dirs
+
+    def _dir_state(self, dirs: List[str]) -> str:
+        mtimes = [os.stat(os.path.join(self._root, folder)).st_mtime for folder in dirs]
+        return json.dumps([self._listing_params, sorted(zip(dirs, mtimes))])
+
+    def _load_manifest(
+        self, path: str
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as manifest:
+                # Only the folders saved in the manifest are checked without listing them.
+                # A new or removed subfolder changes the modification time of its parent
+                state = str(manifest["state"])
+                dirs = [folder for folder, _ in json.loads(state)[1]]
+                if state != self._dir_state(dirs):
+                    return None
+                return manifest["names"], manifest["sizes"], manifest["mtimes"]
+        except Exception:
+            # Broken, old or outdated manifests are rebuilt
+            return None
+
+    def _save_manifest(
+        self,
+        path: str,
+        listing: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        dirs: List[str],
+    ) -> None:
+        names, sizes, mtimes = listing
+        # Creating the file changes the modification time of its folder
+        # which may be listed, so the state is taken after the file is created
+        # and written in place which does not change the folder
+        if not os.path.exists(path):
+            open(path, "wb").close()
+        state = self._dir_state(dirs)
+        with open(path, "wb") as f:
+            np.savez(f, names=names, sizes=sizes, mtimes=mtimes, state=state)
 
     def __getitem__(self, index: Any) -> T:
         raise_not_implemented("cascade.data.FolderDataset", "__getitem__")
@@ -58,11 +232,23 @@ class FolderDataset(Dataset[T]):
         """
         Returns a list of full paths to the files
         """
-        return self._names
+        return list(self._names)
+
+    def get_file_stats(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns sizes in bytes and modification times of the files.
+        They are taken at the moment of listing when the manifest is used
+        and on the first call otherwise
+        """
+        if self._sizes is None:
+            stats = [os.stat(name) for name in self._names]
+            self._sizes = np.array([stat.st_size for stat in stats], dtype=np.int64)
+            self._mtimes = np.array([stat.st_mtime for stat in stats], dtype=np.float64)
+        return self._sizes, self._mtimes
 
     def get_meta(self) -> Meta:
         """
-        Returns meta containing root folder
+        Returns meta containing root folder and listing parameters if given
         """
         meta = super().get_meta()
         meta[0].update(
@@ -70,6 +256,10 @@ class FolderDataset(Dataset[T]):
                 "root": self._root
             }
         )
+        # Only the parameters that change the default listing
+        for key, value in self._listing_params.items():
+            if value:
+                meta[0][key] = value
         return meta
 
     def __len__(self) -> int:
@@ -0,0 +1,205 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ..base import Meta
+from .dataset import Dataset, T
+
+# The number of bytes from the beginning and the end of the file
+# that are hashed into the fingerprint
+_FINGERPRINT_BYTES = 2 ** 20
+
+
+def file_fingerprint(path: str, sample_bytes: int = _FINGERPRINT_BYTES) -> str:
+    """
+    Computes a cheap fingerprint of a file - md5 of its size and
+    of ``sample_bytes`` bytes from its beginning and its end.
+    Does not read large files fully, so may not notice the changes
+    in the middle of a file of the same size.
+    """
+    size = os.path.getsize(path)
+    h = hashlib.md5(str(size).encode("utf-8"))
+    with open(path, "rb") as f:
+        h.update(f.read(sample_bytes))
+        if size > sample_bytes:
+            f.seek(max(sample_bytes, size - sample_bytes))
+            h.update(f.read(sample_bytes))
+    return h.hexdigest()
+
+
+def _load_raw(path: str, dtype: Any, shape: Optional[Sequence[int]]) -> np.ndarray:
+    sidecar = path + ".json"
+    if dtype is None:
+        if not os.path.exists(sidecar):
+            raise FileNotFoundError(
+                f"The dtype of {path} is not known, pass it or create the {sidecar}"
+            )
+        with open(sidecar, "r") as f:
+            desc = json.load(f)
+        dtype = desc["dtype"]
+        shape = desc.get("shape", shape)
+
+    dtype = np.dtype(dtype)
+    if shape is None:
+        shape = (-1,)
+    shape = tuple(shape)
+    if -1 in shape:
+        known = int(np.prod([dim for dim in shape if dim != -1]))
+        count = os.path.getsize(path) // (dtype.itemsize * known)
+        shape = tuple(count if dim == -1 else dim for dim in shape)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+class MmapArrayDataset(Dataset[T]):
+    """
+    Dataset of large arrays that are memory-mapped from files
+    instead of being read into memory.
+
+    Supports ``.npy`` files and raw binary files. The ``dtype`` and
+    the ``shape`` of a raw file are taken from the arguments or from the
+    sidecar ``<path>.json`` file with the same fields, for example
+    ``{"dtype": "float32", "shape": [-1, 128]}``. Up to one dimension may
+    be -1 to infer it from the size of the file.
+
+    Items and slices are views on the file - they are read only on access.
+    When several arrays are given they should be aligned by
+    the first axis and items are tuples of their rows, for example
+    features and labels.
+
+    Example
+    -------
+    >>> from cascade import data as cdd
+    >>> ds = cdd.MmapArrayDataset(["features.npy", "labels.npy"])  # doctest: +SKIP
+    >>> x, y = ds[0]  # doctest: +SKIP
+    """
+
+    def __init__(
+        self,
+        paths: Union[str, Sequence[str]],
+        *args: Any,
+        dtype: Any = None,
+        shape: Optional[Sequence[int]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        paths : Union[str, Sequence[str]]
+            The path to the array or a list of paths to aligned arrays
+        dtype : Any, optional
+            The dtype of raw binary files, by default None - read from sidecar.
+            The same dtype is used for all raw files, files of different
+            dtypes should have sidecars
+        shape : Optional[Sequence[int]], optional
+            The shape of raw binary files, by default None - read from sidecar
+            or one dimensional. The same shape is used for all raw files, use -1
+            for dimensions that differ or sidecars
+
+        Raises
+        ------
+        ValueError
+            If arrays have different lengths or are zero-dimensional
+        FileNotFoundError
+            If the dtype of a raw file is unknown
+        """
+        self._single = isinstance(paths, str)
+        self._paths = [os.path.abspath(p) for p in ([paths] if self._single else paths)]
+        if not self._paths:
+            raise ValueError("At least one path is required")
+        self._dtype = dtype
+        self._shape = shape
+        self._arrays = self._open()
+
+        lengths = set()
+        for path, arr in zip(self._paths, self._arrays):
+            if arr.ndim == 0:
+                raise ValueError(f"The array in {path} is zero-dimensional")
+            lengths.add(arr.shape[0])
+        if len(lengths) > 1:
+            raise ValueError(f"Arrays should be aligned by the first axis, got lengths {lengths}")
+        # Are computed once, files are not expected to change while they are mapped
+        self._fingerprints = [file_fingerprint(path) for path in self._paths]
+        super().__init__(*args, **kwargs)
+
+    def _open(self) -> List[np.ndarray]:
+        arrays = []
+        for path in self._paths:
+            if path.endswith(".npy"):
+                arrays.append(np.load(path, mmap_mode="r"))
+            else:
+                arrays.append(_load_raw(path, self._dtype, self._shape))
+        return arrays
+
+    def _index(self, index: Any) -> Any:
+        if self._single:
+            return self._arrays[0][index]
+        return tuple(arr[index] for arr in self._arrays)
+
+    def __getitem__(self, index: Any) -> T:
+        return self._index(index)
+
+    def __len__(self) -> int:
+        return self._arrays[0].shape[0]
+
+    def get_batch(self, indices: Sequence[int]) -> Any:
+        """
+        Returns a view when indices are consecutive and a copy
+        made by fancy indexing otherwise. With several arrays
+        returns the list of tuples of rows
+        """
+        idx = np.asarray(indices, dtype=np.intp)
+        if len(idx) > 0 and idx[0] >= 0 and np.all(np.diff(idx) == 1):
+            key: Any = slice(int(idx[0]), int(idx[-1]) + 1)
+        else:
+            key = idx
+        if self._single:
+            return self._arrays[0][key]
+        return list(zip(*(arr[key] for arr in self._arrays)))
+
+    def get_arrays(self) -> List[np.ndarray]:
+        """
+        Returns memory-mapped arrays
+        """
+        return self._arrays
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Memory maps are reopened instead of copying the data
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._arrays = self._open()
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["arrays"] = [
+            {
+                "path": path,
+                "shape": list(arr.shape),
+                "dtype": str(arr.dtype),
+                "fingerprint": fingerprint,
+            }
+            for path, arr, fingerprint in zip(self._paths, self._arrays, self._fingerprints)
+        ]
+        return meta
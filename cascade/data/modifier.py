@@ -1,7 +1,10 @@
-from typing import Any, Iterator
+from typing import Any, Iterator, Sequence
+
+import numpy as np
 
 from ..base import Meta
-from .dataset import BaseDataset, Dataset, IteratorDataset, T
+from ..base.utils import meta_hash
+from .dataset import BaseDataset, Dataset, IteratorDataset, T, fetch_batch, index_list
 
 
 class BaseModifier(BaseDataset[T]):
@@ -63,16 +66,6 @@ class IteratorModifier(BaseModifier[T], IteratorDataset[T]):
     def __iter__(self) -> Iterator[T]:
         return self._dataset.__iter__()
 
-    def get_meta(self) -> Meta:
-        """
-        Overrides base method enabling cascade-like calls to previous datasets.
-        The metadata of a pipeline that consist of several modifiers can be easily
-        obtained with ``get_meta`` of the last block.
-        """
-        self_meta = super().get_meta()
-        self_meta += self._dataset.get_meta()
-        return self_meta
-
 
 class Modifier(BaseModifier[T]):
     """
@@ -96,6 +89,20 @@ class Modifier(BaseModifier[T]):
     def __len__(self) -> int:
         return len(self._dataset)
 
+    def get_batch(self, indices: Sequence[int]) -> Any:
+        """
+        Returns items on given indices at once.
+
+        By default calls ``__getitem__`` for each index,
+        so modifiers that override only ``__getitem__`` keep working.
+        Override it to retrieve items in bulk from the previous dataset.
+
+        See also
+        --------
+        cascade.data.Dataset.get_batch
+        """
+        return [self.__getitem__(i) for i in index_list(indices)]
+
     def get_meta(self) -> Meta:
         meta = super().get_meta()
         meta[0]["len"] = len(self)
@@ -118,6 +125,9 @@ class Sampler(Modifier[T]):
     cascade.data.RangeSampler
     """
 
+    # Marks the classes that can have no items, like shards of small datasets
+    _allows_empty = False
+
     def __init__(
         self, dataset: Dataset[T], num_samples: int, *args: Any, **kwargs: Any
     ) -> None:
@@ -131,9 +141,148 @@ class Sampler(Modifier[T]):
             num_samples: int
                 The number of samples to use as a new length
         """
-        assert num_samples > 0, "The number of samples should be positive"
+        assert num_samples > 0 or (
+            self._allows_empty and num_samples == 0
+        ), "The number of samples should be positive"
         super().__init__(dataset, *args, **kwargs)
         self._num_samples = num_samples
 
     def __len__(self) -> int:
         return self._num_samples
+
+
+def index_dtype(length: int) -> np.dtype:
+    """
+    The smallest of int32 and int64 that can index
+    a dataset of the given length
+    """
+    return np.dtype(np.int32) if length <= np.iinfo(np.int32).max else np.dtype(np.int64)
+
+
+class IndexSampler(Sampler[T]):
+    """
+    A Sampler that only remaps indices - its i-th item
+    is the item of the previous dataset on ``indices[i]``.
+
+    Consecutive index samplers are fused on construction:
+    instead of the chain of calls through every stage, each sampler
+    keeps a single numpy array of indices into the first dataset
+    that is not an index sampler and retrieves items from it directly.
+    Every stage stays in the pipeline, so ``get_meta`` reports
+    all of them as before.
+
+    Subclasses that override ``__getitem__`` or ``get_batch`` to
+    change items are not fused with and are treated as a usual dataset.
+
+    Subclasses that choose indices by the items of the previous
+    dataset and not only by their positions set ``_selects_items``
+    and implement ``_select``, so that ``set_epoch`` chooses
+    the indices again when the previous stages change.
+
+    See also
+    --------
+    cascade.data.Filter
+    cascade.data.RandomSampler
+    cascade.data.RangeSampler
+    """
+
+    # Marks the classes whose item retrieval is pure index remapping
+    _remaps_indices = True
+
+    # Marks the classes whose indices depend on the items of the previous dataset
+    _selects_items = False
+
+    def __init__(
+        self, dataset: Dataset[T], indices: Any, *args: Any, **kwargs: Any
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dataset: Dataset[T]
+            A dataset to sample from
+        indices: Any
+            A sequence of indices in the ``dataset``
+        """
+        indices = np.asarray(indices)
+        super().__init__(dataset, len(indices), *args, **kwargs)
+        self._fuse(indices)
+
+    def _fuse(self, indices: np.ndarray) -> None:
+        indices = np.ascontiguousarray(indices, dtype=index_dtype(len(self._dataset)))
+        if is_index_sampler(self._dataset):
+            self._base = self._dataset._base
+            # Own indices are kept to fuse again when the previous stages change
+            self._local_indices = indices
+            self._indices = self._dataset.get_indices()[indices]
+        else:
+            self._base = self._dataset
+            self._local_indices = None
+            self._indices = indices
+
+    def _indices_for_epoch(self, epoch: int) -> np.ndarray:
+        # Own indices in the previous dataset, override if they depend on the epoch
+        return self._indices if self._local_indices is None else self._local_indices
+
+    def _select(self) -> Any:
+        # Own indices chosen by the current items of the previous dataset,
+        # override together with setting _selects_items
+        raise NotImplementedError()
+
+    def set_epoch(self, epoch: int) -> None:
+        """
+        Passes the epoch to the previous datasets that have ``set_epoch``
+        and updates the indices if they changed, for example after
+        reshuffling in ``RandomSampler``.
+
+        Samplers that choose indices by items choose them again if the meta
+        of the previous datasets changed, so they keep the same items
+        in the new order. The length of such samplers changes if
+        the previous stages changed the items themselves.
+        """
+        set_epoch = getattr(self._dataset, "set_epoch", None)
+        changed = False
+        if set_epoch is not None:
+            before = meta_hash(self._dataset.get_meta()) if self._selects_items else None
+            set_epoch(epoch)
+            changed = before is not None and meta_hash(self._dataset.get_meta()) != before
+
+        if changed:
+            indices = np.asarray(self._select())
+            self._num_samples = len(indices)
+        else:
+            indices = self._indices_for_epoch(epoch)
+        self._fuse(indices)
+
+    def get_indices(self) -> np.ndarray:
+        """
+        Returns the indices of the items in the first
+        dataset of the pipeline that is not an index sampler
+        """
+        return self._indices
+
+    def __getitem__(self, index: Any) -> T:
+        internal_index = self._indices[index]
+        if isinstance(internal_index, np.integer):
+            internal_index = int(internal_index)
+        return self._base[internal_index]
+
+    def get_batch(self, indices: Sequence[int]) -> Any:
+        if not is_index_sampler(self):
+            # A subclass changes items in __getitem__
+            return super().get_batch(indices)
+        indices = np.asarray(indices, dtype=np.intp)
+        return fetch_batch(self._base, self._indices[indices].tolist())
+
+
+def is_index_sampler(dataset: Any) -> bool:
+    """
+    Checks if ``dataset`` is an index sampler which items can be
+    retrieved from its base dataset by indices bypassing the stage
+    """
+    if not isinstance(dataset, IndexSampler):
+        return False
+    for name in ("__getitem__", "get_batch"):
+        owner = next(cls for cls in type(dataset).__mro__ if name in vars(cls))
+        if not vars(owner).get("_remaps_indices", False):
+            return False
+    return True
@@ -0,0 +1,183 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+from typing_extensions import Literal
+
+Backend = Literal["thread", "process"]
+
+# The copy of a pipeline that each process worker holds
+_worker_dataset: Any = None
+
+
+def chunk_indices(length: int, chunk_size: int) -> List[range]:
+    """
+    Splits ``range(length)`` into consecutive ranges
+    of at most ``chunk_size`` indices each
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size should be positive, got {chunk_size}")
+    return [range(start, min(start + chunk_size, length)) for start in range(0, length, chunk_size)]
+
+
+def default_chunk_size(length: int, workers: Optional[int], max_size: int = 1024) -> int:
+    """
+    Chooses the chunk size so that every worker gets
+    several chunks, which evens out the load
+    """
+    if not workers or workers <= 1:
+        return max_size
+    return max(1, min(max_size, -(-length // (4 * workers))))
+
+
+def _init_worker(dataset: Any, initializer: Optional[Callable[[], None]] = None) -> None:
+    global _worker_dataset
+    _worker_dataset = dataset
+    if initializer is not None:
+        initializer()
+
+
+def _call_in_worker(func: Callable[[Any, Any], Any], chunk: Any) -> Any:
+    return func(_worker_dataset, chunk)
+
+
+def check_backend(backend: str) -> None:
+    """
+    Raises ValueError if the backend is not supported
+    """
+    if backend not in ("thread", "process"):
+        raise ValueError(f"Only thread or process backends are supported, got: {backend}")
+
+
+def make_executor(
+    dataset: Any,
+    workers: int,
+    backend: Backend = "thread",
+    initializer: Optional[Callable[[], None]] = None,
+) -> Executor:
+    """
+    Creates a pool of workers that can be passed to ``map_chunks``
+    to reuse it for several calls with the same ``dataset``.
+    Process workers receive their copy of the ``dataset`` once on start.
+    The caller is responsible for shutting the pool down.
+
+    Parameters
+    ----------
+    dataset : Any
+        The object that is passed to functions in ``map_chunks``
+    workers : int
+        The number of workers
+    backend : Literal["thread", "process"], optional
+        The type of pool, by default "thread"
+    initializer : Optional[Callable[[], None]], optional
+        A function that is called once in each worker on start
+
+    Returns
+    -------
+    Executor
+        The pool of workers
+    """
+    check_backend(backend)
+    if backend == "thread":
+        return ThreadPoolExecutor(workers, initializer=initializer)
+    return ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(dataset, initializer))
+
+
+def map_chunks(
+    func: Callable[[Any, Any], Any],
+    dataset: Any,
+    chunks: Iterable[Sequence[int]],
+    workers: Optional[int] = None,
+    backend: Backend = "thread",
+    window: Optional[int] = None,
+    initializer: Optional[Callable[[], None]] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[Any]:
+    """
+    Calls ``func(dataset, chunk)`` for every chunk and yields
+    the results in the order of chunks.
+
+    With ``workers`` the calls are distributed over a pool
+    of threads or processes and run ahead of the consumer. Process workers receive
+    their own copy of the ``dataset`` once on start, only chunks of
+    indices and the results are transferred afterwards, so ``dataset``
+    and the results should be picklable and ``func`` should be defined
+    on the module level.
+
+    Parameters
+    ----------
+    func : Callable[[Any, Any], Any]
+        A function of a dataset and a chunk of indices
+    dataset : Any
+        The object that is passed to ``func`` as is
+    chunks : Iterable[Sequence[int]]
+        Chunks of indices, see ``chunk_indices``
+    workers : Optional[int], optional
+        The number of workers, by default None - calls are made
+        serially in the calling thread
+    backend : Literal["thread", "process"], optional
+        The type of pool, by default "thread"
+    window : Optional[int], optional
+        The maximum number of chunks in flight, by default
+        two per worker. Bounds the memory used by the results
+        that were computed but not yet consumed
+    initializer : Optional[Callable[[], None]], optional
+        A function that is called once in each worker on start,
+        should be picklable for the process backend
+    executor : Optional[Executor], optional
+        A pool created by ``make_executor`` for the same ``dataset``
+        to use instead of a new one, by default None. It is not shut
+        down after the call, ``workers``, ``backend`` and ``initializer``
+        are ignored
+
+    Yields
+    ------
+    Any
+        The result of ``func`` for each chunk
+    """
+    own_executor = executor is None
+    if own_executor:
+        if not workers:
+            for chunk in chunks:
+                yield func(dataset, chunk)
+            return
+        executor = make_executor(dataset, workers, backend, initializer)
+
+    if window is None:
+        window = 2 * (workers or 1)
+
+    if isinstance(executor, ProcessPoolExecutor):
+        call = partial(_call_in_worker, func)
+    else:
+        call = partial(func, dataset)
+
+    futures = deque()
+    try:
+        for chunk in chunks:
+            if len(futures) >= window:
+                yield futures.popleft().result()
+            futures.append(executor.submit(call, chunk))
+        while futures:
+            yield futures.popleft().result()
+    finally:
+        for future in futures:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=True)
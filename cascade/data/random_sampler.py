@@ -16,15 +16,31 @@ limitations under the License.
 
 from typing import Any, Optional
 
-from numpy.random import randint, shuffle
+import numpy as np
 
+from ..base import Meta
 from .dataset import Dataset, T
-from .modifier import Sampler
+from .modifier import IndexSampler, index_dtype
+from .utils import to_uint64
 
 
-class RandomSampler(Sampler[T]):
+class RandomSampler(IndexSampler[T]):
     """
     Shuffles a dataset
+
+    Example
+    -------
+    >>> from cascade.data import RandomSampler, Wrapper
+    >>> ds = Wrapper([1, 2, 3, 4, 5])
+    >>> ds = RandomSampler(ds, seed=0)
+    >>> len(ds)
+    5
+
+    Reshuffle on each epoch, the order is the same for the same
+    seed and epoch, so the shards of the dataset on different nodes
+    stay disjoint
+
+    >>> ds.set_epoch(1)
     """
 
     def __init__(
@@ -32,6 +48,7 @@ class RandomSampler(Sampler[T]):
         dataset: Dataset[T],
         num_samples: Optional[int] = None,
         *args: Any,
+        seed: Optional[int] = None,
         **kwargs: Any
     ) -> None:
         """
@@ -43,16 +60,42 @@ class RandomSampler(Sampler[T]):
             If less or equal than len(dataset) samples without repetitions (shuffles indices)
             If more than len(dataset) generates random integers as indices
             If None, then just shuffles the dataset
+        seed: int, optional
+            The seed of the random generator that is owned by the sampler.
+            The global random state is not used, so if None,
+            the order is different on each run. The order is
+            determined by the seed and the epoch, see ``set_epoch``.
+            Both are recorded in the meta
         """
         if num_samples is None:
             num_samples = len(dataset)
-        if num_samples <= len(dataset):
-            self._indices = [i for i in range(len(dataset))]
-            shuffle(self._indices)
-            self._indices = self._indices[:num_samples]
-        else:
-            self._indices = randint(0, len(dataset), num_samples)
-        super().__init__(dataset, num_samples, *args, **kwargs)
-
-    def __getitem__(self, index: int) -> T:
-        return super().__getitem__(self._indices[index])
+        self._fixed_seed = seed is not None
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1, np.uint64)[0])
+        self._seed = seed
+        self._epoch = 0
+        super().__init__(
+            dataset, self._make_indices(len(dataset), num_samples, seed, 0), *args, **kwargs
+        )
+
+    @staticmethod
+    def _make_indices(length: int, num_samples: int, seed: int, epoch: int) -> np.ndarray:
+        rng = np.random.default_rng([to_uint64(seed), to_uint64(epoch)])
+        if num_samples <= length:
+            # Shuffling int64 is faster, the indices are
+            # packed into the smallest dtype afterwards
+            return rng.permutation(length)[:num_samples]
+        return rng.integers(0, length, num_samples, dtype=index_dtype(length))
+
+    def _indices_for_epoch(self, epoch: int) -> np.ndarray:
+        if epoch == self._epoch:
+            return super()._indices_for_epoch(epoch)
+        self._epoch = epoch
+        return self._make_indices(len(self._dataset), len(self), self._seed, epoch)
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["seed"] = self._seed
+        meta[0]["fixed_seed"] = self._fixed_seed
+        meta[0]["epoch"] = self._epoch
+        return meta
@@ -16,11 +16,13 @@ limitations under the License.
 
 from typing import Any, Optional
 
+import numpy as np
+
 from .dataset import Dataset, T
-from .modifier import Sampler
+from .modifier import IndexSampler
 
 
-class RangeSampler(Sampler[T]):
+class RangeSampler(IndexSampler[T]):
     """
     Implements an interface of standard range in a dataset.
 
@@ -83,16 +85,12 @@ class RangeSampler(Sampler[T]):
             stop = start
             start = 0
 
-        self._indices = [i for i in range(start, stop, step)]
+        indices = np.arange(start, stop, step)
 
-        if len(self._indices) == 0:
+        if len(indices) == 0:
             raise ValueError(
                 f"Given combination of start, stop and step"
                 f"produced empty dataset. Got start = {start}, stop = {stop}, step = {step}"
             )
 
-        super().__init__(dataset, len(self._indices), *args, **kwargs)
-
-    def __getitem__(self, index: int) -> T:
-        internal_index = self._indices[index]
-        return super().__getitem__(internal_index)
+        super().__init__(dataset, indices, *args, **kwargs)
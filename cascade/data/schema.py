@@ -14,12 +14,19 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Any, Optional
+import random
+from typing import Any, List, Optional, Sequence
 
-from .dataset import Dataset
+import numpy as np
+from typing_extensions import Literal
+
+from ..base import Meta
+from .dataset import Dataset, batch_to_list, fetch_batch
 from .modifier import Modifier
 from .validation import SchemaValidator, ValidationError
 
+ValidationPolicy = Literal["always", "once", "first_k", "random"]
+
 
 class SchemaModifier(Modifier):
     """
@@ -73,38 +80,157 @@ class SchemaModifier(Modifier):
     accessed. If it is not ``AnnotImage``, cascade.data.ValidationError
     will be raised.
 
+    Checking every item may be too slow for training loops, ``policy``
+    allows to check each index only once, only the first ``k``
+    items or a random fraction ``p`` of them. When ``get_batch`` of the
+    wrapped dataset is used the items are validated in one call.
     """
 
     in_schema: Optional[Any] = None
 
-    def __getattribute__(self, __name: str) -> Any:
-        if __name == "_dataset" and self.in_schema is not None:
-            return ValidationWrapper(super().__getattribute__(__name), self.in_schema)
-        if __name == "get_meta":
-
-            def get_meta(self):
-                meta = super().get_meta()
-                if self.in_schema:
-                    meta[0]["in_schema"] = self.in_schema.model_json_schema()
-                return meta
+    def __init__(
+        self,
+        dataset: Dataset,
+        *args: Any,
+        policy: ValidationPolicy = "always",
+        k: int = 1000,
+        p: float = 0.1,
+        seed: Optional[int] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : Dataset
+            A dataset to validate and modify
+        policy : Literal["always", "once", "first_k", "random"], optional
+            Which items to validate, by default "always" - all of them.
+            "once" validates each index only the first time it is accessed,
+            "first_k" validates only the first ``k`` accessed items,
+            "random" validates each item with the probability ``p``
+        k : int, optional
+            The number of items for "first_k" policy, by default 1000
+        p : float, optional
+            The probability for "random" policy, by default 0.1
+        seed : Optional[int], optional
+            Seed for "random" policy
+        """
+        if self.in_schema is not None:
+            dataset = ValidationWrapper(
+                dataset, self.in_schema, policy=policy, k=k, p=p, seed=seed
+            )
+        super().__init__(dataset, *args, **kwargs)
 
-            return lambda: get_meta(self)
+    def get_batch(self, indices: Sequence[int]) -> Any:
+        """
+        Passes the batch to the validator in one call
+        if ``__getitem__`` is not overridden
+        """
+        if type(self).__getitem__ is Modifier.__getitem__:
+            return fetch_batch(self._dataset, indices)
+        return super().get_batch(indices)
 
-        return super().__getattribute__(__name)
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        if self.in_schema:
+            meta[0]["in_schema"] = self.in_schema.model_json_schema()
+        return meta
 
 
 class ValidationWrapper(Modifier):
-    def __init__(self, dataset: Dataset, schema: Any, *args: Any, **kwargs: Any) -> None:
+    """
+    Validates the items of the dataset against the schema
+    according to the ``policy``, see ``SchemaModifier``
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        schema: Any,
+        *args: Any,
+        policy: ValidationPolicy = "always",
+        k: int = 1000,
+        p: float = 0.1,
+        seed: Optional[int] = None,
+        **kwargs: Any,
+    ) -> None:
+        if policy not in ("always", "once", "first_k", "random"):
+            raise ValueError(
+                f"policy should be one of always, once, first_k, random, got {policy}"
+            )
+        if k < 0:
+            raise ValueError(f"k should be non-negative, got {k}")
+        if not 0 <= p <= 1:
+            raise ValueError(f"p should be in [0, 1], got {p}")
+
         self.validator = SchemaValidator(schema)
+        self._policy = policy
+        self._k = k
+        self._p = p
+        self._rng = random.Random(seed)
+        self._num_checked = 0
         super().__init__(dataset, *args, **kwargs)
 
+        # One bit for each index that passed validation
+        self._validated = None
+        if policy == "once":
+            self._validated = np.zeros((len(self._dataset) + 7) // 8, dtype=np.uint8)
+
+    def _needs_validation(self, index: Any) -> bool:
+        if self._policy == "always":
+            return True
+        if self._policy == "first_k":
+            self._num_checked += 1
+            return self._num_checked <= self._k
+        if self._policy == "random":
+            return self._rng.random() < self._p
+        position = self._position(index)
+        if position is None:
+            return True
+        return not self._validated[position >> 3] & (1 << (position & 7))
+
+    def _position(self, index: Any) -> Optional[int]:
+        if not isinstance(index, (int, np.integer)):
+            return None
+        index = int(index)
+        return index + len(self._dataset) if index < 0 else index
+
+    def _mark_validated(self, indices: List[Any]) -> None:
+        if self._validated is None:
+            return
+        for index in indices:
+            position = self._position(index)
+            if position is not None:
+                self._validated[position >> 3] |= 1 << (position & 7)
+
     def __getitem__(self, index: Any):
         item = super().__getitem__(index)
-        try:
-            self.validator(item)
-        except ValidationError as e:
-            raise ValidationError(
-                f"Got incorrect input data from {self._dataset}",
-                error_index=index
-            ) from e
+        if self._needs_validation(index):
+            try:
+                self.validator(item)
+            except ValidationError as e:
+                raise ValidationError(
+                    f"Got incorrect input data from {self._dataset}",
+                    error_index=index
+                ) from e
+            self._mark_validated([index])
         return item
+
+    def get_batch(self, indices: Sequence[int]) -> Any:
+        """
+        Validates the items of the batch that need it in one call
+        """
+        batch = fetch_batch(self._dataset, indices)
+        items = batch_to_list(batch)
+        positions = [i for i, index in enumerate(indices) if self._needs_validation(index)]
+        if positions:
+            try:
+                self.validator.validate_many([items[i] for i in positions])
+            except ValidationError as e:
+                index = indices[positions[e.error_index]] if e.error_index is not None else None
+                raise ValidationError(
+                    f"Got incorrect input data from {self._dataset}",
+                    error_index=index
+                ) from e
+            self._mark_validated([indices[i] for i in positions])
+        return batch
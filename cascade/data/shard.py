@@ -0,0 +1,268 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from hashlib import md5
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+import numpy as np
+from typing_extensions import Literal
+
+from ..base import Meta
+from .dataset import Dataset, IteratorDataset, T
+from .modifier import IndexSampler, IteratorModifier
+from .utils import uniform_by_index
+
+ShardMode = Literal["contiguous", "strided", "hashed"]
+
+
+def _check_shard(num_shards: int, shard_id: int) -> None:
+    if num_shards <= 0:
+        raise ValueError(f"num_shards should be positive, got {num_shards}")
+    if not 0 <= shard_id < num_shards:
+        raise ValueError(f"shard_id should be in [0, {num_shards}), got {shard_id}")
+
+
+def _key_shard(key: Any, num_shards: int) -> int:
+    # Stable across processes unlike built-in hash
+    digest = md5(str(key).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little") % num_shards
+
+
+def _index_shards(indices: Any, num_shards: int) -> np.ndarray:
+    return (uniform_by_index((), indices) * num_shards).astype(np.int64)
+
+
+class ShardSampler(IndexSampler[T]):
+    """
+    Takes one of ``num_shards`` disjoint parts of a dataset.
+    Shards with all ids cover the dataset, so each node or worker
+    can build the same pipeline and take its own shard.
+
+    In the "contiguous" mode shards are consecutive ranges of almost
+    equal lengths. In the "strided" mode a shard takes every ``num_shards``-th
+    item starting from ``shard_id``. In the "hashed" mode an item goes
+    to the shard by the hash of its index or, if ``key`` is given, of ``key(item)``.
+    With a key the assignment of an item does not depend on its position,
+    but all items are read on construction and again when ``set_epoch``
+    changes the previous stages
+
+    Example
+    -------
+    >>> from cascade import data as cdd
+    >>> ds = cdd.Wrapper([0, 1, 2, 3, 4])
+    >>> [item for item in cdd.shard(ds, 2, 0)]
+    [0, 1]
+    >>> [item for item in cdd.shard(ds, 2, 1, mode="strided")]
+    [1, 3]
+
+    Shuffle before sharding with the same seed on all nodes to get
+    disjoint random shards, ``set_epoch`` reshuffles consistently
+
+    >>> ds = cdd.RandomSampler(ds, seed=0)
+    >>> ds = cdd.shard(ds, 2, 1)
+    >>> ds.set_epoch(1)
+
+    Shards can be empty if there are more shards than items
+    """
+
+    _allows_empty = True
+
+    def __init__(
+        self,
+        dataset: Dataset[T],
+        num_shards: int,
+        shard_id: int,
+        *args: Any,
+        mode: ShardMode = "contiguous",
+        key: Optional[Callable[[T], Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : Dataset[T]
+            A dataset to shard
+        num_shards : int
+            The total number of shards
+        shard_id : int
+            The id of this shard from 0 to ``num_shards - 1``
+        mode : Literal["contiguous", "strided", "hashed"], optional
+            How to assign items to shards, by default "contiguous"
+        key : Optional[Callable[[T], Any]], optional
+            The function of an item to hash in the "hashed" mode,
+            by default None - the index is hashed
+
+        Raises
+        ------
+        ValueError
+            If the shard parameters or the mode are invalid
+        """
+        _check_shard(num_shards, shard_id)
+        if mode not in ("contiguous", "strided", "hashed"):
+            raise ValueError(
+                f"Only contiguous, strided or hashed modes are supported, got: {mode}"
+            )
+        self._num_shards = num_shards
+        self._shard_id = shard_id
+        self._mode = mode
+        self._key = key
+        # With a key shards depend on the items, not on their positions
+        self._selects_items = mode == "hashed" and key is not None
+        super().__init__(dataset, self._shard(dataset), *args, **kwargs)
+
+    def _shard(self, dataset: Dataset[T]) -> np.ndarray:
+        num_shards, shard_id = self._num_shards, self._shard_id
+        length = len(dataset)
+        if self._mode == "contiguous":
+            return np.arange(
+                length * shard_id // num_shards, length * (shard_id + 1) // num_shards
+            )
+        if self._mode == "strided":
+            return np.arange(shard_id, length, num_shards)
+        if self._key is None:
+            shards = _index_shards(np.arange(length), num_shards)
+        else:
+            shards = np.array([_key_shard(self._key(item), num_shards) for item in dataset])
+        return np.flatnonzero(shards == shard_id)
+
+    def _select(self) -> np.ndarray:
+        if self._key is None:
+            raise RuntimeError(
+                "Cannot shard the changed dataset, key is not kept when ShardSampler is pickled"
+            )
+        return self._shard(self._dataset)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # key is often a lambda, the indices are enough to get items
+        state = self.__dict__.copy()
+        state["_key"] = None
+        return state
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["num_shards"] = self._num_shards
+        meta[0]["shard_id"] = self._shard_id
+        meta[0]["mode"] = self._mode
+        return meta
+
+
+class IteratorShard(IteratorModifier[T]):
+    """
+    Takes one of ``num_shards`` disjoint parts of a stream.
+    Supports "strided" and "hashed" modes of ``ShardSampler``,
+    in the "hashed" mode the position in the stream is hashed
+    if ``key`` is not given
+
+    See also
+    --------
+    cascade.data.ShardSampler
+    """
+
+    def __init__(
+        self,
+        dataset: IteratorDataset[T],
+        num_shards: int,
+        shard_id: int,
+        *args: Any,
+        mode: Literal["strided", "hashed"] = "strided",
+        key: Optional[Callable[[T], Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : IteratorDataset[T]
+            A stream to shard
+        num_shards : int
+            The total number of shards
+        shard_id : int
+            The id of this shard from 0 to ``num_shards - 1``
+        mode : Literal["strided", "hashed"], optional
+            How to assign items to shards, by default "strided"
+        key : Optional[Callable[[T], Any]], optional
+            The function of an item to hash in the "hashed" mode,
+            by default None - the position is hashed
+
+        Raises
+        ------
+        ValueError
+            If the shard parameters or the mode are invalid
+        """
+        _check_shard(num_shards, shard_id)
+        if mode not in ("strided", "hashed"):
+            raise ValueError(
+                f"Only strided or hashed modes are supported for iterators, got: {mode}"
+            )
+        super().__init__(dataset, *args, **kwargs)
+        self._num_shards = num_shards
+        self._shard_id = shard_id
+        self._mode = mode
+        self._key = key
+
+    def __iter__(self) -> Iterator[T]:
+        for position, item in enumerate(self._dataset):
+            if self._mode == "strided":
+                shard = position % self._num_shards
+            elif self._key is None:
+                shard = int(_index_shards([position], self._num_shards)[0])
+            else:
+                shard = _key_shard(self._key(item), self._num_shards)
+            if shard == self._shard_id:
+                yield item
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["num_shards"] = self._num_shards
+        meta[0]["shard_id"] = self._shard_id
+        meta[0]["mode"] = self._mode
+        return meta
+
+
+def shard(
+    dataset: Union[Dataset[T], IteratorDataset[T]],
+    num_shards: int,
+    shard_id: int,
+    mode: Optional[ShardMode] = None,
+    **kwargs: Any,
+) -> Union[ShardSampler[T], IteratorShard[T]]:
+    """
+    Takes one of ``num_shards`` disjoint parts of a dataset or a stream
+
+    Parameters
+    ----------
+    dataset : Union[Dataset[T], IteratorDataset[T]]
+        A dataset or a stream to shard
+    num_shards : int
+        The total number of shards
+    shard_id : int
+        The id of this shard from 0 to ``num_shards - 1``
+    mode : Optional[Literal["contiguous", "strided", "hashed"]], optional
+        How to assign items to shards, by default "contiguous"
+        for datasets and "strided" for streams
+
+    Returns
+    -------
+    Union[ShardSampler[T], IteratorShard[T]]
+        ``ShardSampler`` for datasets and ``IteratorShard`` for streams
+
+    See also
+    --------
+    cascade.data.ShardSampler
+    cascade.data.IteratorShard
+    """
+    if isinstance(dataset, IteratorDataset):
+        return IteratorShard(dataset, num_shards, shard_id, mode=mode or "strided", **kwargs)
+    return ShardSampler(dataset, num_shards, shard_id, mode=mode or "contiguous", **kwargs)
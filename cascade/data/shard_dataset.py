@@ -0,0 +1,355 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import glob
+import json
+import os
+import pickle
+import struct
+import threading
+from bisect import bisect_right
+from typing import (Any, BinaryIO, Dict, Iterator, List, Optional, Sequence,
+                    Tuple)
+
+import numpy as np
+from tqdm import tqdm
+from typing_extensions import Literal
+
+from ..base import JSONEncoder, Meta
+from .dataset import (BaseDataset, Dataset, IteratorWrapper, T, batch_to_list,
+                      fetch_batch)
+from .parallel import chunk_indices, default_chunk_size, map_chunks
+from .streams import IteratorPrefetch
+
+MAGIC = b"CSCDSHRD"
+VERSION = 1
+# Magic and version in the beginning of a file
+_HEADER = struct.Struct("<8sI")
+# Offset and length of the index, offset and length of the meta, magic
+_FOOTER = struct.Struct("<QQQQ8s")
+_PICKLE_PROTOCOL = 4
+
+
+def _shard_name(num: int) -> str:
+    return f"shard_{num:05d}.bin"
+
+
+def _read_chunk(dataset: Dataset[T], chunk: Sequence[int]) -> List[bytes]:
+    items = batch_to_list(fetch_batch(dataset, chunk))
+    return [pickle.dumps(item, protocol=_PICKLE_PROTOCOL) for item in items]
+
+
+class _ShardFile:
+    """
+    Writes records into one shard file
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._tmp_path = path + ".tmp"
+        self._file: BinaryIO = open(self._tmp_path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION))
+        self._offsets = [_HEADER.size]
+
+    @property
+    def size(self) -> int:
+        return self._offsets[-1]
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def write(self, record: bytes) -> None:
+        self._file.write(record)
+        self._offsets.append(self._offsets[-1] + len(record))
+
+    def close(self, meta: bytes) -> None:
+        index = np.asarray(self._offsets, dtype="<u8").tobytes()
+        index_offset = self.size
+        meta_offset = index_offset + len(index)
+        self._file.write(index)
+        self._file.write(meta)
+        self._file.write(_FOOTER.pack(index_offset, len(index), meta_offset, len(meta), MAGIC))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+
+class ShardWriter:
+    """
+    Packs items of a dataset into a few large shard files.
+
+    Items are pickled and written one after another, a shard is closed
+    when it reaches ``shard_size_bytes``. Each shard ends with an index of
+    item offsets and the meta of the pipeline, so it can be read by itself.
+    Reading many small files is slow on any filesystem, read
+    the shards with ``ShardDataset`` instead.
+
+    Example
+    -------
+    >>> from cascade import data as cdd
+    >>> ds = cdd.Wrapper([0, 1, 2, 3])
+    >>> writer = cdd.ShardWriter(ds, "./shards", shard_size_bytes=2 ** 28)  # doctest: +SKIP
+    >>> ds = cdd.ShardDataset("./shards")  # doctest: +SKIP
+
+    See also
+    --------
+    cascade.data.ShardDataset
+    """
+
+    def __init__(
+        self,
+        dataset: BaseDataset[T],
+        out_dir: str,
+        shard_size_bytes: int = 2 ** 28,
+        *,
+        workers: Optional[int] = None,
+        backend: Literal["thread", "process"] = "thread",
+        chunk_size: Optional[int] = None,
+    ) -> None:
+        """
+        Writes the dataset on construction.
+
+        Parameters
+        ----------
+        dataset : BaseDataset[T]
+            A dataset or a stream to write
+        out_dir : str
+            The folder for shards, created if does not exist.
+            Shards written there before are removed
+        shard_size_bytes : int, optional
+            The size of a shard after which the next is started, by default 256 MiB.
+            Each shard has at least one item, so it can be larger for large items
+        workers : Optional[int], optional
+            The number of workers to read and pickle items of sized datasets,
+            by default None - reads in the calling thread
+        backend : Literal["thread", "process"], optional
+            The type of worker pool, by default "thread"
+        chunk_size : Optional[int], optional
+            The number of items that a worker reads at once,
+            by default chosen depending on the number of workers
+
+        Raises
+        ------
+        ValueError
+            If ``shard_size_bytes`` is not positive
+        """
+        if shard_size_bytes <= 0:
+            raise ValueError(f"shard_size_bytes should be positive, got {shard_size_bytes}")
+        self._out_dir = os.path.abspath(out_dir)
+        self._shard_size_bytes = shard_size_bytes
+
+        os.makedirs(self._out_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(self._out_dir, "shard_*.bin")):
+            os.remove(path)
+
+        meta = json.dumps(dataset.get_meta(), cls=JSONEncoder).encode("utf-8")
+        self._paths = self._write(
+            self._records(dataset, workers, backend, chunk_size), meta
+        )
+
+    @staticmethod
+    def _records(
+        dataset: BaseDataset[T],
+        workers: Optional[int],
+        backend: Literal["thread", "process"],
+        chunk_size: Optional[int],
+    ) -> Iterator[bytes]:
+        if not isinstance(dataset, Dataset):
+            for item in tqdm(dataset):
+                yield pickle.dumps(item, protocol=_PICKLE_PROTOCOL)
+            return
+
+        length = len(dataset)
+        if chunk_size is None:
+            chunk_size = default_chunk_size(length, workers)
+        with tqdm(total=length) as pbar:
+            chunks = chunk_indices(length, chunk_size)
+            for records in map_chunks(_read_chunk, dataset, chunks, workers, backend):
+                yield from records
+                pbar.update(len(records))
+
+    def _write(self, records: Iterator[bytes], meta: bytes) -> List[str]:
+        paths = []
+        shard = None
+        try:
+            for record in records:
+                if shard is not None and shard.size + len(record) > self._shard_size_bytes:
+                    shard.close(meta)
+                    paths.append(shard.path)
+                    shard = None
+                if shard is None:
+                    shard = _ShardFile(os.path.join(self._out_dir, _shard_name(len(paths))))
+                shard.write(record)
+            if shard is not None:
+                shard.close(meta)
+                paths.append(shard.path)
+        except BaseException:
+            if shard is not None:
+                shard._file.close()
+                os.remove(shard._tmp_path)
+            raise
+        return paths
+
+    def get_paths(self) -> List[str]:
+        """
+        Returns the paths to the written shards
+        """
+        return self._paths
+
+
+class ShardDataset(Dataset[T]):
+    """
+    Reads the shards written by ``ShardWriter``.
+
+    Random access reads one item with a single call using the offset index.
+    Iteration reads the shards sequentially with large buffers
+    on a background thread, which is much faster on slow storage.
+    The meta of the written pipeline is in the ``data`` field of the meta.
+
+    See also
+    --------
+    cascade.data.ShardWriter
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *args: Any,
+        read_ahead_bytes: int = 2 ** 24,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        path : str
+            The folder with shards
+        read_ahead_bytes : int, optional
+            The size of the buffer for sequential reads, by default 16 MiB
+
+        Raises
+        ------
+        FileNotFoundError
+            If there are no shards in the folder
+        ValueError
+            If a file is not a shard
+        """
+        self._path = os.path.abspath(path)
+        self._paths = sorted(glob.glob(os.path.join(self._path, "shard_*.bin")))
+        if not self._paths:
+            raise FileNotFoundError(f"No shards found in {self._path}")
+        self._read_ahead_bytes = read_ahead_bytes
+
+        self._offsets = []
+        self._data_meta: Meta = []
+        for shard_path in self._paths:
+            offsets, self._data_meta = self._read_footer(shard_path)
+            self._offsets.append(offsets)
+        self._starts = np.cumsum([0] + [len(offsets) - 1 for offsets in self._offsets]).tolist()
+
+        self._files: List[Optional[BinaryIO]] = [None] * len(self._paths)
+        self._lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def _read_footer(path: str) -> Tuple[np.ndarray, Meta]:
+        with open(path, "rb") as f:
+            magic, version = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a shard")
+            if version > VERSION:
+                raise ValueError(f"Shard version {version} of {path} is not supported")
+
+            f.seek(-_FOOTER.size, os.SEEK_END)
+            index_offset, index_length, meta_offset, meta_length, magic = _FOOTER.unpack(
+                f.read(_FOOTER.size)
+            )
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a complete shard")
+
+            f.seek(index_offset)
+            offsets = np.frombuffer(f.read(index_length), dtype="<u8")
+            f.seek(meta_offset)
+            meta = json.loads(f.read(meta_length).decode("utf-8"))
+        return offsets, meta
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(f"Index {index} is out of range for length {length}")
+        shard = bisect_right(self._starts, index) - 1
+        return shard, index - self._starts[shard]
+
+    def _read(self, shard: int, start: int, stop: int) -> bytes:
+        f = self._files[shard]
+        if f is None:
+            with self._lock:
+                if self._files[shard] is None:
+                    self._files[shard] = open(self._paths[shard], "rb")
+                f = self._files[shard]
+        if hasattr(os, "pread"):
+            return os.pread(f.fileno(), stop - start, start)
+        with self._lock:
+            f.seek(start)
+            return f.read(stop - start)
+
+    def __getitem__(self, index: int) -> T:
+        shard, position = self._locate(index)
+        offsets = self._offsets[shard]
+        return pickle.loads(self._read(shard, int(offsets[position]), int(offsets[position + 1])))
+
+    def _iter_records(self) -> Iterator[bytes]:
+        for path, offsets in zip(self._paths, self._offsets):
+            lengths = np.diff(offsets).tolist()
+            with open(path, "rb", buffering=self._read_ahead_bytes) as f:
+                f.seek(int(offsets[0]))
+                for length in lengths:
+                    yield f.read(length)
+
+    def __iter__(self) -> Iterator[T]:
+        records = IteratorPrefetch(IteratorWrapper(self._iter_records()), buffer_size=1024)
+        for record in records:
+            yield pickle.loads(record)
+
+    def __len__(self) -> int:
+        return self._starts[-1]
+
+    def close(self) -> None:
+        """
+        Closes the files opened for random access
+        """
+        with self._lock:
+            for f in self._files:
+                if f is not None:
+                    f.close()
+            self._files = [None] * len(self._paths)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_files"] = [None] * len(self._paths)
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["path"] = self._path
+        meta[0]["num_shards"] = len(self._paths)
+        meta[0]["data"] = self._data_meta
+        return meta
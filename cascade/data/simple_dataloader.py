@@ -14,11 +14,12 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Any, Iterator, List, Sequence
+from typing import Any, Iterator, Sequence
 
 import numpy as np
+from typing_extensions import Literal
 
-from .dataset import T
+from .dataset import T, batch_to_list, fetch_batch
 
 
 class SimpleDataloader:
@@ -26,30 +27,55 @@ class SimpleDataloader:
     Simple batch builder - given a sequence and a size of batch
     breaks it in the subsequences
 
+    If the sequence is a Dataset, uses its ``get_batch``. Batches are lists
+    by default, with ``collate="array"`` batches of array-backed datasets
+    are returned as they are retrieved, for example as arrays
+
     >>> from cascade.data import SimpleDataloader
     >>> dl = SimpleDataloader([0, 1, 2], 2)
     >>> [item for item in dl]
     [[0, 1], [2]]
 
+    See also
+    --------
+    cascade.data.DataLoader
     """
 
-    def __init__(self, data: Sequence[T], batch_size: int = 1) -> None:
+    def __init__(
+        self,
+        data: Sequence[T],
+        batch_size: int = 1,
+        *,
+        collate: Literal["list", "array"] = "list",
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data: Sequence[T]
+            A sequence or a dataset to split into batches
+        batch_size: int, optional
+            The number of items in a batch, by default 1
+        collate: Literal["list", "array"], optional
+            Whether to return batches as lists of items or as returned
+            by ``get_batch`` of the dataset, by default "list"
+        """
         if batch_size == 0:
             raise ValueError("Batch size cannot be 0")
+        if collate not in ("list", "array"):
+            raise ValueError(f"Only list or array collate is supported, got: {collate}")
         if batch_size > len(data):
             batch_size = len(data)
 
         self.data = data
         self._bs = batch_size
+        self._collate = collate
 
-    def __getitem__(self, index: int) -> List[Any]:
-        batch = []
+    def __getitem__(self, index: int) -> Any:
         start_index = index * self._bs
         end_index = min((index + 1) * self._bs, len(self.data))
-
-        for i in range(start_index, end_index):
-            item = self.data[i]
-            batch.append(item)
+        batch = fetch_batch(self.data, range(start_index, end_index))
+        if self._collate == "list":
+            return batch_to_list(batch)
         return batch
 
     def __iter__(self) -> Iterator[T]:
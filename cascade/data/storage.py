@@ -0,0 +1,510 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import pickle
+import sys
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..base import MetaHandler
+
+# (shape, dtype) of an array part of an item or None for an object part
+PartLayout = Optional[Tuple[Tuple[int, ...], np.dtype]]
+Part = Union[np.ndarray, List[Any]]
+
+
+class ArrayStorage:
+    """
+    Stores items of the same layout in contiguous arrays one row per item.
+    The item is either a single ``np.ndarray`` or a tuple. Array parts of
+    tuples with fixed shapes and dtypes are stored in arrays, all other
+    parts are kept in lists.
+
+    Indexing returns views of the rows, not copies.
+    """
+
+    def __init__(self, parts: Sequence[Part], is_tuple: bool) -> None:
+        self._parts = list(parts)
+        self._is_tuple = is_tuple
+
+    @staticmethod
+    def layout(item: Any) -> Optional[List[PartLayout]]:
+        """
+        Returns the list of layouts of the parts of an item
+        or None if the item has no array parts
+        """
+        if isinstance(item, np.ndarray):
+            parts = [item]
+        elif isinstance(item, tuple):
+            parts = item
+        else:
+            return None
+
+        result = [
+            (part.shape, part.dtype)
+            if isinstance(part, np.ndarray) and part.dtype != object
+            else None
+            for part in parts
+        ]
+        if all(part is None for part in result):
+            return None
+        return result
+
+    @classmethod
+    def allocate(
+        cls, item: Any, length: int, allow_objects: bool = False
+    ) -> Optional["ArrayStorage"]:
+        """
+        Allocates storage for ``length`` items of the same layout as ``item``.
+        Returns None if the item cannot be packed.
+
+        Parameters
+        ----------
+        item : Any
+            The sample item
+        length : int
+            The number of items
+        allow_objects : bool, optional
+            Whether to allow tuples with non-array parts, by default False
+        """
+        layout = cls.layout(item)
+        if layout is None or (not allow_objects and None in layout):
+            return None
+        parts = [
+            np.empty((length, *part[0]), dtype=part[1]) if part is not None else []
+            for part in layout
+        ]
+        return cls(parts, isinstance(item, tuple))
+
+    @property
+    def is_tuple(self) -> bool:
+        return self._is_tuple
+
+    def fits(self, item: Any) -> bool:
+        if self._is_tuple:
+            if not isinstance(item, tuple) or len(item) != len(self._parts):
+                return False
+            values = item
+        elif isinstance(item, np.ndarray):
+            values = (item,)
+        else:
+            return False
+
+        for part, value in zip(self._parts, values):
+            if not isinstance(part, np.ndarray):
+                continue
+            if not isinstance(value, np.ndarray):
+                return False
+            if value.shape != part.shape[1:] or value.dtype != part.dtype:
+                return False
+        return True
+
+    def write(self, index: int, item: Any) -> None:
+        values = item if self._is_tuple else (item,)
+        for part, value in zip(self._parts, values):
+            if isinstance(part, np.ndarray):
+                part[index] = value
+            elif index == len(part):
+                part.append(value)
+            else:
+                part[index] = value
+
+    def to_list(self, stop: int) -> List[Any]:
+        """
+        Copies first ``stop`` items into a list of separate objects
+        """
+        return [self._copy_item(i) for i in range(stop)]
+
+    def _copy_item(self, index: int) -> Any:
+        values = tuple(
+            part[index].copy() if isinstance(part, np.ndarray) else part[index]
+            for part in self._parts
+        )
+        return values if self._is_tuple else values[0]
+
+    def __getitem__(self, index: Any) -> Any:
+        if self._is_tuple:
+            return tuple(part[index] for part in self._parts)
+        return self._parts[0][index]
+
+    def __len__(self) -> int:
+        return len(self._parts[0])
+
+    def close(self) -> None:
+        """
+        Releases the resources held by the storage if any
+        """
+
+
+class MemmapStorage(ArrayStorage):
+    """
+    ArrayStorage with array parts kept in ``np.memmap`` files
+    and object parts pickled in a sidecar file. All files
+    are stored in one folder along with the ``index.json``
+    that describes the layout.
+
+    Can grow while being written if the number of items is not known
+    in advance. Is read-only after ``finalize``.
+    """
+
+    index_name = "index.json"
+    objects_name = "objects.pkl"
+
+    def __init__(
+        self,
+        path: str,
+        parts: Sequence[Part],
+        is_tuple: bool,
+        length: Optional[int] = None,
+    ) -> None:
+        super().__init__(parts, is_tuple)
+        self._path = path
+        self._length = length
+
+    @staticmethod
+    def _part_path(path: str, num: int) -> str:
+        return os.path.join(path, f"part_{num}.dat")
+
+    @classmethod
+    def create(cls, path: str, item: Any, capacity: int) -> "MemmapStorage":
+        """
+        Creates memory-mapped files for ``capacity`` items
+        of the same layout as ``item``
+
+        Raises
+        ------
+        ValueError
+            If item has no array parts
+        """
+        layout = cls.layout(item)
+        if layout is None:
+            raise ValueError(
+                f"Can store only arrays or tuples with arrays in memmap, got {type(item)}"
+            )
+
+        os.makedirs(path, exist_ok=True)
+        # The index is written last, so its presence marks a complete storage
+        index_path = os.path.join(path, cls.index_name)
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+        capacity = max(capacity, 1)
+        parts = []
+        for num, part in enumerate(layout):
+            if part is None:
+                parts.append([])
+            else:
+                shape, dtype = part
+                parts.append(
+                    np.memmap(
+                        cls._part_path(path, num),
+                        dtype=dtype,
+                        mode="w+",
+                        shape=(capacity, *shape),
+                    )
+                )
+        return cls(path, parts, isinstance(item, tuple), length=0)
+
+    @classmethod
+    def open(cls, path: str, meta_hash: Optional[str] = None) -> Optional["MemmapStorage"]:
+        """
+        Opens previously finalized storage read-only.
+
+        Returns None if there is no complete storage in the path or
+        if ``meta_hash`` is given and does not match the saved one.
+        """
+        index_path = os.path.join(path, cls.index_name)
+        if not os.path.exists(index_path):
+            return None
+
+        index = MetaHandler.read(index_path)
+        if meta_hash is not None and index.get("meta_hash") != meta_hash:
+            return None
+
+        length = index["length"]
+        objects = None
+        parts = []
+        for num, part in enumerate(index["parts"]):
+            if part is None:
+                if objects is None:
+                    with open(os.path.join(path, cls.objects_name), "rb") as f:
+                        objects = pickle.load(f)
+                parts.append(objects[num])
+            else:
+                shape = (length, *part["shape"])
+                dtype = np.dtype(part["dtype"])
+                if length == 0:
+                    parts.append(np.empty(shape, dtype=dtype))
+                else:
+                    parts.append(
+                        np.memmap(cls._part_path(path, num), dtype=dtype, mode="r", shape=shape)
+                    )
+        return cls(path, parts, index["is_tuple"], length=length)
+
+    def _capacity(self) -> int:
+        for part in self._parts:
+            if isinstance(part, np.ndarray):
+                return len(part)
+        return 0
+
+    def _resize(self, capacity: int) -> None:
+        for num, part in enumerate(self._parts):
+            if not isinstance(part, np.memmap):
+                continue
+            part.flush()
+            shape = part.shape[1:]
+            dtype = part.dtype
+            # The old mapping should be released before the file is truncated
+            self._parts[num] = None
+            del part
+
+            rows = max(capacity, 1)
+            file_path = self._part_path(self._path, num)
+            with open(file_path, "r+b") as f:
+                f.truncate(rows * int(np.prod(shape, dtype=np.int64)) * dtype.itemsize)
+            self._parts[num] = np.memmap(file_path, dtype=dtype, mode="r+", shape=(rows, *shape))
+
+    def write(self, index: int, item: Any) -> None:
+        capacity = self._capacity()
+        if index >= capacity:
+            self._resize(max(2 * capacity, index + 1))
+        super().write(index, item)
+        self._length = max(self._length, index + 1)
+
+    def finalize(self, meta_hash: Optional[str] = None) -> "MemmapStorage":
+        """
+        Trims files to the number of written items, saves the sidecar
+        and the index. Returns the same storage reopened read-only.
+        """
+        length = self._length
+        self._resize(length)
+        for part in self._parts:
+            if isinstance(part, np.memmap):
+                part.flush()
+
+        objects = {
+            num: part for num, part in enumerate(self._parts) if not isinstance(part, np.ndarray)
+        }
+        if objects:
+            with open(os.path.join(self._path, self.objects_name), "wb") as f:
+                pickle.dump(objects, f)
+
+        index = {
+            "length": length,
+            "is_tuple": self._is_tuple,
+            "meta_hash": meta_hash,
+            "parts": [
+                {"shape": list(part.shape[1:]), "dtype": part.dtype.str}
+                if isinstance(part, np.ndarray)
+                else None
+                for part in self._parts
+            ],
+        }
+        self._parts = []
+        MetaHandler.write(os.path.join(self._path, self.index_name), index)
+        return self.open(self._path)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __reduce__(self) -> Any:
+        # Reopen files by path instead of copying mapped data
+        return self.open, (self._path,)
+
+
+_attach_lock = threading.Lock()
+
+
+def _create_block(size: int) -> Any:
+    try:
+        from multiprocessing.shared_memory import SharedMemory
+    except ImportError as e:
+        raise ImportError("Shared memory storage requires python 3.8 or newer") from e
+    return SharedMemory(create=True, size=max(size, 1))
+
+
+def _attach_block(name: str) -> Any:
+    from multiprocessing.shared_memory import SharedMemory
+
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+
+    # Before 3.13 every process that attaches to a block registers it
+    # in the resource tracker which unlinks it when the process exits.
+    # Only the owner should do this, so registration is skipped here.
+    from multiprocessing import resource_tracker
+
+    with _attach_lock:
+        register = resource_tracker.register
+        resource_tracker.register = _skip_register
+        try:
+            return SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _skip_register(name: str, rtype: str) -> None:
+    pass
+
+
+def _release_blocks(blocks: List[Any], owner: bool) -> None:
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            # Some views of the block are still alive, the mapping
+            # will be released with them
+            pass
+        if owner:
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+
+
+@dataclass
+class SharedMemoryHandle:
+    """
+    Picklable description of the ``SharedMemoryStorage``.
+    Holds names of shared memory blocks instead of data, so
+    it is cheap to send to other processes.
+    """
+
+    names: List[Optional[str]]
+    layouts: List[PartLayout]
+    objects: List[Optional[List[Any]]]
+    is_tuple: bool
+    length: int
+
+    def attach(self) -> "SharedMemoryStorage":
+        """
+        Attaches to the blocks by their names without copying the data
+        """
+        return SharedMemoryStorage.attach(self)
+
+
+class SharedMemoryStorage(ArrayStorage):
+    """
+    ArrayStorage with array parts kept in ``multiprocessing.shared_memory``
+    blocks. Object parts are kept in lists and are copied on pickling.
+
+    When pickled, for example when sent to a worker process,
+    only the names of blocks are transferred and the storage is
+    attached to the same memory on the other side.
+
+    The process that created the storage owns the blocks and
+    unlinks them on ``close()`` or when the storage is garbage-collected.
+    Other processes only close their mappings. The owner should
+    outlive the workers that use the storage.
+    """
+
+    def __init__(
+        self,
+        blocks: Sequence[Any],
+        parts: Sequence[Part],
+        is_tuple: bool,
+        length: int,
+        owner: bool,
+    ) -> None:
+        super().__init__(parts, is_tuple)
+        self._blocks = list(blocks)
+        self._length = length
+        self._owner = owner
+        self._finalizer = weakref.finalize(
+            self, _release_blocks, [b for b in self._blocks if b is not None], owner
+        )
+
+    @classmethod
+    def allocate(
+        cls, item: Any, length: int, allow_objects: bool = True
+    ) -> "SharedMemoryStorage":
+        """
+        Creates shared memory blocks for ``length`` items
+        of the same layout as ``item``
+
+        Raises
+        ------
+        ValueError
+            If item has no array parts
+        """
+        layout = cls.layout(item)
+        if layout is None or (not allow_objects and None in layout):
+            raise ValueError(
+                f"Can store only arrays or tuples with arrays in shared memory, got {type(item)}"
+            )
+
+        blocks = []
+        parts = []
+        for part in layout:
+            if part is None:
+                blocks.append(None)
+                parts.append([])
+            else:
+                shape, dtype = part
+                shape = (length, *shape)
+                block = _create_block(int(np.prod(shape, dtype=np.int64)) * dtype.itemsize)
+                blocks.append(block)
+                parts.append(np.ndarray(shape, dtype=dtype, buffer=block.buf))
+        return cls(blocks, parts, isinstance(item, tuple), length, owner=True)
+
+    @classmethod
+    def attach(cls, handle: SharedMemoryHandle) -> "SharedMemoryStorage":
+        blocks = []
+        parts = []
+        for name, layout, objects in zip(handle.names, handle.layouts, handle.objects):
+            if name is None:
+                blocks.append(None)
+                parts.append(objects)
+            else:
+                shape, dtype = layout
+                block = _attach_block(name)
+                blocks.append(block)
+                parts.append(
+                    np.ndarray((handle.length, *shape), dtype=dtype, buffer=block.buf)
+                )
+        return cls(blocks, parts, handle.is_tuple, handle.length, owner=False)
+
+    @property
+    def handle(self) -> SharedMemoryHandle:
+        return SharedMemoryHandle(
+            names=[block.name if block is not None else None for block in self._blocks],
+            layouts=[
+                (part.shape[1:], part.dtype) if isinstance(part, np.ndarray) else None
+                for part in self._parts
+            ],
+            objects=[None if isinstance(part, np.ndarray) else part for part in self._parts],
+            is_tuple=self._is_tuple,
+            length=self._length,
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __reduce__(self) -> Any:
+        return SharedMemoryStorage.attach, (self.handle,)
+
+    def close(self) -> None:
+        """
+        Closes this process' mappings. If the storage is the owner
+        also unlinks the blocks, after which no new process can attach.
+        """
+        self._parts = []
+        self._finalizer()
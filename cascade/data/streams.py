@@ -0,0 +1,454 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import queue
+import threading
+from itertools import islice
+from typing import Any, Callable, Iterator, List, Optional, Sequence
+
+import numpy as np
+from typing_extensions import Literal
+
+from ..base import Meta
+from .dataset import IteratorDataset, T
+from .filter import IteratorFilter
+from .modifier import IteratorModifier
+from .parallel import map_chunks
+from .utils import to_uint64
+
+# Marks the end of the stream or an error in the prefetch queue
+_END = object()
+
+
+def _apply(func: Callable[[Any], Any], item: Any) -> Any:
+    return func(item)
+
+
+class IteratorMap(IteratorModifier[T]):
+    """
+    Applies a function to every item of a stream.
+
+    With ``workers`` the function is applied in a pool of threads or processes,
+    at most ``window`` items are in flight and the order is preserved.
+
+    Example
+    -------
+    >>> from cascade import data as cdd
+    >>> ds = cdd.IteratorWrapper(range(5))
+    >>> ds = cdd.imap(ds, lambda x: x * 2, workers=2)
+    >>> [item for item in ds]
+    [0, 2, 4, 6, 8]
+    """
+
+    def __init__(
+        self,
+        dataset: IteratorDataset[Any],
+        func: Callable[[Any], T],
+        *args: Any,
+        workers: Optional[int] = None,
+        backend: Literal["thread", "process"] = "thread",
+        window: Optional[int] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : IteratorDataset[Any]
+            A stream to map
+        func : Callable[[Any], T]
+            A function to apply to every item
+        workers : Optional[int], optional
+            The number of workers, by default None - applies on the calling thread
+        backend : Literal["thread", "process"], optional
+            The type of pool, by default "thread". Process workers
+            need ``func`` and the items to be picklable
+        window : Optional[int], optional
+            The maximum number of items in flight, by default two per worker
+        """
+        super().__init__(dataset, *args, **kwargs)
+        self._func = func
+        self._workers = workers
+        self._backend = backend
+        self._window = window
+
+    def __iter__(self) -> Iterator[T]:
+        return map_chunks(
+            _apply, self._func, self._dataset, self._workers, self._backend, self._window
+        )
+
+
+class IteratorBatch(IteratorModifier[Any]):
+    """
+    Groups consecutive items of a stream into lists
+
+    Example
+    -------
+    >>> from cascade import data as cdd
+    >>> ds = cdd.ibatch(cdd.IteratorWrapper(range(5)), 2)
+    >>> [item for item in ds]
+    [[0, 1], [2, 3], [4]]
+    """
+
+    def __init__(
+        self,
+        dataset: IteratorDataset[T],
+        batch_size: int,
+        *args: Any,
+        drop_last: bool = False,
+        collate_fn: Optional[Callable[[List[T]], Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : IteratorDataset[T]
+            A stream to batch
+        batch_size : int
+            The number of items in a batch
+        drop_last : bool, optional
+            Whether to skip the last incomplete batch, by default False
+        collate_fn : Optional[Callable[[List[T]], Any]], optional
+            The function to convert the list of items, for example
+            ``cascade.data.dataloader.default_collate``, by default None
+
+        Raises
+        ------
+        ValueError
+            If batch size is not positive
+        """
+        if batch_size <= 0:
+            raise ValueError(f"Batch size should be positive, got {batch_size}")
+        super().__init__(dataset, *args, **kwargs)
+        self._batch_size = batch_size
+        self._drop_last = drop_last
+        self._collate_fn = collate_fn
+
+    def __iter__(self) -> Iterator[Any]:
+        iterator = iter(self._dataset)
+        while True:
+            batch = list(islice(iterator, self._batch_size))
+            if not batch or (self._drop_last and len(batch) < self._batch_size):
+                return
+            yield batch if self._collate_fn is None else self._collate_fn(batch)
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["batch_size"] = self._batch_size
+        meta[0]["drop_last"] = self._drop_last
+        return meta
+
+
+class IteratorShuffle(IteratorModifier[T]):
+    """
+    Approximately shuffles a stream keeping ``buffer_size`` items in memory.
+    Each yielded item is chosen randomly from the buffer and replaced
+    by the next item of the stream.
+
+    The order is reproducible with the seed and
+    different on each iteration, see ``set_epoch``
+    """
+
+    def __init__(
+        self,
+        dataset: IteratorDataset[T],
+        buffer_size: int,
+        *args: Any,
+        seed: Optional[int] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : IteratorDataset[T]
+            A stream to shuffle
+        buffer_size : int
+            The number of items to choose from. The larger
+            the buffer the closer the order to the full shuffle
+        seed : Optional[int], optional
+            The seed of the shuffling, by default chosen randomly.
+            Negative seeds are taken modulo 2 ** 64
+
+        Raises
+        ------
+        ValueError
+            If buffer size is not positive
+        """
+        if buffer_size <= 0:
+            raise ValueError(f"Buffer size should be positive, got {buffer_size}")
+        super().__init__(dataset, *args, **kwargs)
+        self._buffer_size = buffer_size
+        self._fixed_seed = seed is not None
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1, np.uint64)[0])
+        self._seed = seed
+        self._epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """
+        Sets the epoch which order is used on the next iteration.
+        The epoch is incremented after each full iteration
+        """
+        self._epoch = epoch
+
+    def __iter__(self) -> Iterator[T]:
+        epoch = self._epoch
+        rng = np.random.default_rng([to_uint64(self._seed), to_uint64(epoch)])
+        buffer: List[T] = []
+        # Random positions are drawn in blocks to save on calls
+        positions: Sequence[int] = []
+        k = 0
+        for item in self._dataset:
+            if len(buffer) < self._buffer_size:
+                buffer.append(item)
+                continue
+            if k == len(positions):
+                positions = rng.integers(0, self._buffer_size, 1024).tolist()
+                k = 0
+            position = positions[k]
+            k += 1
+            yield buffer[position]
+            buffer[position] = item
+
+        for position in rng.permutation(len(buffer)).tolist():
+            yield buffer[position]
+        self._epoch = epoch + 1
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["buffer_size"] = self._buffer_size
+        meta[0]["seed"] = self._seed
+        meta[0]["fixed_seed"] = self._fixed_seed
+        meta[0]["epoch"] = self._epoch
+        return meta
+
+
+class IteratorSlice(IteratorModifier[T]):
+    """
+    Takes a slice of a stream as ``itertools.islice`` does
+
+    See also
+    --------
+    cascade.data.itake
+    cascade.data.iskip
+    """
+
+    def __init__(
+        self,
+        dataset: IteratorDataset[T],
+        start: int = 0,
+        stop: Optional[int] = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : IteratorDataset[T]
+            A stream to slice
+        start : int, optional
+            The number of items to skip, by default 0
+        stop : Optional[int], optional
+            The index to stop before, by default None - until the end
+        """
+        super().__init__(dataset, *args, **kwargs)
+        self._start = start
+        self._stop = stop
+
+    def __iter__(self) -> Iterator[T]:
+        return islice(self._dataset, self._start, self._stop)
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["start"] = self._start
+        meta[0]["stop"] = self._stop
+        return meta
+
+
+class IteratorPrefetch(IteratorModifier[T]):
+    """
+    Reads a stream on a background thread keeping
+    up to ``buffer_size`` items ready.
+
+    Useful when reading the items involves I/O
+    that can overlap with their processing.
+    Exceptions of the stream are raised in the consumer.
+    """
+
+    def __init__(
+        self, dataset: IteratorDataset[T], buffer_size: int = 1, *args: Any, **kwargs: Any
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : IteratorDataset[T]
+            A stream to read
+        buffer_size : int, optional
+            The maximum number of items read in advance, by default 1
+
+        Raises
+        ------
+        ValueError
+            If buffer size is not positive
+        """
+        if buffer_size <= 0:
+            raise ValueError(f"Buffer size should be positive, got {buffer_size}")
+        super().__init__(dataset, *args, **kwargs)
+        self._buffer_size = buffer_size
+
+    def __iter__(self) -> Iterator[T]:
+        buffer: queue.Queue = queue.Queue(self._buffer_size)
+        stop = threading.Event()
+
+        def put(entry: Any) -> bool:
+            # Returns False if the consumer stopped
+            while not stop.is_set():
+                try:
+                    buffer.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce() -> None:
+            try:
+                for item in self._dataset:
+                    if not put((item, None)):
+                        return
+                put((_END, None))
+            except BaseException as e:
+                put((_END, e))
+
+        thread = threading.Thread(target=produce, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item, error = buffer.get()
+                if item is _END:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            stop.set()
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["buffer_size"] = self._buffer_size
+        meta[0]["seed"] = self._seed
+        meta[0]["fixed_seed"] = self._fixed_seed
+        meta[0]["epoch"] = self._epoch
+        return meta
+
+
+class IteratorInterleave(IteratorDataset[T]):
+    """
+    Takes items from several streams in turn until all of them end
+
+    Example
+    -------
+    >>> from cascade import data as cdd
+    >>> ds = cdd.iinterleave([cdd.IteratorWrapper([0, 2, 4, 5]), cdd.IteratorWrapper([1, 3])])
+    >>> [item for item in ds]
+    [0, 1, 2, 3, 4, 5]
+    """
+
+    def __init__(self, datasets: Sequence[IteratorDataset[T]], *args: Any, **kwargs: Any) -> None:
+        """
+        Parameters
+        ----------
+        datasets : Sequence[IteratorDataset[T]]
+            Streams to interleave
+        """
+        self._datasets = datasets
+        super().__init__(*args, **kwargs)
+
+    def __iter__(self) -> Iterator[T]:
+        iterators = [iter(ds) for ds in self._datasets]
+        while iterators:
+            active = []
+            for iterator in iterators:
+                try:
+                    yield next(iterator)
+                except StopIteration:
+                    continue
+                active.append(iterator)
+            iterators = active
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        meta[0]["data"] = [ds.get_meta() for ds in self._datasets]
+        meta[0]["num_interleaved"] = len(self._datasets)
+        return meta
+
+
+def imap(dataset: IteratorDataset[Any], func: Callable[[Any], T], **kwargs: Any) -> IteratorMap[T]:
+    """
+    Applies ``func`` to every item of a stream, see ``IteratorMap``
+    """
+    return IteratorMap(dataset, func, **kwargs)
+
+
+def ifilter(
+    dataset: IteratorDataset[T], filter_fn: Callable[[T], bool], **kwargs: Any
+) -> IteratorFilter:
+    """
+    Keeps only the items for which ``filter_fn`` is true, see ``IteratorFilter``
+    """
+    return IteratorFilter(dataset, filter_fn, **kwargs)
+
+
+def ibatch(dataset: IteratorDataset[T], batch_size: int, **kwargs: Any) -> IteratorBatch:
+    """
+    Groups consecutive items of a stream into batches, see ``IteratorBatch``
+    """
+    return IteratorBatch(dataset, batch_size, **kwargs)
+
+
+def ishuffle(dataset: IteratorDataset[T], buffer_size: int, **kwargs: Any) -> IteratorShuffle[T]:
+    """
+    Shuffles a stream with a buffer, see ``IteratorShuffle``
+    """
+    return IteratorShuffle(dataset, buffer_size, **kwargs)
+
+
+def iinterleave(datasets: Sequence[IteratorDataset[T]], **kwargs: Any) -> IteratorInterleave[T]:
+    """
+    Takes items from several streams in turn, see ``IteratorInterleave``
+    """
+    return IteratorInterleave(datasets, **kwargs)
+
+
+def itake(dataset: IteratorDataset[T], n: int, **kwargs: Any) -> IteratorSlice[T]:
+    """
+    Takes the first ``n`` items of a stream
+    """
+    return IteratorSlice(dataset, 0, n, **kwargs)
+
+
+def iskip(dataset: IteratorDataset[T], n: int, **kwargs: Any) -> IteratorSlice[T]:
+    """
+    Skips the first ``n`` items of a stream
+    """
+    return IteratorSlice(dataset, n, None, **kwargs)
+
+
+def iprefetch(
+    dataset: IteratorDataset[T], buffer_size: int = 1, **kwargs: Any
+) -> IteratorPrefetch[T]:
+    """
+    Reads a stream on a background thread, see ``IteratorPrefetch``
+    """
+    return IteratorPrefetch(dataset, buffer_size, **kwargs)
@@ -15,13 +15,55 @@ limitations under the License.
 """
 
 from math import floor
-from typing import Optional, Tuple, Union
+from typing import Any, Optional, Tuple, Union
 
+import numpy as np
+
+from ..base.utils import splitmix64
 from .dataset import Dataset, IteratorDataset, T
 from .range_sampler import RangeSampler
 
 DatasetOrIterator = Union[Dataset[T], IteratorDataset[T]]
 
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_UINT64_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def to_uint64(x: int) -> int:
+    """
+    Wraps an integer into [0, 2 ** 64), so that negative
+    and large seeds can be used where unsigned words are expected
+    """
+    return int(x) & _UINT64_MASK
+
+
+def uniform_by_index(key: Tuple[int, ...], indices: Any) -> np.ndarray:
+    """
+    Counter-based random numbers: returns a uniform number in [0, 1)
+    for each index which depends only on the key and the index itself.
+
+    Unlike a sequential generator the result does not depend on the order
+    in which indices are requested or on how they are split between workers.
+
+    Parameters
+    ----------
+    key : Tuple[int, ...]
+        Integers, for example a seed and an epoch. They are taken modulo 2 ** 64
+    indices : Any
+        Integer indices
+
+    Returns
+    -------
+    np.ndarray
+        Array of floats of the same shape as ``indices``
+    """
+    state = np.zeros(1, dtype=np.uint64)
+    for part in key:
+        state = splitmix64(state + _GOLDEN + np.uint64(to_uint64(part)))
+    counters = np.asarray(indices, dtype=np.int64).astype(np.uint64)
+    bits = splitmix64(counters * _GOLDEN + state)
+    return (bits >> np.uint64(11)) * (1.0 / (1 << 53))
+
 
 def split(
     ds: Dataset[T], frac: Optional[float] = 0.5, num: Optional[int] = None
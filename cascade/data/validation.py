@@ -15,9 +15,13 @@ limitations under the License.
 """
 
 import inspect
+import itertools
+import random
+import threading
 from collections import defaultdict
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import (Any, Callable, Dict, List, Optional, Sequence, Tuple,
+                    Union, overload)
 
 from typing_extensions import Literal
 
@@ -51,6 +55,19 @@ class ValidationProvider:
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
         raise NotImplementedError()
 
+    def validate_many(self, items: Sequence[Any]) -> None:
+        """
+        Validates each item. The ``error_index`` of the raised
+        ``ValidationError`` is the position of the first invalid item
+        """
+        for i, item in enumerate(items):
+            try:
+                self(item)
+            except ValidationError as e:
+                raise ValidationError(
+                    "Validation failed, see traceback above", error_index=i
+                ) from e
+
 
 class PydanticValidator(ValidationProvider):
     def __init__(self, schema: Any) -> None:
@@ -65,6 +82,7 @@ class PydanticValidator(ValidationProvider):
         else:
             self._base_model_cls = BaseModel
             self._exc_type = ValidationError
+            self._list_adapter = None
 
     def __call__(self, *args: Any, **kwargs: Any) -> None:
         if (
@@ -84,6 +102,28 @@ class PydanticValidator(ValidationProvider):
             except self._exc_type as e:
                 raise ValidationError("Validation failed, see traceback above") from e
 
+    def validate_many(self, items: Sequence[Any]) -> None:
+        """
+        Validates a list of model instances in one call of ``pydantic``,
+        other items are validated one by one
+        """
+        if not all(isinstance(item, self._base_model_cls) for item in items):
+            super().validate_many(items)
+            return
+
+        if self._list_adapter is None:
+            from pydantic import TypeAdapter
+
+            self._list_adapter = TypeAdapter(List[self._schema])  # type: ignore
+        try:
+            self._list_adapter.validate_python(items)
+        except self._exc_type as e:
+            loc = e.errors()[0]["loc"]
+            position = loc[0] if loc and isinstance(loc[0], int) else None
+            raise ValidationError(
+                "Validation failed, see traceback above", error_index=position
+            ) from e
+
 
 class Validator:
     def __init__(self) -> None:
@@ -94,6 +134,10 @@ class Validator:
         for validator in self._validators:
             validator(*args, **kwargs)
 
+    def validate_many(self, items: Sequence[Any]) -> None:
+        for validator in self._validators:
+            validator.validate_many(items)
+
 
 class SchemaValidator(Validator):
     def __init__(self, schema: Any) -> None:
@@ -143,43 +187,127 @@ class TypesValidator(Validator):
         return "pydantic"
 
 
-def validate_in(f: Callable[..., Any]) -> Callable[..., Any]:
+def _types_of(f: Callable[..., Any]) -> TypeDict:
+    sig = inspect.signature(f)
+    return {
+        key: (
+            param.annotation if param.annotation is not sig.empty else Any,
+            param.default if param.default is not sig.empty else ...,
+        )
+        for key, param in sig.parameters.items()
+    }
+
+
+class _CompiledValidator:
+    """
+    Validates calls of one function. Types are taken once
+    from the signature and the schema is built on the first validated
+    call, so that ``pydantic`` is imported only when it is needed.
+    """
+
+    def __init__(
+        self,
+        types: TypeDict,
+        first_n: Optional[int] = None,
+        sample: Optional[float] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        if first_n is not None and first_n < 0:
+            raise ValueError(f"first_n should be non-negative, got {first_n}")
+        if sample is not None and not 0 <= sample <= 1:
+            raise ValueError(f"sample should be in [0, 1], got {sample}")
+
+        self._types = types
+        self._first_n = first_n
+        self._sample = sample
+        self._rng = random.Random(seed)
+        self._calls = itertools.count()
+        self._validator: Optional[TypesValidator] = None
+        self._lock = threading.Lock()
+
+    def _should_validate(self) -> bool:
+        if self._first_n is not None and next(self._calls) >= self._first_n:
+            return False
+        if self._sample is not None and self._rng.random() >= self._sample:
+            return False
+        return True
+
+    def __call__(self, *args: Any, **kwargs: Any) -> None:
+        if not self._should_validate():
+            return
+        if self._validator is None:
+            with self._lock:
+                if self._validator is None:
+                    self._validator = TypesValidator(self._types)
+        self._validator(*args, **kwargs)
+
+
+@overload
+def validate_in(f: Callable[..., Any]) -> Callable[..., Any]: ...
+
+
+@overload
+def validate_in(
+    f: None = None,
+    *,
+    first_n: Optional[int] = None,
+    sample: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]: ...
+
+
+def validate_in(
+    f: Optional[Callable[..., Any]] = None,
+    *,
+    first_n: Optional[int] = None,
+    sample: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> Union[Callable[..., Any], Callable[[Callable[..., Any]], Callable[..., Any]]]:
     """
     Data validation decorator for callables. In each call
     validates only the input schema using type annotations
     if present. Does not check return value.
 
+    The schema is built once per function. If all arguments are
+    not annotated or annotated with ``Any`` the function
+    is returned as is, since there is nothing to check.
+
+    Can be used as ``@validate_in`` or with options as
+    ``@validate_in(first_n=100)``.
+
     Parameters
     ----------
     f : Callable[[Any], Any]
         Function to wrap
+    first_n : Optional[int], optional
+        Validate only the first ``first_n`` calls, by default None - all calls
+    sample : Optional[float], optional
+        Validate each call with this probability, by default None - all calls
+    seed : Optional[int], optional
+        Seed for sampling the calls
 
     Returns
     -------
     Callable[[Any], Any]
         Decorated function
+
+    Raises
+    ------
+    ValueError
+        If ``first_n`` is negative or ``sample`` is not in [0, 1]
     """
+    if f is None:
+        return lambda func: validate_in(func, first_n=first_n, sample=sample, seed=seed)
+
+    types = _types_of(f)
+    if all(annotation is Any for annotation, _ in types.values()):
+        return f
+
+    validator = _CompiledValidator(types, first_n=first_n, sample=sample, seed=seed)
 
     @wraps(f)
     def wrapper(*args: Any, **kwargs: Any):
-        sig = inspect.signature(f)
-        sig_args = {
-            key: (
-                (
-                    sig.parameters[key].annotation
-                    if sig.parameters[key].annotation is not sig.empty
-                    else Any
-                ),
-                (
-                    sig.parameters[key].default
-                    if sig.parameters[key].annotation is not sig.empty
-                    else ...
-                ),
-            )
-            for key in sig.parameters
-        }
-        v = TypesValidator(sig_args)
-        v(*args, **kwargs)
+        validator(*args, **kwargs)
         return f(*args, **kwargs)
 
     return wrapper
@@ -22,7 +22,7 @@ import pendulum
 from typing_extensions import deprecated
 
 from ..base import Meta, MetaHandler, supported_meta_formats
-from ..base.utils import skeleton
+from ..base.utils import meta_fingerprints, skeleton
 from .dataset import BaseDataset, T
 from .modifier import Modifier
 
@@ -102,16 +102,19 @@ class VersionAssigner(Modifier):
         meta = self._dataset.get_meta()
         pipeline = skeleton(meta)
 
-        meta_str = str(meta)
-        pipeline_str = str(pipeline)
-
         # identify pipeline
-        meta_hash = md5(str.encode(meta_str, "utf-8")).hexdigest()
-        pipe_hash = md5(str.encode(pipeline_str, "utf-8")).hexdigest()
+        pipe_hash, meta_hash = meta_fingerprints(meta)
 
         if os.path.exists(self._root):
             self._versions = MetaHandler.read(self._root)
 
+            if pipe_hash not in self._versions["versions"]:
+                # Logs written by previous versions of cascade store hashes of str(meta)
+                legacy_pipe_hash = md5(str.encode(str(pipeline), "utf-8")).hexdigest()
+                if legacy_pipe_hash in self._versions["versions"]:
+                    pipe_hash = legacy_pipe_hash
+                    meta_hash = md5(str.encode(str(meta), "utf-8")).hexdigest()
+
             if pipe_hash in self._versions["versions"]:
                 if meta_hash in self._versions["versions"][pipe_hash]:
                     self.version = self._versions["versions"][pipe_hash][meta_hash][
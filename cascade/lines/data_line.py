@@ -24,7 +24,7 @@ from typing_extensions import Literal
 from ..base import Meta, MetaHandler
 from ..base.serialization import ObjectHandler
 from ..base.utils import (Version, get_latest_commit_hash, get_python_version,
-                          get_uncommitted_changes, skeleton)
+                          get_uncommitted_changes, meta_fingerprints, skeleton)
 from ..data.dataset import Dataset
 from .disk_line import DiskLine
 
@@ -49,6 +49,19 @@ class DataLine(DiskLine):
                 self._hashes[skel_hash][meta_hash] = Version(name)
 
     def _get_hashes(self, meta: Meta) -> Tuple[str, str]:
+        skel_hash, meta_hash = meta_fingerprints(meta)
+        if skel_hash in self._hashes or not self._hashes:
+            return skel_hash, meta_hash
+
+        # Lines written by previous versions of cascade store hashes
+        # of str(meta), the pipelines saved there keep their versions
+        legacy_skel_hash, legacy_meta_hash = self._get_legacy_hashes(meta)
+        if legacy_skel_hash in self._hashes:
+            return legacy_skel_hash, legacy_meta_hash
+        return skel_hash, meta_hash
+
+    @staticmethod
+    def _get_legacy_hashes(meta: Meta) -> Tuple[str, str]:
         skel = skeleton(meta)
 
         skel_str = str(skel)
@@ -21,11 +21,13 @@ limitations under the License.
 from .data_registrator import Assessor, DataCard, DataRegistrator, LabelingInfo
 from .dataleak_validator import DataleakValidator
 from .diff_viewer import DiffViewer
-from .hashes import numpy_md5
+from .hashes import (hash_array, hash_arrays, hash_object, hash_pandas,
+                     numpy_md5)
 from .history_viewer import HistoryViewer
 from .meta_validator import MetaValidator
 from .meta_viewer import MetaViewer
 from .metric_viewer import MetricViewer
+from .near_duplicate_validator import NearDuplicateValidator
 from .server import Server
 from .validator import (AggregateValidator, DataValidationException,
                         PredicateValidator, Validator)
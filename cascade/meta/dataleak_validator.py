@@ -14,20 +14,41 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Any, Callable, Optional
+import os
+import pickle
+import warnings
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
 
 from tqdm import tqdm
+from typing_extensions import Literal
 
-from ..data.dataset import BaseDataset, T
+from ..base.utils import function_key, is_reproducible, meta_hash
+from ..data.dataset import BaseDataset, Dataset, T, batch_to_list, fetch_batch
+from ..data.parallel import chunk_indices, default_chunk_size, map_chunks
+from ..lines import DataLine
 from .validator import DataValidationException, Validator, prettify_items
 
 
+def _hash_chunk(
+    state: Tuple[BaseDataset[T], Callable[[Any], Hashable]], chunk: Sequence[int]
+) -> List[Hashable]:
+    dataset, hash_fn = state
+    return [hash_fn(item) for item in batch_to_list(fetch_batch(dataset, chunk))]
+
+
 class DataleakValidator(Validator):
     def __init__(
         self,
         train_ds: BaseDataset[T],
         test_ds: BaseDataset[T],
-        hash_fn: Optional[Callable[[Any], str]] = None,
+        hash_fn: Optional[Callable[[Any], Hashable]] = None,
+        *,
+        workers: Optional[int] = None,
+        backend: Literal["thread", "process"] = "thread",
+        chunk_size: Optional[int] = None,
+        index_dir: Union[str, DataLine, None] = None,
+        max_examples: int = 100,
         **kwargs: Any,
     ) -> None:
         """
@@ -36,19 +57,46 @@ class DataleakValidator(Validator):
         Calculates ``hash_fn`` to identify items
         Uses python ``hash`` as default, but can be customized
 
+        Items with equal hashes are found by a hash join, so the time
+        is linear in the total number of items. The hashes of a dataset can be
+        saved into ``index_dir`` and are reused while the meta of the dataset
+        and the hash function do not change, so checking against a new test set
+        computes only its hashes.
+
         Parameters
         ----------
         train_ds : Dataset[T]
             Train dataset
         test_ds : Dataset[T]
             Test or evaluation dataset
-        hash_fn : Optional[Callable[[Any], str]]
+        hash_fn : Optional[Callable[[Any], Hashable]]
             Hash function, by default None
+        workers : Optional[int], optional
+            The number of workers that compute hashes of sized datasets,
+            by default None - in the calling thread
+        backend : Literal["thread", "process"], optional
+            The type of worker pool, by default "thread"
+        chunk_size : Optional[int], optional
+            The number of items hashed by a worker at once,
+            by default chosen depending on the number of workers
+        index_dir : Union[str, DataLine, None], optional
+            The folder to save hashes to, by default None - hashes are not saved.
+            If a ``DataLine`` is passed the hashes of a dataset are saved
+            in the folder of its version if the dataset was saved there.
+            Saved hashes are identified by the meta of the dataset, including
+            the seeds and epochs of random stages, and by the code and captured
+            values of ``hash_fn``. If captured values cannot be hashed or
+            a stage of the dataset has no seed, the hashes are not saved
+        max_examples : int, optional
+            The number of repeating pairs to report, by default 100
 
         Raises
         ------
         DataValidationException
             If identical items found
+        ValueError
+            If ``index_dir`` is used with the builtin ``hash``,
+            which is randomized between runs
 
         Example
         -------
@@ -63,35 +111,115 @@ class DataleakValidator(Validator):
         ...
         cascade.meta.validator.DataValidationException:
         Train and test datasets have 25 repeating pairs
+        5 train items and 5 test items are repeated
         Train indices: 0, 0, 0, 0, 0 ... 4, 4, 4, 4, 4
         Test indices: 0, 1, 2, 3, 4 ... 0, 1, 2, 3, 4
         """
         if hash_fn is None:
+            if index_dir is not None:
+                raise ValueError(
+                    "Builtin hash is randomized between runs and cannot be saved,"
+                    " pass hash_fn to use index_dir"
+                )
             hash_fn = hash
 
-        train_hashes = [
-            hash_fn(item) for item in tqdm(train_ds, desc="Retrieve train data")
-        ]
-        test_hashes = [
-            hash_fn(item) for item in tqdm(test_ds, desc="Retrieve test data")
-        ]
+        super().__init__(train_ds, [], **kwargs)
+
+        hash_args = (hash_fn, workers, backend, chunk_size, index_dir)
+        train_hashes = self._get_hashes(train_ds, "train", *hash_args)
+        test_hashes = self._get_hashes(test_ds, "test", *hash_args)
+
+        test_index: Dict[Hashable, List[int]] = defaultdict(list)
+        for j, test_hash in enumerate(test_hashes):
+            test_index[test_hash].append(j)
 
+        num_pairs = 0
+        train_repeating = 0
+        test_repeating = set()
         train_repeating_idx = []
         test_repeating_idx = []
         for i, train_hash in enumerate(train_hashes):
-            for j, test_hash in enumerate(test_hashes):
-                if train_hash == test_hash:
-                    train_repeating_idx.append(i)
-                    test_repeating_idx.append(j)
-
-        size = len(train_repeating_idx)
-        if size > 0:
+            if train_hash not in test_index:
+                continue
+            same = test_index[train_hash]
+            num_pairs += len(same)
+            train_repeating += 1
+            test_repeating.add(train_hash)
+            for j in same[:max(0, max_examples - len(train_repeating_idx))]:
+                train_repeating_idx.append(i)
+                test_repeating_idx.append(j)
+
+        if num_pairs > 0:
+            num_test = sum(len(test_index[h]) for h in test_repeating)
             raise DataValidationException(
-                f"Train and test datasets have {size} repeating pairs\n"
+                f"Train and test datasets have {num_pairs} repeating pairs\n"
+                f"{train_repeating} train items and {num_test} test items are repeated\n"
                 f"Train indices: {prettify_items(train_repeating_idx)}\n"
                 f"Test indices: {prettify_items(test_repeating_idx)}"
             )
         else:
             print("OK!")
 
-        super().__init__(self, train_ds, **kwargs)
+    @staticmethod
+    def _index_path(
+        ds: BaseDataset[T],
+        hash_fn: Callable[[Any], Hashable],
+        index_dir: Union[str, DataLine, None],
+    ) -> Optional[str]:
+        if index_dir is None:
+            return None
+        meta = ds.get_meta()
+        if not is_reproducible(meta):
+            warnings.warn(
+                "Saved hashes are disabled, the order of the dataset is random "
+                "on each run, pass seeds to the random stages"
+            )
+            return None
+        if isinstance(index_dir, DataLine):
+            index_dir = os.path.join(index_dir.get_root(), str(index_dir.get_version(ds)))
+            if not os.path.isdir(index_dir):
+                return None
+        try:
+            fn_key = function_key(hash_fn)
+        except TypeError as e:
+            warnings.warn(f"Saved hashes are disabled, cannot identify hash_fn: {e}")
+            return None
+        key = meta_hash([meta_hash(meta), fn_key])
+        return os.path.join(index_dir, f"hashes_{key}.pkl")
+
+    def _get_hashes(
+        self,
+        ds: BaseDataset[T],
+        name: str,
+        hash_fn: Callable[[Any], Hashable],
+        workers: Optional[int],
+        backend: Literal["thread", "process"],
+        chunk_size: Optional[int],
+        index_dir: Union[str, DataLine, None],
+    ) -> List[Hashable]:
+        path = self._index_path(ds, hash_fn, index_dir)
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                return pickle.load(f)
+
+        if isinstance(ds, Dataset):
+            length = len(ds)
+            if chunk_size is None:
+                chunk_size = default_chunk_size(length, workers)
+            hashes = []
+            with tqdm(total=length, desc=f"Hashing {name} data") as pbar:
+                chunks = chunk_indices(length, chunk_size)
+                results = map_chunks(_hash_chunk, (ds, hash_fn), chunks, workers, backend)
+                for chunk_hashes in results:
+                    hashes += chunk_hashes
+                    pbar.update(len(chunk_hashes))
+        else:
+            hashes = [hash_fn(item) for item in tqdm(ds, desc=f"Hashing {name} data")]
+
+        if path is not None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(hashes, f)
+            os.replace(tmp_path, path)
+        return hashes
@@ -14,9 +14,264 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import dataclasses
+import hashlib
+import struct
 from hashlib import md5
-from typing import Any
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from typing_extensions import Literal
+
+from ..base.utils import splitmix64
+
+Algorithm = Literal["blake2b", "md5", "xxh3"]
+
+
+def _new_hasher(algorithm: Algorithm) -> Any:
+    if algorithm == "blake2b":
+        return hashlib.blake2b(digest_size=16)
+    elif algorithm == "md5":
+        return hashlib.md5()
+    elif algorithm == "xxh3":
+        try:
+            import xxhash
+        except ImportError as e:
+            raise ImportError(
+                "Cannot import `xxhash` - it is optional dependency for fast hashing"
+                "\nYou can install it with ``pip install xxhash``"
+            ) from e
+        return xxhash.xxh3_128()
+    else:
+        raise ValueError(f"Only blake2b, md5 and xxh3 algorithms are supported, got {algorithm}")
+
+
+def _contiguous_buffer(x: np.ndarray) -> memoryview:
+    # No copy is made for C-contiguous arrays
+    x = np.ascontiguousarray(x)
+    return memoryview(x.reshape(-1).view(np.uint8))
 
 
 def numpy_md5(x: Any) -> str:
-    return md5(x.tobytes()).hexdigest()
+    """
+    Returns md5 of the bytes of an array in C order.
+    The same as ``md5(x.tobytes())``, but does not copy contiguous arrays
+    """
+    return md5(_contiguous_buffer(np.asarray(x))).hexdigest()
+
+
+def hash_array(x: np.ndarray, algorithm: Algorithm = "blake2b") -> str:
+    """
+    Hashes the contents, the dtype and the shape of an array.
+    The memory of C-contiguous arrays is hashed in place without copying.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Array of any dtype except object, see ``hash_object`` for those
+    algorithm : Literal["blake2b", "md5", "xxh3"], optional
+        The hash function, by default "blake2b".
+        "xxh3" is the fastest, but requires ``xxhash`` package
+
+    Returns
+    -------
+    str
+        Hex digest
+    """
+    x = np.asarray(x)
+    if x.dtype.hasobject:
+        return hash_object(x, algorithm)
+    h = _new_hasher(algorithm)
+    _update_array(h, x)
+    return h.hexdigest()
+
+
+def _update_array(h: Any, x: np.ndarray) -> None:
+    h.update(f"{x.dtype.str}{x.shape}".encode("utf-8"))
+    h.update(_contiguous_buffer(x))
+
+
+def hash_arrays(arrays: Sequence[np.ndarray], seed: int = 0) -> np.ndarray:
+    """
+    Hashes many small arrays at once into 64-bit integers.
+
+    Arrays with the same dtype and shape are stacked and hashed
+    together by numpy operations on their words, so the cost of a Python
+    call is paid once per group, not once per array. The hash is not
+    cryptographic, but is stable between runs and platforms with the same byte order.
+
+    Parameters
+    ----------
+    arrays : Sequence[np.ndarray]
+        Arrays to hash, should not have object dtype. If an array
+        is passed its rows are hashed
+    seed : int, optional
+        Seed of the hash, by default 0
+
+    Returns
+    -------
+    np.ndarray
+        Array of ``np.uint64`` with a hash for each input array
+    """
+    if isinstance(arrays, np.ndarray) and not arrays.dtype.hasobject:
+        # Rows of an array are hashed without splitting it
+        return _hash_rows(arrays, seed)
+
+    groups: Dict[Tuple[str, Tuple[int, ...]], List[int]] = {}
+    arrays = [np.asarray(x) for x in arrays]
+    for i, x in enumerate(arrays):
+        if x.dtype.hasobject:
+            raise TypeError("Arrays of objects are not supported, use hash_object")
+        groups.setdefault((x.dtype.str, x.shape), []).append(i)
+
+    result = np.zeros(len(arrays), dtype=np.uint64)
+    for positions in groups.values():
+        result[positions] = _hash_rows(np.stack([arrays[i] for i in positions]), seed)
+    return result
+
+
+def _hash_rows(data: np.ndarray, seed: int) -> np.ndarray:
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    # The dtype and the shape of rows are mixed into the initial state
+    desc = f"{seed}{data.dtype.str}{data.shape[1:]}".encode("utf-8")
+    start = struct.unpack("<Q", hashlib.blake2b(desc, digest_size=8).digest())[0]
+    state = np.full(len(data), start, dtype=np.uint64)
+
+    data = np.ascontiguousarray(data).reshape(len(data), -1).view(np.uint8)
+    padding = -data.shape[1] % 8
+    if padding:
+        data = np.pad(data, ((0, 0), (0, padding)))
+    words = data.view("<u8")
+    with np.errstate(over="ignore"):
+        for column in range(words.shape[1]):
+            state = splitmix64(state ^ words[:, column])
+    return state
+
+
+def hash_pandas(obj: Any, index: bool = True) -> np.ndarray:
+    """
+    Hashes each row of a DataFrame or each item of a Series
+    with ``pd.util.hash_pandas_object``
+
+    Parameters
+    ----------
+    obj : Any
+        DataFrame, Series or Index
+    index : bool, optional
+        Whether to include the index into the hash of a row, by default True
+
+    Returns
+    -------
+    np.ndarray
+        Array of ``np.uint64`` with a hash for each row
+    """
+    import pandas as pd
+
+    return pd.util.hash_pandas_object(obj, index=index).to_numpy()
+
+
+def _update_pandas(h: Any, obj: Any) -> None:
+    import pandas as pd
+
+    h.update(type(obj).__name__.encode("utf-8"))
+    if isinstance(obj, pd.DataFrame):
+        _update(h, [str(column) for column in obj.columns])
+        _update(h, [str(dtype) for dtype in obj.dtypes])
+    elif isinstance(obj, pd.Series):
+        _update(h, [str(obj.name), str(obj.dtype)])
+    elif not isinstance(obj, pd.Index):
+        raise TypeError(f"Cannot hash the object of type {type(obj)}")
+    h.update(_contiguous_buffer(hash_pandas(obj)))
+
+
+def hash_object(obj: Any, algorithm: Algorithm = "blake2b") -> str:
+    """
+    Hashes nested Python structures - numbers, strings, bytes, lists,
+    tuples, dicts, sets, dataclasses, numpy arrays and pandas objects.
+
+    Unlike builtin ``hash`` the result does not change between runs,
+    dicts and sets are hashed regardless of the order of items and values
+    of different types do not collide, so ``1``, ``1.0`` and ``"1"`` have
+    different hashes.
+
+    Parameters
+    ----------
+    obj : Any
+        The object to hash
+    algorithm : Literal["blake2b", "md5", "xxh3"], optional
+        The hash function, by default "blake2b"
+
+    Returns
+    -------
+    str
+        Hex digest
+
+    Raises
+    ------
+    TypeError
+        If there is an object of unsupported type in the structure
+    """
+    h = _new_hasher(algorithm)
+    _update(h, obj)
+    return h.hexdigest()
+
+
+def _digest(obj: Any) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    _update(h, obj)
+    return h.digest()
+
+
+def _update(h: Any, obj: Any) -> None:
+    # Every value is prefixed with the tag of its type and
+    # variable-sized values with their length, so that concatenations are unambiguous
+    if obj is None:
+        h.update(b"N")
+    elif isinstance(obj, (bool, np.bool_)):
+        h.update(b"B1" if obj else b"B0")
+    elif isinstance(obj, (int, np.integer)):
+        h.update(b"I%d;" % int(obj))
+    elif isinstance(obj, (float, np.floating)):
+        h.update(b"F" + float(obj).hex().encode("ascii") + b";")
+    elif isinstance(obj, (complex, np.complexfloating)):
+        parts = (float(obj.real).hex(), float(obj.imag).hex())
+        h.update(b"C%s,%s;" % (parts[0].encode("ascii"), parts[1].encode("ascii")))
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        h.update(b"S%d;" % len(data))
+        h.update(data)
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        data = memoryview(obj).cast("B")
+        h.update(b"Y%d;" % len(data))
+        h.update(data)
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"%s%d;" % (b"L" if isinstance(obj, list) else b"T", len(obj)))
+        for item in obj:
+            _update(h, item)
+    elif isinstance(obj, dict):
+        h.update(b"D%d;" % len(obj))
+        for key, value in sorted((_digest(key), _digest(value)) for key, value in obj.items()):
+            h.update(key)
+            h.update(value)
+    elif isinstance(obj, (set, frozenset)):
+        h.update(b"E%d;" % len(obj))
+        for item in sorted(_digest(item) for item in obj):
+            h.update(item)
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            h.update(b"O%s;" % str(obj.shape).encode("ascii"))
+            for item in obj.reshape(-1):
+                _update(h, item)
+        else:
+            h.update(b"A")
+            _update_array(h, obj)
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        h.update(b"R")
+        _update(h, type(obj).__qualname__)
+        _update(h, {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)})
+    elif type(obj).__module__.startswith("pandas"):
+        h.update(b"P")
+        _update_pandas(h, obj)
+    else:
+        raise TypeError(f"Cannot hash the object of type {type(obj)}")
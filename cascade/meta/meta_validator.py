@@ -22,6 +22,7 @@ from deepdiff import DeepDiff
 from typing_extensions import Literal
 
 from ..base import Meta, MetaHandler, supported_meta_formats
+from ..base.utils import meta_hash
 from ..data.dataset import BaseDataset, T
 from .validator import DataValidationException, Validator
 
@@ -60,8 +61,9 @@ class MetaValidator(Validator):
     On the second run of the pipeline it computes pipeline's meta and then
     meta's hash based on the names of blocks. This is needed to check if
     pipeline structure is changed.
-    If it founds that pipeline has the same structure, then meta dicts are
-    compared using ``deepdiff`` and if everything is ok it returns.
+    If it founds that pipeline has the same structure, then the fingerprint of meta
+    is compared with the one saved alongside the meta file. Only if they differ meta
+    dicts are compared using ``deepdiff`` to find what changed.
 
     If the structure of pipeline is different it saves new meta file.
 
@@ -103,22 +105,61 @@ class MetaValidator(Validator):
         meta = self._dataset.get_meta()
         name = md5(str.encode(" ".join([m["name"] for m in meta]), "utf-8")).hexdigest()
         name += meta_fmt
-        name = os.path.join(self._root, name)
+        self._name = os.path.join(self._root, name)
+        self._base_meta = None
 
-        if os.path.exists(name):
-            self.base_meta = self._load(name)
+        if os.path.exists(self._name):
             self._check(meta)
         else:
-            self._save(meta, name)
+            self._save(meta, self._name)
+
+    @property
+    def base_meta(self) -> Optional[Meta]:
+        """
+        Saved meta of the pipeline, is read from disk on first access
+        """
+        if self._base_meta is None and os.path.exists(self._name):
+            self._base_meta = self._load(self._name)
+        return self._base_meta
+
+    @base_meta.setter
+    def base_meta(self, meta: Meta) -> None:
+        self._base_meta = meta
+
+    def _fingerprint_path(self, name: str) -> str:
+        return os.path.splitext(name)[0] + ".fingerprint"
 
     def _save(self, meta: Meta, name: str) -> None:
         MetaHandler.write(name, meta)
+        self._save_fingerprint(meta_hash(meta), name)
         print(f"Saved as {name}!")
 
+    def _save_fingerprint(self, fingerprint: str, name: str) -> None:
+        with open(self._fingerprint_path(name), "w") as f:
+            f.write(fingerprint)
+
     def _load(self, name: str) -> Meta:
         return MetaHandler.read(name)
 
+    def _load_fingerprint(self, name: str) -> Optional[str]:
+        path = self._fingerprint_path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return f.read().strip()
+
     def _check(self, query_meta: Meta) -> None:
+        query_hash = meta_hash(query_meta)
+        base_hash = self._load_fingerprint(self._name)
+        if base_hash is None:
+            # Meta saved before fingerprints were introduced
+            base_hash = meta_hash(self.base_meta)
+            self._save_fingerprint(base_hash, self._name)
+
+        if query_hash == base_hash:
+            print("OK!")
+            return
+
         diff = DeepDiff(self.base_meta, query_meta, verbose_level=2)
         if len(diff):
             print(diff.pretty())
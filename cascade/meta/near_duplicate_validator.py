@@ -0,0 +1,390 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+    http://www.apache.org/licenses/LICENSE-2.0
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import warnings
+import zlib
+from typing import (Any, Callable, Hashable, Iterable, Iterator, Optional,
+                    Sequence, Tuple)
+
+import numpy as np
+from tqdm import tqdm
+from typing_extensions import Literal
+
+from ..data.dataset import BaseDataset, Dataset, T, batch_to_list, fetch_batch
+from ..data.parallel import chunk_indices
+from .validator import DataValidationException, Validator, prettify_items
+
+# Odd constant for combining the rows of a band into one key
+_FOLD_PRIME = np.uint64(0x9E3779B97F4A7C15)
+
+# The maximal number of hash values that MinHasher keeps at once
+_MAX_HASH_VALUES = 2 ** 22
+
+
+def shingles(item: Any, size: int = 5) -> Iterable[Hashable]:
+    """
+    Default tokens for MinHash. Strings are split into
+    overlapping substrings of ``size`` characters, other items
+    are treated as collections of tokens
+    """
+    if isinstance(item, str):
+        if len(item) <= size:
+            return {item}
+        return {item[i: i + size] for i in range(len(item) - size + 1)}
+    return set(item)
+
+
+class MinHasher:
+    """
+    Computes MinHash signatures of token sets. The share of equal values
+    in two signatures estimates the Jaccard similarity of the sets.
+    Uses multiply-shift hashing, so the signatures of a batch
+    are computed with a few numpy operations.
+    """
+
+    def __init__(self, num_hashes: int = 128, seed: int = 0) -> None:
+        rng = np.random.default_rng(seed)
+        # Multipliers should be odd
+        self._a = rng.integers(0, 2 ** 63, num_hashes, dtype=np.uint64)
+        self._a = self._a * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_hashes, dtype=np.uint64)
+
+    @staticmethod
+    def _token_hash(token: Hashable) -> int:
+        data = token if isinstance(token, bytes) else str(token).encode("utf-8")
+        return zlib.crc32(data)
+
+    def __call__(self, token_sets: Sequence[Iterable[Hashable]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the signatures of the shape ``(len(token_sets), num_hashes)``
+        and the mask of non-empty sets. Signatures of empty sets are meaningless
+        """
+        hashes = [
+            np.fromiter(map(self._token_hash, tokens), dtype=np.uint64) for tokens in token_sets
+        ]
+        counts = np.array([len(h) for h in hashes], dtype=np.int64)
+        signatures = np.full((len(hashes), len(self._a)), np.iinfo(np.uint32).max, dtype=np.uint32)
+        nonempty = counts > 0
+        if not nonempty.any():
+            return signatures, nonempty
+
+        tokens = np.concatenate(hashes)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+        # Hash functions are applied in groups to bound the memory by
+        # the number of tokens. They go along the first axis, so that the minimum
+        # over the tokens of each set is taken over contiguous memory
+        group = max(1, _MAX_HASH_VALUES // len(tokens))
+        for start in range(0, len(self._a), group):
+            a = self._a[start: start + group, None]
+            b = self._b[start: start + group, None]
+            with np.errstate(over="ignore"):
+                values = (a * tokens[None, :] + b) >> np.uint64(32)
+            signatures[nonempty, start: start + group] = (
+                np.minimum.reduceat(values, starts, axis=1).T.astype(np.uint32)
+            )
+        return signatures, nonempty
+
+    @staticmethod
+    def collision_probability(similarity: float) -> float:
+        return similarity
+
+    @staticmethod
+    def similarity(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        return (left == right).mean(axis=1)
+
+
+class SimHasher:
+    """
+    Computes SimHash signatures of numeric vectors - the signs of
+    projections on random hyperplanes. The share of different bits
+    in two signatures estimates the angle between the vectors.
+    """
+
+    def __init__(self, num_hashes: int = 128, seed: int = 0) -> None:
+        self._num_hashes = num_hashes
+        self._seed = seed
+        self._planes: Optional[np.ndarray] = None
+
+    def __call__(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the signatures of the shape ``(len(vectors), num_hashes)``
+        and the mask of non-zero vectors
+        """
+        vectors = np.asarray(vectors, dtype=np.float64).reshape(len(vectors), -1)
+        if self._planes is None:
+            rng = np.random.default_rng(self._seed)
+            self._planes = rng.standard_normal((vectors.shape[1], self._num_hashes))
+        elif self._planes.shape[0] != vectors.shape[1]:
+            raise ValueError(
+                f"All vectors should have {self._planes.shape[0]} features, got {vectors.shape[1]}"
+            )
+        signatures = (vectors @ self._planes > 0).astype(np.uint8)
+        return signatures, np.any(vectors != 0, axis=1)
+
+    @staticmethod
+    def collision_probability(similarity: float) -> float:
+        return 1 - np.arccos(np.clip(similarity, -1, 1)) / np.pi
+
+    @staticmethod
+    def similarity(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        return np.cos(np.pi * (left != right).mean(axis=1))
+
+
+def choose_bands(num_hashes: int, probability: float) -> int:
+    """
+    Chooses the number of LSH bands so that pairs with
+    the collision ``probability`` of single hashes become candidates
+    in at least one band with the probability about one half
+    """
+    best = num_hashes
+    for bands in range(1, num_hashes + 1):
+        if num_hashes % bands:
+            continue
+        rows = num_hashes // bands
+        if (1 / bands) ** (1 / rows) <= probability:
+            return bands
+    return best
+
+
+def band_keys(signatures: np.ndarray, bands: int) -> np.ndarray:
+    """
+    Combines the rows of each band of signatures into one 64-bit key,
+    returns the array of the shape ``(len(signatures), bands)``
+    """
+    rows = signatures.shape[1] // bands
+    banded = signatures[:, : bands * rows].reshape(len(signatures), bands, rows).astype(np.uint64)
+    keys = np.zeros((len(signatures), bands), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for row in range(rows):
+            keys = (keys ^ banded[:, :, row]) * _FOLD_PRIME
+    return keys
+
+
+def candidate_pairs(
+    train_keys: np.ndarray, test_keys: np.ndarray, max_bucket_size: Optional[int] = None
+) -> np.ndarray:
+    """
+    Finds the pairs of train and test items that have equal keys
+    in at least one band. Returns unique pairs as the array of shape ``(n, 2)``.
+
+    The number of pairs in a bucket of equal keys grows quadratically, so buckets
+    with more than ``max_bucket_size`` train and test items are skipped with a warning
+    """
+    pairs = []
+    skipped = 0
+    for band in range(train_keys.shape[1]):
+        order = np.argsort(train_keys[:, band], kind="stable")
+        sorted_keys = train_keys[order, band]
+        lo = np.searchsorted(sorted_keys, test_keys[:, band], side="left")
+        hi = np.searchsorted(sorted_keys, test_keys[:, band], side="right")
+        counts = hi - lo
+        if not counts.any():
+            continue
+        if max_bucket_size is not None:
+            _, inverse, test_counts = np.unique(
+                test_keys[:, band], return_inverse=True, return_counts=True
+            )
+            oversized = counts + test_counts[inverse.ravel()] > max_bucket_size
+            oversized &= counts > 0
+            if oversized.any():
+                skipped += len(np.unique(test_keys[oversized, band]))
+                counts = np.where(oversized, 0, counts)
+                if not counts.any():
+                    continue
+        test_idx = np.repeat(np.arange(len(test_keys)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        train_idx = order[np.repeat(lo, counts) + offsets]
+        # Pairs are encoded as single numbers to find unique ones faster
+        pairs.append(train_idx.astype(np.int64) * len(test_keys) + test_idx)
+    if skipped:
+        warnings.warn(
+            f"{skipped} buckets with more than {max_bucket_size} items were skipped,"
+            " the pairs in them are not checked. Many identical items may be found"
+            " with DataleakValidator"
+        )
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs))
+    pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+    return np.stack(np.divmod(pairs, len(test_keys)), axis=1)
+
+
+class NearDuplicateValidator(Validator):
+    """
+    Checks if test dataset has items that are similar to the items of train dataset,
+    for example resized images or edited texts, which exact hashes miss.
+
+    Items are turned into short signatures - MinHash of token sets or SimHash
+    of numeric vectors. Signatures are split into bands and the pairs that
+    match in any band are compared, which takes sub-quadratic time.
+    Pairs with the estimated similarity not less than ``threshold`` are reported.
+
+    Example
+    -------
+    >>> from cascade.data import Wrapper
+    >>> from cascade.meta import NearDuplicateValidator
+    >>> train_ds = Wrapper(["the quick brown fox jumps over the lazy dog"])
+    >>> test_ds = Wrapper(["the quick brown fox jumped over the lazy dog"])
+    >>> NearDuplicateValidator(train_ds, test_ds, threshold=0.5)
+    Traceback (most recent call last):
+    ...
+    cascade.meta.validator.DataValidationException:
+    Train and test datasets have 1 similar pairs
+    Train indices: [0]
+    Test indices: [0]
+    """
+
+    def __init__(
+        self,
+        train_ds: BaseDataset[T],
+        test_ds: BaseDataset[T],
+        *,
+        method: Literal["minhash", "simhash"] = "minhash",
+        threshold: float = 0.8,
+        num_hashes: int = 128,
+        bands: Optional[int] = None,
+        tokenize: Optional[Callable[[Any], Iterable[Hashable]]] = None,
+        features: Optional[Callable[[Any], np.ndarray]] = None,
+        chunk_size: int = 1024,
+        max_bucket_size: Optional[int] = 1000,
+        max_examples: int = 100,
+        seed: int = 0,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        train_ds : BaseDataset[T]
+            Train dataset
+        test_ds : BaseDataset[T]
+            Test or evaluation dataset
+        method : Literal["minhash", "simhash"], optional
+            "minhash" for items that are sets of tokens like texts and
+            "simhash" for numeric vectors like embeddings, by default "minhash"
+        threshold : float, optional
+            The minimal similarity of reported pairs, by default 0.8. Jaccard
+            similarity of token sets for "minhash" and cosine for "simhash"
+        num_hashes : int, optional
+            The length of signatures, by default 128
+        bands : Optional[int], optional
+            The number of LSH bands, should divide ``num_hashes``. By default
+            chosen depending on ``threshold``. More bands find more candidate pairs
+        tokenize : Optional[Callable[[Any], Iterable[Hashable]]], optional
+            Turns an item into tokens for "minhash", by default strings
+            are split into substrings of 5 characters
+        features : Optional[Callable[[Any], np.ndarray]], optional
+            Turns an item into a vector for "simhash", by default
+            the item is flattened. All vectors should have the same length.
+            Vectors should be centered, since SimHash measures angles
+        chunk_size : int, optional
+            The number of items that are hashed at once, by default 1024
+        max_bucket_size : Optional[int], optional
+            The maximal number of train and test items with the same key in a band,
+            by default 1000. Larger buckets, for example of boilerplate texts,
+            are skipped with a warning. None compares all pairs in buckets
+        max_examples : int, optional
+            The number of similar pairs to report, by default 100
+        seed : int, optional
+            Seed of hash functions, by default 0
+
+        Raises
+        ------
+        DataValidationException
+            If similar items found
+        ValueError
+            If the method is unknown or bands do not divide ``num_hashes``
+        """
+        if method == "minhash":
+            self._hasher = MinHasher(num_hashes, seed)
+            self._tokenize = tokenize if tokenize is not None else shingles
+        elif method == "simhash":
+            self._hasher = SimHasher(num_hashes, seed)
+            self._features = features
+        else:
+            raise ValueError(f"Only minhash and simhash methods are supported, got {method}")
+
+        if bands is None:
+            bands = choose_bands(num_hashes, self._hasher.collision_probability(threshold))
+        if num_hashes % bands:
+            raise ValueError(f"bands should divide num_hashes {num_hashes}, got {bands}")
+
+        self._method = method
+        super().__init__(train_ds, [], **kwargs)
+
+        train_signatures, train_valid = self._signatures(train_ds, chunk_size, "train")
+        test_signatures, test_valid = self._signatures(test_ds, chunk_size, "test")
+
+        train_keys = band_keys(train_signatures, bands)
+        test_keys = band_keys(test_signatures, bands)
+        pairs = candidate_pairs(
+            train_keys[train_valid], test_keys[test_valid], max_bucket_size
+        )
+        pairs = np.stack(
+            (np.flatnonzero(train_valid)[pairs[:, 0]], np.flatnonzero(test_valid)[pairs[:, 1]]),
+            axis=1,
+        )
+
+        similar = []
+        for start in range(0, len(pairs), 2 ** 16):
+            chunk = pairs[start: start + 2 ** 16]
+            similarity = self._hasher.similarity(
+                train_signatures[chunk[:, 0]], test_signatures[chunk[:, 1]]
+            )
+            similar.append(chunk[similarity >= threshold])
+        similar = np.concatenate(similar) if similar else np.zeros((0, 2), dtype=np.int64)
+
+        if len(similar):
+            examples = similar[:max_examples]
+            raise DataValidationException(
+                f"Train and test datasets have {len(similar)} similar pairs\n"
+                f"Train indices: {prettify_items(examples[:, 0].tolist())}\n"
+                f"Test indices: {prettify_items(examples[:, 1].tolist())}"
+            )
+        else:
+            print("OK!")
+
+    def _prepare(self, batch: Any) -> Any:
+        if self._method == "minhash":
+            return [self._tokenize(item) for item in batch_to_list(batch)]
+        if self._features is None and isinstance(batch, np.ndarray):
+            return batch.reshape(len(batch), -1)
+        features = self._features if self._features is not None else np.ravel
+        return np.stack([np.ravel(features(item)) for item in batch_to_list(batch)])
+
+    def _batches(self, ds: BaseDataset[T], chunk_size: int) -> Iterator[Any]:
+        if isinstance(ds, Dataset):
+            for chunk in chunk_indices(len(ds), chunk_size):
+                yield fetch_batch(ds, chunk)
+            return
+
+        items = []
+        for item in ds:
+            items.append(item)
+            if len(items) == chunk_size:
+                yield items
+                items = []
+        if items:
+            yield items
+
+    def _signatures(
+        self, ds: BaseDataset[T], chunk_size: int, name: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        signatures = []
+        valid = []
+        for items in tqdm(self._batches(ds, chunk_size), desc=f"Hashing {name} data"):
+            batch_signatures, batch_valid = self._hasher(self._prepare(items))
+            signatures.append(batch_signatures)
+            valid.append(batch_valid)
+        if not signatures:
+            return np.zeros((0, 0)), np.zeros(0, dtype=bool)
+        return np.concatenate(signatures), np.concatenate(valid)
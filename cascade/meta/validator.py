@@ -11,13 +11,17 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Any, Callable, Dict, List, NoReturn, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import (Any, Callable, Iterator, List, NoReturn, Optional,
+                    Sequence, Tuple, Union)
 
+import numpy as np
 from tqdm import tqdm
-from typing_extensions import deprecated
+from typing_extensions import Literal, deprecated
 
-from ..data.dataset import BaseDataset, T
+from ..data.dataset import BaseDataset, Dataset, T, batch_to_list, fetch_batch
 from ..data.modifier import Modifier
+from ..data.parallel import chunk_indices, default_chunk_size, map_chunks
 
 
 class DataValidationException(Exception):
@@ -66,14 +70,37 @@ class AggregateValidator(Validator[T]):
     """
 
     def __init__(
-        self, dataset: BaseDataset[T], func: Callable[[BaseDataset[T]], bool], **kwargs
+        self,
+        dataset: BaseDataset[T],
+        func: Callable[[BaseDataset[T]], bool],
+        *,
+        workers: Optional[int] = None,
+        **kwargs: Any,
     ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : BaseDataset[T]
+            A dataset to check
+        func : Callable[[BaseDataset[T]], bool]
+            A function of the dataset or a list of them
+        workers : Optional[int], optional
+            The number of threads that run the checks at once,
+            by default None - one after another
+
+        Raises
+        ------
+        DataValidationException
+            If any of the checks returned False
+        """
         super().__init__(dataset, func, **kwargs)
 
-        bad_results = []
-        for i, func in enumerate(self._func):
-            if not func(self._dataset):
-                bad_results.append(i)
+        if workers:
+            with ThreadPoolExecutor(workers) as executor:
+                results = list(executor.map(lambda f: f(self._dataset), self._func))
+        else:
+            results = [f(self._dataset) for f in self._func]
+        bad_results = [i for i, result in enumerate(results) if not result]
 
         if len(bad_results):
             raise DataValidationException(f"Checks in positions {bad_results} failed")
@@ -81,44 +108,194 @@ class AggregateValidator(Validator[T]):
             print("OK!")
 
 
+def _check_chunk(
+    state: Tuple[BaseDataset[T], List[Callable[[Any], Any]], bool], chunk: Sequence[int]
+) -> List[np.ndarray]:
+    dataset, funcs, vectorized = state
+    batch = fetch_batch(dataset, chunk)
+    return _check_batch(batch, np.asarray(chunk, dtype=np.int64), funcs, vectorized)
+
+
+def _check_batch(
+    batch: Any, indices: np.ndarray, funcs: List[Callable[[Any], Any]], vectorized: bool
+) -> List[np.ndarray]:
+    if not vectorized:
+        batch = batch_to_list(batch)
+    bad = []
+    for func in funcs:
+        if vectorized:
+            mask = np.asarray(func(batch), dtype=bool)
+            if mask.shape != indices.shape:
+                raise ValueError(
+                    f"Vectorized check should return a mask of shape {indices.shape},"
+                    f" got {mask.shape}"
+                )
+        else:
+            mask = np.fromiter((bool(func(item)) for item in batch), dtype=bool, count=len(batch))
+        bad.append(indices[~mask])
+    return bad
+
+
+class _FailedItems:
+    """
+    Counts the indices of items that failed a check and keeps
+    a uniform random sample of at most ``size`` of them
+    """
+
+    def __init__(self, size: int, rng: np.random.Generator) -> None:
+        self.count = 0
+        self._size = size
+        self._rng = rng
+        self._sample = np.zeros(0, dtype=np.int64)
+
+    def add(self, indices: np.ndarray) -> None:
+        free = max(0, self._size - len(self._sample))
+        self._sample = np.concatenate((self._sample, indices[:free]))
+        rest = indices[free:]
+        if len(rest):
+            # Reservoir sampling: n-th item replaces a random one with probability size / n
+            seen = np.arange(self.count + free + 1, self.count + len(indices) + 1)
+            slots = self._rng.integers(0, seen)
+            replace = slots < self._size
+            self._sample[slots[replace]] = rest[replace]
+        self.count += len(indices)
+
+    def examples(self) -> List[int]:
+        return np.sort(self._sample).tolist()
+
+
 class PredicateValidator(Validator[T]):
     """
     This validator accepts function that is applied to each item in a dataset
     and returns ``True`` or ``False``. Calls ``__getitem__``s of all previous
     datasets in ``__init__``.
 
+    Items of sized datasets are read by chunks, which can be checked by a pool
+    of workers. Vectorized checks accept the whole chunk as returned by ``get_batch``
+    and return the boolean mask of good items. Only the number of failed items
+    and a random sample of their indices are kept.
+
     Example
     -------
     >>> from cascade.data import Wrapper
     >>> ds = Wrapper([1, 2, 3, 4, 5])
     >>> ds = PredicateValidator(ds, lambda x: x < 6)
+    >>> import numpy as np
+    >>> ds = Wrapper(np.arange(1000))
+    >>> ds = PredicateValidator(ds, lambda batch: batch >= 0, vectorized=True, workers=4)
     """
 
     def __init__(
         self,
         dataset: BaseDataset[T],
         func: Union[Callable[[T], bool], List[Callable[[T], bool]]],
+        *,
+        vectorized: bool = False,
+        workers: Optional[int] = None,
+        backend: Literal["thread", "process"] = "thread",
+        chunk_size: Optional[int] = None,
+        max_failures: Optional[int] = None,
+        max_examples: int = 100,
+        seed: Optional[int] = None,
         **kwargs: Any,
     ) -> None:
+        """
+        Parameters
+        ----------
+        dataset : BaseDataset[T]
+            A dataset to check
+        func : Union[Callable[[T], bool], List[Callable[[T], bool]]]
+            A check or a list of them
+        vectorized : bool, optional
+            Whether checks accept a batch of items and return a boolean mask,
+            by default False
+        workers : Optional[int], optional
+            The number of workers for sized datasets,
+            by default None - checks in the calling thread
+        backend : Literal["thread", "process"], optional
+            The type of worker pool, by default "thread". The dataset and
+            the checks should be picklable for "process"
+        chunk_size : Optional[int], optional
+            The number of items in a chunk,
+            by default chosen depending on the number of workers
+        max_failures : Optional[int], optional
+            Stop after this number of failed checks,
+            by default None - check all items
+        max_examples : int, optional
+            The number of indices of failed items to report for each check,
+            by default 100
+        seed : Optional[int], optional
+            Seed for sampling the reported indices
+
+        Raises
+        ------
+        DataValidationException
+            If any item failed any check
+        """
         super().__init__(dataset, func, **kwargs)
+        if max_failures is not None and max_failures <= 0:
+            raise ValueError(f"max_failures should be positive, got {max_failures}")
 
-        bad_items = {j: [] for j in range(len(self._func))}
-        for i, item in tqdm(enumerate(self._dataset), desc="Checking", leave=False):
-            for j, func in enumerate(self._func):
-                if not func(item):
-                    bad_items[j].append(i)
+        rng = np.random.default_rng(seed)
+        failed = [_FailedItems(max_examples, rng) for _ in self._func]
+        total = 0
+        with tqdm(desc="Checking", leave=False) as pbar:
+            for num_items, bad in self._check(vectorized, workers, backend, chunk_size):
+                for j, indices in enumerate(bad):
+                    failed[j].add(indices)
+                    total += len(indices)
+                pbar.update(num_items)
+                if max_failures is not None and total >= max_failures:
+                    break
 
-        bad_counts = [len(bad_items[i]) for i in range(len(self._func))]
-        if any(bad_counts):
-            self._raise(bad_items)
+        if total:
+            self._raise(failed)
         else:
             print("OK!")
 
-    def _raise(self, items: Dict[int, List[int]]) -> NoReturn:
-        bad_counts = [len(items[i]) for i in range(len(self._func))]
+    def _check(
+        self,
+        vectorized: bool,
+        workers: Optional[int],
+        backend: Literal["thread", "process"],
+        chunk_size: Optional[int],
+    ) -> Iterator[Tuple[int, List[np.ndarray]]]:
+        if isinstance(self._dataset, Dataset):
+            length = len(self._dataset)
+            if chunk_size is None:
+                chunk_size = default_chunk_size(length, workers)
+            chunks = chunk_indices(length, chunk_size)
+            state = (self._dataset, self._func, vectorized)
+            results = map_chunks(_check_chunk, state, chunks, workers, backend)
+            for chunk, bad in zip(chunks, results):
+                yield len(chunk), bad
+            return
+
+        if chunk_size is None:
+            chunk_size = default_chunk_size(0, None)
+        start = 0
+        items = []
+        for item in self._dataset:
+            items.append(item)
+            if len(items) == chunk_size:
+                yield len(items), self._check_items(items, start, vectorized)
+                start += len(items)
+                items = []
+        if items:
+            yield len(items), self._check_items(items, start, vectorized)
 
-        failed_checks = [i for i in range(len(bad_counts)) if bad_counts[i]]
-        failed_items = "\n".join([f"{i}: {prettify_items(items[i])}" for i in items])
+    def _check_items(self, items: List[Any], start: int, vectorized: bool) -> List[np.ndarray]:
+        indices = np.arange(start, start + len(items), dtype=np.int64)
+        return _check_batch(items, indices, self._func, vectorized)
+
+    def _raise(self, failed: List[_FailedItems]) -> NoReturn:
+        failed_checks = [i for i, items in enumerate(failed) if items.count]
+        failed_items = "\n".join(
+            [
+                f"{i}: {items.count} items, e.g. {prettify_items(items.examples())}"
+                for i, items in enumerate(failed)
+            ]
+        )
         raise DataValidationException(
             f"Checks in positions {failed_checks} failed\n"
             f"Items failed by check:\n"
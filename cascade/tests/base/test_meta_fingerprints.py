@@ -0,0 +1,122 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import datetime
+import os
+import sys
+
+import numpy as np
+
+MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(MODULE_PATH))
+
+from cascade.base import MetaHandler
+from cascade.base.utils import _Fingerprinter, canonical_json, meta_fingerprints, meta_hash
+from cascade.data import ApplyModifier, Wrapper
+
+
+def add1(x):
+    return x + 1
+
+
+def test_key_order():
+    a = [{"name": "ds", "a": 1, "b": {"c": 2, "d": [1, 2]}}]
+    b = [{"b": {"d": [1, 2], "c": 2}, "a": 1, "name": "ds"}]
+
+    assert meta_hash(a) == meta_hash(b)
+    assert meta_fingerprints(a) == meta_fingerprints(b)
+
+
+def test_values_change_meta_only():
+    ds = ApplyModifier(Wrapper([0, 1, 2]), add1)
+    skel, full = meta_fingerprints(ds.get_meta())
+
+    ds.update_meta({"param": 1})
+    new_skel, new_full = meta_fingerprints(ds.get_meta())
+
+    assert skel == new_skel
+    assert full != new_full
+
+    ds = ApplyModifier(ds, add1)
+    assert meta_fingerprints(ds.get_meta())[0] != skel
+
+
+def test_round_trip(tmp_path_str):
+    meta = [
+        {
+            "name": "ds",
+            "len": np.int64(3),
+            "mean": np.float32(0.5),
+            "arr": np.arange(3),
+            "shape": (3, 2),
+            "created_at": datetime.datetime(2024, 1, 1),
+        }
+    ]
+    path = os.path.join(tmp_path_str, "meta.json")
+    MetaHandler.write(path, meta)
+
+    assert meta_hash(MetaHandler.read(path)) == meta_hash(meta)
+
+
+def test_mixed_keys_and_objects():
+    meta = [{1: "a", "b": object, None: 2, "obj": object()}]
+
+    assert isinstance(canonical_json(meta), str)
+    assert meta_hash(meta) == meta_hash(meta)
+    assert meta_hash([{"1": "a"}]) == meta_hash([{1: "a"}])
+
+
+def test_nested_pipelines():
+    inner = [{"name": "a", "len": 1}, {"name": "b"}]
+    meta = [{"name": "concat", "data": [inner, inner]}]
+    skel, full = meta_fingerprints(meta)
+
+    changed = [{"name": "concat", "data": [inner, [{"name": "a", "len": 2}, {"name": "b"}]]}]
+    new_skel, new_full = meta_fingerprints(changed)
+    assert skel == new_skel
+    assert full != new_full
+
+    restructured = [{"name": "concat", "data": [inner, [{"name": "c", "len": 1}, {"name": "b"}]]}]
+    assert meta_fingerprints(restructured)[0] != skel
+
+    # Custom keys with nested pipelines
+    custom = [{"name": "m", "prev": inner}]
+    other = [{"name": "m", "prev": [{"name": "c"}]}]
+    assert meta_fingerprints(custom)[0] == meta_fingerprints(other)[0]
+    assert meta_fingerprints(custom, ["prev"])[0] != meta_fingerprints(other, ["prev"])[0]
+
+
+def test_version_tag(monkeypatch):
+    meta = [{"name": "ds"}]
+    before = meta_fingerprints(meta)
+    monkeypatch.setattr("cascade.base.utils.FINGERPRINT_VERSION", 1000)
+    after = meta_fingerprints(meta)
+    assert before[0] != after[0]
+    assert before[1] != after[1]
+
+
+def test_memoized(monkeypatch):
+    calls = []
+    block = _Fingerprinter._block
+
+    def counting(self, obj):
+        calls.append(obj["name"])
+        return block(self, obj)
+
+    monkeypatch.setattr(_Fingerprinter, "_block", counting)
+    inner = [{"name": "a"}, {"name": "b"}]
+    meta_fingerprints([{"name": "concat", "data": [inner, inner, inner]}])
+    assert sorted(calls) == ["a", "b", "concat"]
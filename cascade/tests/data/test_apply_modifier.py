@@ -17,8 +17,10 @@ limitations under the License.
 import os
 import sys
 
+import numpy as np
 import pytest
 
+from cascade.base.utils import is_reproducible, meta_hash
 from cascade.data import ApplyModifier, IteratorWrapper, Wrapper
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
@@ -61,7 +63,7 @@ def test_p():
     ds = Wrapper([0, 1, 2, 3])
     ds = ApplyModifier(ds, lambda x: x + 1, 0.5, seed=42)
 
-    assert [i for i in ds] == [0, 2, 3, 4]
+    assert [i for i in ds] == [0, 2, 2, 4]
 
     ds = Wrapper([0, 1, 2, 3])
     ds = ApplyModifier(ds, lambda x: x + 1, 1)
@@ -78,4 +80,71 @@ def test_p_get():
     ds = Wrapper([0, 1, 2, 3])
     ds = ApplyModifier(ds, lambda x: x + 1, 0.5, seed=42)
 
-    assert [ds[i] for i in range(len(ds))] == [0, 2, 3, 4]
+    assert [ds[i] for i in range(len(ds))] == [0, 2, 2, 4]
+
+
+def test_p_order_independent():
+    ds = Wrapper(list(range(100)))
+    ds = ApplyModifier(ds, lambda x: -x, 0.5, seed=7)
+
+    expected = [ds[i] for i in range(len(ds))]
+    assert [ds[i] for i in reversed(range(len(ds)))] == expected[::-1]
+    assert ds.get_batch(range(50, 100)) + ds.get_batch(range(50)) == expected[50:] + expected[:50]
+    assert [item for item in ds] == expected
+
+    ds.set_epoch(1)
+    assert [ds[i] for i in range(len(ds))] != expected
+
+
+def test_get_batch():
+    ds = Wrapper([0, 1, 2, 3])
+    ds = ApplyModifier(ds, lambda x: x * 2)
+
+    assert ds.get_batch([3, 0]) == [6, 0]
+
+
+def test_batched():
+    ds = Wrapper(np.arange(6))
+    ds = ApplyModifier(ds, lambda x: x * 2, batched=True)
+
+    batch = ds.get_batch([1, 2, 5])
+    assert isinstance(batch, np.ndarray)
+    assert batch.tolist() == [2, 4, 10]
+    assert ds[3] == 6
+    assert [item for item in ds] == [0, 2, 4, 6, 8, 10]
+
+    ds = IteratorWrapper([0, 1, 2])
+    ds = ApplyModifier(ds, lambda x: [item + 1 for item in x], batched=True)
+    assert [item for item in ds] == [1, 2, 3]
+
+
+def test_batched_p():
+    ds = Wrapper(np.arange(6))
+    ds = ApplyModifier(ds, lambda x: x * 2, p=1, batched=True)
+    assert list(ds.get_batch(range(6))) == [0, 2, 4, 6, 8, 10]
+
+    ds = Wrapper(np.arange(6))
+    ds = ApplyModifier(ds, lambda x: x * 2, p=0, batched=True)
+    assert list(ds.get_batch(range(6))) == [0, 1, 2, 3, 4, 5]
+
+
+def test_negative_seed():
+    def run():
+        ds = ApplyModifier(Wrapper(list(range(20))), lambda x: -x, p=0.5, seed=-1)
+        return [item for item in ds]
+
+    assert run() == run()
+
+
+def test_meta():
+    ds = ApplyModifier(Wrapper([0, 1, 2]), lambda x: -x, p=0.5, seed=3)
+    meta = ds.get_meta()
+    assert meta[0]["seed"] == 3
+    assert meta[0]["epoch"] == 0
+    assert is_reproducible(meta)
+
+    ds.set_epoch(1)
+    assert meta_hash(meta) != meta_hash(ds.get_meta())
+
+    assert "seed" not in ApplyModifier(Wrapper([0]), lambda x: -x).get_meta()[0]
+    assert not is_reproducible(ApplyModifier(Wrapper([0]), lambda x: -x, p=0.5).get_meta())
@@ -0,0 +1,110 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+from cascade.data import (AsyncAdapter, AsyncDataLoader, AsyncDataset,
+                          AsyncLimiter, AsyncModifier, Wrapper)
+
+
+class SlowAsync(AsyncDataset):
+    def __init__(self, length, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._length = length
+        self.active = 0
+        self.max_active = 0
+
+    async def aget(self, index):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return index
+
+    def __len__(self):
+        return self._length
+
+
+class Doubler(AsyncModifier):
+    async def aget(self, index):
+        return 2 * await self._dataset.aget(index)
+
+
+async def _collect(iterable):
+    return [item async for item in iterable]
+
+
+def test_aiter_and_modifier():
+    ds = Doubler(SlowAsync(4))
+
+    assert len(ds) == 4
+    assert asyncio.run(_collect(ds)) == [0, 2, 4, 6]
+    assert asyncio.run(ds.aget_batch([3, 1])) == [6, 2]
+
+    meta = ds.get_meta()
+    assert len(meta) == 2
+    assert meta[0]["len"] == 4
+
+
+def test_adapter():
+    class SlowSync(Wrapper):
+        def __getitem__(self, index):
+            time.sleep(0.05)
+            return super().__getitem__(index)
+
+    ds = AsyncAdapter(SlowSync(list(range(8))))
+
+    start = time.time()
+    assert asyncio.run(ds.aget_batch(range(8))) == list(range(8))
+    assert time.time() - start < 0.3
+    assert ds.get_meta()[1]["name"].endswith("SlowSync")
+
+
+def test_limiter():
+    source = SlowAsync(20)
+    ds = AsyncLimiter(source, 3)
+
+    assert asyncio.run(ds.aget_batch(range(20))) == list(range(20))
+    assert source.max_active == 3
+
+    # Can be used in another event loop
+    assert asyncio.run(ds.aget_batch(range(2))) == [0, 1]
+
+    with pytest.raises(ValueError):
+        AsyncLimiter(source, 0)
+
+
+def test_loader():
+    source = SlowAsync(10)
+    dl = AsyncDataLoader(source, batch_size=3, concurrency=5)
+
+    assert len(dl) == 4
+    assert asyncio.run(_collect(dl)) == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+    assert source.max_active == 5
+
+    dl = AsyncDataLoader(Wrapper(list(range(10))), batch_size=3, drop_last=True)
+    assert asyncio.run(_collect(dl)) == [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
+
+    with pytest.raises(ValueError):
+        AsyncDataLoader(source, batch_size=0)
@@ -15,12 +15,19 @@ limitations under the License.
 """
 
 import os
+import pickle
 import sys
 
+import numpy as np
+import pytest
+
 MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(MODULE_PATH))
 
-from cascade.data import BruteforceCacher, Wrapper
+from cascade.data import (ApplyModifier, BruteforceCacher, IteratorWrapper, RandomSampler,
+                          Wrapper)
+from cascade.data.parallel import chunk_indices, map_chunks
+from cascade.data.storage import ArrayStorage, MemmapStorage, SharedMemoryStorage
 
 
 def test_ds(number_dataset):
@@ -41,3 +48,211 @@ def test_meta():
     meta = ds.get_meta()
 
     assert len(meta) == 2
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_workers(number_dataset, backend):
+    ds = BruteforceCacher(number_dataset, workers=2, backend=backend, chunk_size=3)
+    assert [number_dataset[i] for i in range(len(number_dataset))] == [
+        item for item in ds
+    ]
+
+
+def test_pack_arrays():
+    ds = Wrapper([np.full((2, 3), i, dtype=np.float32) for i in range(10)])
+    ds = BruteforceCacher(ds, workers=3, chunk_size=2)
+
+    assert isinstance(ds._data, ArrayStorage)
+    assert ds[5].shape == (2, 3)
+    assert ds[5].dtype == np.float32
+    assert np.all(ds[5] == 5)
+    assert np.shares_memory(ds[0], ds[0:2])
+
+
+def test_pack_tuples():
+    ds = Wrapper([(np.full(3, i), np.array(i)) for i in range(5)])
+    ds = BruteforceCacher(ds)
+
+    assert isinstance(ds._data, ArrayStorage)
+    item = ds[3]
+    assert isinstance(item, tuple)
+    assert np.all(item[0] == 3)
+    assert item[1] == 3
+
+
+def test_pack_iterator():
+    ds = IteratorWrapper([np.full(3, i) for i in range(5)])
+    ds = BruteforceCacher(ds)
+
+    assert isinstance(ds._data, ArrayStorage)
+    assert np.all(ds[4] == 4)
+
+
+def test_pack_fallback():
+    items = [np.zeros(3), np.ones(3), np.ones(2), np.zeros(3)]
+    ds = BruteforceCacher(Wrapper(items))
+
+    assert isinstance(ds._data, list)
+    for item, cached in zip(items, ds):
+        assert np.all(item == cached)
+
+
+def test_no_pack():
+    ds = Wrapper([np.full(3, i) for i in range(5)])
+    ds = BruteforceCacher(ds, pack=False)
+
+    assert isinstance(ds._data, list)
+
+
+def test_process_order():
+    ds = Wrapper([np.full(4, i) for i in range(100)])
+    ds = ApplyModifier(ds, np.sqrt)
+    ds = BruteforceCacher(ds, workers=4, backend="process", chunk_size=7)
+
+    assert [item[0] for item in ds] == [np.sqrt(i) for i in range(100)]
+
+
+def test_memmap(tmp_path_str):
+    items = [(np.full((3, 2), i, dtype=np.float32), str(i)) for i in range(10)]
+    ds = BruteforceCacher(Wrapper(items), storage="memmap", path=tmp_path_str)
+
+    assert isinstance(ds._data, MemmapStorage)
+    assert len(ds) == 10
+    for item, cached in zip(items, ds):
+        assert np.all(item[0] == cached[0])
+        assert item[1] == cached[1]
+
+    meta = ds.get_meta()
+    assert meta[0]["storage"] == "memmap"
+    assert meta[0]["path"] == tmp_path_str
+
+
+def test_memmap_reopen(tmp_path_str, monkeypatch):
+    def fail(self, index):
+        raise RuntimeError("Pipeline should not be called")
+
+    items = [np.full(3, i) for i in range(10)]
+    ds = BruteforceCacher(Wrapper(items), storage="memmap", path=tmp_path_str)
+
+    with monkeypatch.context() as m:
+        m.setattr(Wrapper, "__getitem__", fail)
+        ds = BruteforceCacher(Wrapper(items), storage="memmap", path=tmp_path_str)
+    assert np.all(ds[7] == 7)
+
+    # Meta changed - should recompute
+    ds = BruteforceCacher(Wrapper(items[:5]), storage="memmap", path=tmp_path_str)
+    assert len(ds) == 5
+
+
+def test_memmap_random_upstream(tmp_path_str):
+    items = [np.full(3, i) for i in range(10)]
+
+    def cached(sampler):
+        return [int(item[0]) for item in BruteforceCacher(
+            sampler, storage="memmap", path=tmp_path_str
+        )]
+
+    sampler = RandomSampler(Wrapper(items), seed=0)
+    assert cached(sampler) == [int(item[0]) for item in sampler]
+
+    # Another seed or epoch gives another order
+    sampler = RandomSampler(Wrapper(items), seed=1)
+    assert cached(sampler) == [int(item[0]) for item in sampler]
+    sampler.set_epoch(1)
+    assert cached(sampler) == [int(item[0]) for item in sampler]
+
+    sampler = RandomSampler(Wrapper(items))
+    with pytest.warns(UserWarning):
+        assert cached(sampler) == [int(item[0]) for item in sampler]
+
+
+def test_memmap_iterator(tmp_path_str):
+    ds = IteratorWrapper([np.arange(4) + i for i in range(3000)])
+    ds = BruteforceCacher(ds, storage="memmap", path=tmp_path_str)
+
+    assert len(ds) == 3000
+    assert np.all(ds[2999] == np.arange(4) + 2999)
+
+
+def test_memmap_pickle(tmp_path_str):
+    ds = Wrapper([np.full(1000, i) for i in range(100)])
+    ds = BruteforceCacher(ds, storage="memmap", path=tmp_path_str)
+
+    storage = pickle.loads(pickle.dumps(ds._data))
+    assert isinstance(storage, MemmapStorage)
+    assert len(pickle.dumps(ds._data)) < 1000
+    assert np.all(storage[42] == 42)
+
+
+def test_memmap_errors(tmp_path_str):
+    with pytest.raises(ValueError):
+        BruteforceCacher(Wrapper([np.zeros(3)]), storage="memmap")
+
+    with pytest.raises(ValueError):
+        BruteforceCacher(Wrapper([1, 2, 3]), storage="memmap", path=tmp_path_str)
+
+    with pytest.raises(ValueError):
+        BruteforceCacher(
+            Wrapper([np.zeros(3), np.zeros(2)]), storage="memmap", path=tmp_path_str
+        )
+
+
+def _sum_chunk(ds, chunk):
+    return [float(ds[i].sum()) for i in chunk]
+
+
+def test_shared():
+    items = [(np.full(100, i, dtype=np.float32), str(i)) for i in range(10)]
+    ds = BruteforceCacher(Wrapper(items), storage="shared")
+
+    assert isinstance(ds._data, SharedMemoryStorage)
+    assert ds.get_meta()[0]["storage"] == "shared"
+    for item, cached in zip(items, ds):
+        assert np.all(item[0] == cached[0])
+        assert item[1] == cached[1]
+    ds.close()
+
+
+def test_shared_pickle():
+    ds = BruteforceCacher(Wrapper([np.full(1000, i) for i in range(100)]), storage="shared")
+
+    assert len(pickle.dumps(ds)) < 10000
+    attached = pickle.loads(pickle.dumps(ds))
+    assert attached._dataset is None
+    assert attached.get_meta() == ds.get_meta()
+    assert isinstance(attached._data, SharedMemoryStorage)
+    assert np.all(attached[42] == 42)
+
+    # The same memory is seen from both sides
+    ds._data._parts[0][42] = -1
+    assert np.all(attached[42] == -1)
+
+    attached.close()
+    assert np.all(ds[42] == -1)
+    ds.close()
+
+
+def test_shared_processes():
+    ds = BruteforceCacher(Wrapper([np.full(10, i) for i in range(20)]), storage="shared")
+    chunks = chunk_indices(len(ds), 3)
+    results = map_chunks(_sum_chunk, ds, chunks, workers=2, backend="process")
+
+    assert [value for chunk in results for value in chunk] == [10.0 * i for i in range(20)]
+    ds.close()
+
+
+def test_shared_close():
+    ds = BruteforceCacher(Wrapper([np.full(10, i) for i in range(20)]), storage="shared")
+    handle = ds._data.handle
+    ds.close()
+
+    with pytest.raises(FileNotFoundError):
+        handle.attach()
+
+
+def test_shared_errors():
+    with pytest.raises(ValueError):
+        BruteforceCacher(Wrapper(["a", "b"]), storage="shared")
+
+    with pytest.raises(ValueError):
+        BruteforceCacher(Wrapper([np.zeros(3), np.zeros(2)]), storage="shared")
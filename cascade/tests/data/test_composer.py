@@ -15,8 +15,12 @@ limitations under the License.
 """
 
 import os
+import pickle
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import pytest
 
 MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
@@ -79,3 +83,48 @@ def test_composition(datasets):
 def test_different_lengths(datasets):
     with pytest.raises(ValueError):
         Composer(datasets)
+
+
+def test_get_batch():
+    ds = Composer([Wrapper(np.arange(5)), Wrapper(["a", "b", "c", "d", "e"])])
+    assert ds.get_batch([4, 1]) == [(4, "e"), (1, "b")]
+
+
+class SlowWrapper(Wrapper):
+    def __getitem__(self, index):
+        time.sleep(0.1)
+        return super().__getitem__(index)
+
+
+def test_parallel():
+    datasets = [SlowWrapper([0, 1, 2]), SlowWrapper([3, 4, 5]), SlowWrapper([6, 7, 8])]
+    ds = Composer(datasets, parallel=True)
+
+    start = time.time()
+    assert ds[1] == (1, 4, 7)
+    assert time.time() - start < 0.25
+    assert ds.get_batch([2, 0]) == [(2, 5, 8), (0, 3, 6)]
+
+    # Nested composers do not wait for the pool they run in
+    nested = Composer([ds, Composer(datasets, parallel=True)], parallel=True)
+    assert nested[0] == ((0, 3, 6), (0, 3, 6))
+
+
+def test_parallel_executor_and_pickle():
+    with ThreadPoolExecutor(2) as executor:
+        ds = Composer([Wrapper([0, 1]), Wrapper([2, 3])], parallel=True, executor=executor)
+        assert ds[1] == (1, 3)
+
+        ds = pickle.loads(pickle.dumps(ds))
+        assert ds._executor is None
+        assert ds[0] == (0, 2)
+
+
+def test_parallel_error():
+    class Broken(Wrapper):
+        def __getitem__(self, index):
+            raise KeyError(index)
+
+    ds = Composer([Wrapper([0]), Broken([0])], parallel=True)
+    with pytest.raises(KeyError):
+        ds[0]
@@ -17,12 +17,13 @@ limitations under the License.
 import os
 import sys
 
+import numpy as np
 import pytest
 
 MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(MODULE_PATH))
 
-from cascade.data import Concatenator, Wrapper
+from cascade.data import Concatenator, Dataset, Wrapper
 
 
 def test_meta():
@@ -73,3 +74,46 @@ def test_concatenation(arrs):
         res += arr
 
     assert [c[i] for i in range(len(c))] == res
+
+
+def test_get_batch():
+    ds = Concatenator([Wrapper([0, 1]), Wrapper(np.arange(2, 6)), Wrapper([6])])
+    indices = [6, 0, 3, 1, 5, 2]
+    assert [int(item) for item in ds.get_batch(indices)] == indices
+    assert ds.get_batch([]) == []
+
+
+def test_negative_and_slices():
+    ds = Concatenator([Wrapper([0, 1]), Wrapper([]), Wrapper([2, 3, 4])])
+
+    assert len(ds) == 5
+    assert [ds[i] for i in range(-5, 0)] == [0, 1, 2, 3, 4]
+    assert ds[1:4] == [1, 2, 3]
+    assert ds[::-2] == [4, 2, 0]
+    assert ds.get_batch([-1, 0]) == [4, 0]
+
+    with pytest.raises(IndexError):
+        ds[5]
+    with pytest.raises(IndexError):
+        ds[-6]
+    with pytest.raises(IndexError):
+        ds.get_batch([0, 5])
+
+
+class IntOnly(Dataset):
+    def __init__(self, n):
+        super().__init__()
+        self._n = n
+
+    def __getitem__(self, index):
+        if type(index) is not int:
+            raise TypeError(f"Only int indices, got {type(index)}")
+        return index
+
+    def __len__(self):
+        return self._n
+
+
+def test_get_batch_python_ints():
+    ds = Concatenator([IntOnly(3), IntOnly(2)])
+    assert ds.get_batch(np.array([4, 0, 2])) == [1, 0, 2]
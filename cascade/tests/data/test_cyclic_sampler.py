@@ -20,7 +20,7 @@ import sys
 MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(MODULE_PATH))
 
-from cascade.data import CyclicSampler, Wrapper
+from cascade.data import CyclicSampler, RandomSampler, RangeSampler, Wrapper
 
 
 def test_cycle():
@@ -55,3 +55,28 @@ def test():
 
     for i in ds:
         pass
+
+
+def test_get_batch():
+    ds = CyclicSampler(Wrapper([0, 1, 2]), 7)
+    assert ds.get_batch([6, 4, 0]) == [0, 1, 0]
+
+
+def test_fused():
+    base = Wrapper([0, 1, 2, 3, 4])
+    ds = CyclicSampler(RangeSampler(base, 1, 4), 5)
+    assert ds._base is base
+    assert ds.get_indices().tolist() == [1, 2, 3, 1, 2]
+    assert [item for item in ds] == [1, 2, 3, 1, 2]
+
+    ds = RangeSampler(ds, 0, 5, 2)
+    assert ds.get_indices().tolist() == [1, 3, 2]
+
+
+def test_set_epoch():
+    sampler = RandomSampler(Wrapper(list(range(10))), seed=0)
+    ds = CyclicSampler(sampler, 15)
+    for epoch in range(3):
+        ds.set_epoch(epoch)
+        order = [sampler[i] for i in range(len(sampler))]
+        assert [item for item in ds] == order + order[:5]
@@ -0,0 +1,145 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+from cascade.data import ApplyModifier, DataLoader, Wrapper
+from cascade.data.dataloader import default_collate
+
+
+def test():
+    dl = DataLoader(Wrapper([0, 1, 2, 3, 4]), batch_size=2)
+
+    assert len(dl) == 3
+    assert [batch.tolist() for batch in dl] == [[0, 1], [2, 3], [4]]
+
+
+def test_drop_last():
+    dl = DataLoader(Wrapper([0, 1, 2, 3, 4]), batch_size=2, drop_last=True)
+
+    assert len(dl) == 2
+    assert [batch.tolist() for batch in dl] == [[0, 1], [2, 3]]
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_workers(backend):
+    ds = Wrapper([(np.full(3, i), i) for i in range(50)])
+    dl = DataLoader(ds, batch_size=4, num_workers=3, backend=backend, prefetch=1)
+
+    batches = [batch for batch in dl]
+    assert len(batches) == 13
+    x, y = batches[0]
+    assert x.shape == (4, 3)
+    assert np.concatenate([y for _, y in batches]).tolist() == list(range(50))
+
+
+def test_shuffle():
+    ds = Wrapper(list(range(20)))
+    dl = DataLoader(ds, batch_size=3, shuffle=True, seed=0)
+
+    first = np.concatenate([batch for batch in dl]).tolist()
+    second = np.concatenate([batch for batch in dl]).tolist()
+    assert sorted(first) == list(range(20))
+    assert first != second
+
+    dl = DataLoader(ds, batch_size=3, shuffle=True, seed=0)
+    assert np.concatenate([batch for batch in dl]).tolist() == first
+
+    dl.set_epoch(1)
+    assert np.concatenate([batch for batch in dl]).tolist() == second
+
+
+def test_negative_seed():
+    def order():
+        dl = DataLoader(Wrapper(list(range(10))), batch_size=3, shuffle=True, seed=-1)
+        return np.concatenate([batch for batch in dl]).tolist()
+
+    assert order() == order()
+    assert sorted(order()) == list(range(10))
+
+
+def test_worker_init_fn():
+    threads = set()
+
+    def init():
+        threads.add(threading.get_ident())
+
+    dl = DataLoader(Wrapper(list(range(10))), num_workers=2, worker_init_fn=init)
+    assert len([batch for batch in dl]) == 10
+    assert 0 < len(threads) <= 2
+    assert threading.get_ident() not in threads
+    dl.close()
+
+    calls = []
+    dl = DataLoader(Wrapper(list(range(10))), worker_init_fn=lambda: calls.append(1))
+    for _ in range(2):
+        assert len([batch for batch in dl]) == 10
+    assert calls == [1]
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_workers_reused(backend):
+    with DataLoader(Wrapper(list(range(10))), batch_size=3, num_workers=2, backend=backend) as dl:
+        first = [batch.tolist() for batch in dl]
+        executor = dl._executor
+        assert executor is not None
+
+        assert [batch.tolist() for batch in dl] == first
+        assert dl._executor is executor
+
+    assert dl._executor is None
+    assert [batch.tolist() for batch in dl] == first
+    dl.close()
+
+
+def test_early_stop():
+    ds = ApplyModifier(Wrapper(list(range(100))), lambda x: x + 1)
+    dl = DataLoader(ds, batch_size=10, num_workers=2, collate_fn=None)
+
+    for batch in dl:
+        break
+    assert batch == list(range(1, 11))
+
+
+def test_default_collate():
+    assert default_collate([1, 2]).tolist() == [1, 2]
+    assert default_collate(["a", 1]) == ["a", 1]
+    assert default_collate([np.zeros(2), np.zeros(3)])[1].shape == (3,)
+
+    x, (y, z) = default_collate([(np.ones((2, 2)), (0, "a")), (np.ones((2, 2)), (1, "b"))])
+    assert x.shape == (2, 2, 2)
+    assert y.tolist() == [0, 1]
+    assert z == ["a", "b"]
+
+    arr = np.arange(4)
+    assert default_collate(arr) is arr
+
+
+def test_wrong_usage():
+    with pytest.raises(ValueError):
+        DataLoader(Wrapper([0]), batch_size=0)
+    with pytest.raises(ValueError):
+        DataLoader(Wrapper([0]), prefetch=0)
+    with pytest.raises(ValueError):
+        DataLoader(Wrapper([0]), backend="gpu")
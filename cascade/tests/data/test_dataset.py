@@ -19,6 +19,8 @@ import json
 import os
 import sys
 
+import numpy as np
+import pandas as pd
 import pytest
 
 MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
@@ -26,6 +28,7 @@ sys.path.append(os.path.dirname(MODULE_PATH))
 
 from cascade.data import (BaseDataset, IteratorWrapper, Modifier, Sampler,
                           Wrapper)
+from cascade.data.dataset import batch_to_list
 
 
 class DummyDataset(BaseDataset):
@@ -131,3 +134,28 @@ def test_modifier_from_meta():
 def test_sampler():
     ds = Wrapper([1, 2, 3, 4])
     ds = Sampler(ds, 10)
+
+
+def test_get_batch():
+    ds = Wrapper([0, 1, 2, 3])
+    assert ds.get_batch([3, 1]) == [3, 1]
+
+    ds = Wrapper(np.arange(10) * 2)
+    batch = ds.get_batch([1, 5, 2])
+    assert isinstance(batch, np.ndarray)
+    assert batch.tolist() == [2, 10, 4]
+
+    ds = Modifier(ds)
+    assert ds.get_batch(range(3)) == [0, 2, 4]
+
+
+def test_batch_to_list():
+    assert batch_to_list([1, 2]) == [1, 2]
+
+    items = batch_to_list(np.ones((3, 2)))
+    assert len(items) == 3
+    assert items[0].shape == (2,)
+
+    items = batch_to_list(pd.DataFrame({"a": [1, 2], "b": [3, 4]}))
+    assert len(items) == 2
+    assert items[1]["b"] == 4
@@ -15,15 +15,18 @@ limitations under the License.
 """
 
 import os
+import pickle
 import random
 import sys
 
+import numpy as np
 import pytest
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(SCRIPT_DIR))
 
-from cascade.data import Filter, IteratorDataset, IteratorFilter, Wrapper
+from cascade.data import (Dataset, Filter, IteratorDataset, IteratorFilter, RandomSampler,
+                          RangeSampler, Wrapper)
 
 
 @pytest.mark.parametrize(
@@ -81,3 +84,140 @@ def test_empty_iter():
     ds = IteratorFilter(ds, lambda x: True)
 
     assert [] == [item for item in ds]
+
+
+def test_get_batch():
+    ds = Filter(Wrapper([0, 1, 2, 3, 4, 5]), lambda x: x % 2)
+    assert ds.get_batch([2, 0]) == [5, 1]
+
+
+def _is_even(x):
+    return x % 2 == 0
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_workers(backend):
+    ds = Wrapper(list(range(100)))
+    ds = Filter(ds, _is_even, workers=3, backend=backend, chunk_size=7)
+
+    assert [item for item in ds] == list(range(0, 100, 2))
+
+
+def test_batched():
+    ds = Wrapper(np.arange(20))
+    ds = Filter(ds, lambda batch: batch % 3 == 0, batched=True, chunk_size=4)
+
+    assert [int(item) for item in ds] == list(range(0, 20, 3))
+
+    with pytest.raises(ValueError):
+        Filter(Wrapper(np.arange(5)), lambda batch: [True], batched=True)
+
+
+_calls = []
+
+
+def _is_odd(x):
+    _calls.append(x)
+    return x % 2
+
+
+def test_cache_dir(tmp_path):
+    _calls.clear()
+
+    ds = Filter(Wrapper([0, 1, 2, 3, 4]), _is_odd, cache_dir=str(tmp_path))
+    assert [item for item in ds] == [1, 3]
+    assert len(_calls) == 5
+    assert len(os.listdir(tmp_path)) == 1
+
+    ds = Filter(Wrapper([0, 1, 2, 3, 4]), _is_odd, cache_dir=str(tmp_path))
+    assert [item for item in ds] == [1, 3]
+    assert len(_calls) == 5
+
+    # Different upstream pipeline or function are evaluated again
+    Filter(Wrapper([0, 1, 2, 3, 4, 5]), _is_odd, cache_dir=str(tmp_path))
+    assert len(_calls) == 11
+
+    threshold = 2
+    Filter(Wrapper([0, 1, 2, 3, 4]), lambda x: x > threshold, cache_dir=str(tmp_path))
+    threshold = 3
+    ds = Filter(Wrapper([0, 1, 2, 3, 4]), lambda x: x > threshold, cache_dir=str(tmp_path))
+    assert [item for item in ds] == [4]
+    assert len(os.listdir(tmp_path)) == 4
+
+
+def test_cache_closures(tmp_path):
+    _calls.clear()
+
+    def make(values):
+        return lambda x: _is_odd(x) and x in values
+
+    # Large arrays have truncated reprs
+    a = np.ones(2000)
+    b = a.copy()
+    b[1000] = 3
+    Filter(Wrapper([0, 1, 2, 3, 4]), make(a), cache_dir=str(tmp_path))
+    ds = Filter(Wrapper([0, 1, 2, 3, 4]), make(b), cache_dir=str(tmp_path))
+    assert [item for item in ds] == [1, 3]
+    assert len(os.listdir(tmp_path)) == 2
+
+    class Unhashable:
+        pass
+
+    obj = Unhashable()
+    with pytest.warns(UserWarning):
+        ds = Filter(Wrapper([0, 1]), lambda x: obj is not None, cache_dir=str(tmp_path))
+    assert len(ds) == 2
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_cache_random_order(tmp_path):
+    def is_even(x):
+        return x % 2 == 0
+
+    with pytest.warns(UserWarning):
+        ds = Filter(RandomSampler(Wrapper(list(range(20)))), is_even, cache_dir=str(tmp_path))
+    assert all(item % 2 == 0 for item in ds)
+    assert len(os.listdir(tmp_path)) == 0
+
+    for seed, epoch in [(0, 0), (1, 0), (0, 1), (0, 0)]:
+        sampler = RandomSampler(Wrapper(list(range(20))), seed=seed)
+        sampler.set_epoch(epoch)
+        ds = Filter(sampler, is_even, cache_dir=str(tmp_path))
+        assert [item for item in ds] == [item for item in sampler if item % 2 == 0]
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_set_epoch():
+    ds = Filter(RandomSampler(Wrapper(list(range(10))), seed=0), lambda x: x % 2 == 0)
+    first = [item for item in ds]
+    for epoch in range(1, 4):
+        ds.set_epoch(epoch)
+        items = [item for item in ds]
+        assert sorted(items) == [0, 2, 4, 6, 8]
+        assert items == [item for item in ds._dataset if item % 2 == 0]
+    assert items != first
+
+    # Stages that do not depend on the epoch are not filtered again
+    _calls.clear()
+    ds = Filter(RangeSampler(Wrapper(list(range(10))), 0, 5), _is_odd)
+    ds.set_epoch(1)
+    assert len(_calls) == 5
+
+    ds = pickle.loads(pickle.dumps(Filter(Wrapper([0, 1, 2]), lambda x: x > 0)))
+    assert [item for item in ds] == [1, 2]
+
+
+class _Broken(Dataset):
+    def __getitem__(self, index):
+        if index == 7:
+            raise KeyError(index)
+        return index
+
+    def __len__(self):
+        return 10
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_error_index(batched):
+    with pytest.raises(RuntimeError, match="index: 7"):
+        Filter(_Broken(), lambda x: x, batched=batched, chunk_size=4)
@@ -17,6 +17,8 @@ limitations under the License.
 import os
 import sys
 
+import pytest
+
 MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(MODULE_PATH))
 
@@ -49,3 +51,111 @@ def test_names(tmp_path_str):
     names = ds.get_names()
     assert os.path.split(names[0])[-1] == "a.txt"
     assert os.path.split(names[1])[-1] == "b.txt"
+
+
+def _touch(*parts):
+    os.makedirs(os.path.join(*parts[:-1]), exist_ok=True)
+    with open(os.path.join(*parts), "w") as w:
+        w.write("hello")
+
+
+def test_skips_folders(tmp_path_str):
+    _touch(tmp_path_str, "a.txt")
+    _touch(tmp_path_str, "sub", "b.txt")
+
+    ds = FolderDataset(tmp_path_str)
+    assert ds.get_names() == [os.path.join(tmp_path_str, "a.txt")]
+
+
+def test_recursive_and_filters(tmp_path_str):
+    _touch(tmp_path_str, "a.txt")
+    _touch(tmp_path_str, "sub", "b.TXT")
+    _touch(tmp_path_str, "sub", "c.png")
+    _touch(tmp_path_str, "sub", "deep", "d.txt")
+
+    ds = FolderDataset(tmp_path_str, recursive=True)
+    names = [os.path.relpath(name, tmp_path_str) for name in ds.get_names()]
+    assert names == [
+        "a.txt",
+        os.path.join("sub", "b.TXT"),
+        os.path.join("sub", "c.png"),
+        os.path.join("sub", "deep", "d.txt"),
+    ]
+
+    ds = FolderDataset(tmp_path_str, recursive=True, extensions=[".txt"])
+    assert len(ds) == 3
+
+    ds = FolderDataset(tmp_path_str, recursive=True, pattern=os.path.join("sub", "*.png"))
+    assert [os.path.basename(name) for name in ds.get_names()] == ["c.png"]
+
+    sizes, mtimes = ds.get_file_stats()
+    assert sizes.tolist() == [5]
+    assert len(mtimes) == 1
+
+
+def test_manifest(tmp_path_str, monkeypatch):
+    _touch(tmp_path_str, "a.txt")
+    _touch(tmp_path_str, "sub", "b.txt")
+
+    ds = FolderDataset(tmp_path_str, recursive=True, manifest=True)
+    assert len(ds) == 2
+    assert os.path.exists(os.path.join(tmp_path_str, ".cascade_manifest.npz"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Files should not be listed")
+
+    with monkeypatch.context() as m:
+        m.setattr(FolderDataset, "_list_files", fail)
+        ds = FolderDataset(tmp_path_str, recursive=True, manifest=True)
+        assert len(ds) == 2
+
+    # Changes in a subfolder invalidate the manifest
+    _touch(tmp_path_str, "sub", "c.txt")
+    ds = FolderDataset(tmp_path_str, recursive=True, manifest=True)
+    assert len(ds) == 3
+
+    # Other listing parameters too
+    ds = FolderDataset(tmp_path_str, manifest=True)
+    assert len(ds) == 1
+
+
+def test_no_stats_without_manifest(tmp_path_str):
+    _touch(tmp_path_str, "a.txt")
+    _touch(tmp_path_str, "sub", "b.txt")
+
+    ds = FolderDataset(tmp_path_str, recursive=True)
+    assert len(ds) == 2
+    assert ds._sizes is None
+
+    sizes, _ = ds.get_file_stats()
+    assert sizes.tolist() == [5, 5]
+
+
+def test_manifest_does_not_list(tmp_path_str, monkeypatch):
+    _touch(tmp_path_str, "sub", "deep", "a.txt")
+    FolderDataset(tmp_path_str, recursive=True, manifest=True)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Folders should not be listed")
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "scandir", fail)
+        ds = FolderDataset(tmp_path_str, recursive=True, manifest=True)
+    assert len(ds) == 1
+
+    # A new subfolder changes the time of its parent
+    _touch(tmp_path_str, "sub", "deep", "new", "b.txt")
+    ds = FolderDataset(tmp_path_str, recursive=True, manifest=True)
+    assert len(ds) == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks are not supported")
+def test_symlink_loop(tmp_path_str):
+    _touch(tmp_path_str, "sub", "a.txt")
+    try:
+        os.symlink(tmp_path_str, os.path.join(tmp_path_str, "sub", "loop"))
+    except OSError:
+        pytest.skip("cannot create symlinks")
+
+    ds = FolderDataset(tmp_path_str, recursive=True)
+    assert len(ds) == 1
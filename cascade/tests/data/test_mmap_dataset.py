@@ -0,0 +1,116 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+from cascade.data import MmapArrayDataset
+
+
+def test_npy(tmp_path):
+    arr = np.arange(60, dtype=np.float32).reshape(20, 3)
+    path = os.path.join(str(tmp_path), "arr.npy")
+    np.save(path, arr)
+
+    ds = MmapArrayDataset(path)
+    assert len(ds) == 20
+    assert np.array_equal(ds[3], arr[3])
+    assert np.array_equal(ds[2:5], arr[2:5])
+    assert np.shares_memory(ds[2:5], ds.get_arrays()[0])
+    assert np.array_equal(ds.get_batch([4, 5, 6]), arr[4:7])
+    assert np.array_equal(ds.get_batch([6, 1]), arr[[6, 1]])
+    assert [item.tolist() for item in ds] == arr.tolist()
+
+
+def test_aligned(tmp_path):
+    x = np.arange(20).reshape(10, 2)
+    y = np.arange(10) % 2
+    np.save(os.path.join(str(tmp_path), "x.npy"), x)
+    np.save(os.path.join(str(tmp_path), "y.npy"), y)
+
+    ds = MmapArrayDataset([os.path.join(str(tmp_path), name) for name in ("x.npy", "y.npy")])
+    features, label = ds[3]
+    assert features.tolist() == [6, 7]
+    assert label == 1
+
+    batch = ds.get_batch([0, 1])
+    assert len(batch) == 2
+    assert batch[1][0].tolist() == [2, 3]
+
+    np.save(os.path.join(str(tmp_path), "z.npy"), np.arange(5))
+    with pytest.raises(ValueError):
+        MmapArrayDataset([os.path.join(str(tmp_path), name) for name in ("x.npy", "z.npy")])
+
+
+def test_raw(tmp_path):
+    arr = np.arange(24, dtype=np.int16).reshape(6, 4)
+    path = os.path.join(str(tmp_path), "arr.bin")
+    arr.tofile(path)
+
+    with pytest.raises(FileNotFoundError):
+        MmapArrayDataset(path)
+
+    ds = MmapArrayDataset(path, dtype="int16", shape=(-1, 4))
+    assert len(ds) == 6
+    assert ds[5].tolist() == arr[5].tolist()
+
+    with open(path + ".json", "w") as f:
+        json.dump({"dtype": "int16", "shape": [6, 4]}, f)
+    ds = MmapArrayDataset(path)
+    assert ds[1].tolist() == arr[1].tolist()
+
+
+def test_meta(tmp_path):
+    path = os.path.join(str(tmp_path), "arr.npy")
+    np.save(path, np.zeros((4, 2), dtype=np.float64))
+    meta = MmapArrayDataset(path).get_meta()[0]["arrays"][0]
+
+    assert meta["shape"] == [4, 2]
+    assert meta["dtype"] == "float64"
+
+    np.save(path, np.ones((4, 2), dtype=np.float64))
+    assert MmapArrayDataset(path).get_meta()[0]["arrays"][0]["fingerprint"] != meta["fingerprint"]
+
+
+def test_meta_fingerprint_once(tmp_path, monkeypatch):
+    path = os.path.join(str(tmp_path), "arr.npy")
+    np.save(path, np.zeros((4, 2)))
+    ds = MmapArrayDataset(path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The file should not be read again")
+
+    monkeypatch.setattr("cascade.data.mmap_dataset.file_fingerprint", fail)
+    assert ds.get_meta() == ds.get_meta()
+    assert pickle.loads(pickle.dumps(ds)).get_meta() == ds.get_meta()
+
+
+def test_pickle(tmp_path):
+    path = os.path.join(str(tmp_path), "arr.npy")
+    np.save(path, np.arange(10))
+    ds = MmapArrayDataset(path)
+
+    ds = pickle.loads(pickle.dumps(ds))
+    assert isinstance(ds.get_arrays()[0], np.memmap)
+    assert ds[9] == 9
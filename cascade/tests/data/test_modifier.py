@@ -17,10 +17,14 @@ limitations under the License.
 import os
 import sys
 
+import numpy as np
+
 MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(MODULE_PATH))
 
-from cascade.data import IteratorModifier, IteratorWrapper, Modifier, Wrapper
+from cascade.data import (CyclicSampler, Filter, IteratorModifier,
+                          IteratorWrapper, Modifier, RandomSampler,
+                          RangeSampler, Wrapper)
 
 
 def test_iter_of_modifier():
@@ -53,3 +57,55 @@ def test_iter_of_IteratorModifier():
 
     assert [1, 2, 3, 4, 5] == result1
     assert [1, 2, 3, 4, 5] == result2
+
+
+def test_index_sampler_fusion():
+    ds = Wrapper(list(range(20)))
+    ds = RangeSampler(ds, 2, 18)
+    ds = Filter(ds, lambda x: x % 2 == 0)
+    ds = RandomSampler(ds)
+    ds = CyclicSampler(ds, 20)
+    ds = RangeSampler(ds, 1, 15, 2)
+
+    assert ds._base is ds._dataset._base
+    assert isinstance(ds._base, Wrapper)
+    assert ds.get_indices().dtype == np.int32
+
+    expected = [ds._dataset[i] for i in range(1, 15, 2)]
+    assert [item for item in ds] == expected
+    assert ds.get_batch(range(len(ds))) == expected
+
+    meta = ds.get_meta()
+    assert [m["name"].split(".")[-1] for m in meta] == [
+        "RangeSampler",
+        "CyclicSampler",
+        "RandomSampler",
+        "Filter",
+        "RangeSampler",
+        "Wrapper",
+    ]
+
+
+def test_index_sampler_no_fusion_with_overrides():
+    class Doubler(RangeSampler):
+        def __getitem__(self, index):
+            return super().__getitem__(index) * 2
+
+    ds = Wrapper([0, 1, 2, 3])
+    ds = Doubler(ds, 4)
+    ds = RangeSampler(ds, 1, 3)
+
+    assert ds._base is ds._dataset
+    assert [item for item in ds] == [2, 4]
+    assert ds.get_batch([0, 1]) == [2, 4]
+
+
+def test_index_sampler_numpy():
+    ds = Wrapper(np.arange(10) * 10)
+    ds = RangeSampler(ds, 1, 9)
+    ds = RangeSampler(ds, 2, 6)
+
+    assert ds[0] == 30
+    assert ds[-1] == 60
+    assert (ds[1:3] == np.array([40, 50])).all()
+    assert type(ds[0]) is np.int64
@@ -17,26 +17,25 @@ limitations under the License.
 import os
 import sys
 
+import numpy as np
 import pytest
-from numpy import random
 
 SEED = 0
 
 MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(MODULE_PATH))
 
+from cascade.base.utils import is_reproducible, meta_hash
 from cascade.data import RandomSampler, Wrapper
 
 
 @pytest.mark.parametrize(
     "arr, result",
-    [([1, 2, 3, 4, 5], [3, 1, 2, 4, 5]), ([1, 5], [5, 1]), ([1, 2, -3], [-3, 2, 1])],
+    [([1, 2, 3, 4, 5], [3, 5, 4, 1, 2]), ([1, 5], [1, 5]), ([1, 2, -3], [-3, 1, 2])],
 )
 def test(arr, result):
-    random.seed(SEED)
-
     ds = Wrapper(arr)
-    ds = RandomSampler(ds)
+    ds = RandomSampler(ds, seed=SEED)
 
     for item, res in zip(ds, result):
         assert item == res
@@ -44,13 +43,53 @@ def test(arr, result):
 
 @pytest.mark.parametrize(
     "arr, result",
-    [([1, 2, 3, 4, 5], [3, 1, 2]), ([1, 5], [1, 5, 5]), ([1, 2, -3], [-3, 2, 1])],
+    [([1, 2, 3, 4, 5], [3, 5, 4]), ([1, 5], [5, 5, 5]), ([1, 2, -3], [-3, 1, 2])],
 )
 def test_over_and_under(arr, result):
-    random.seed(SEED)
-
     ds = Wrapper(arr)
-    ds = RandomSampler(ds, 3)
+    ds = RandomSampler(ds, 3, seed=SEED)
 
     for item, res in zip(ds, result):
         assert item == res
+
+
+def test_get_batch():
+    ds = RandomSampler(Wrapper([0, 1, 2, 3, 4]))
+    assert ds.get_batch(range(len(ds))) == [item for item in ds]
+
+
+def test_global_state():
+    np.random.seed(SEED)
+    state = np.random.get_state()[1].copy()
+
+    first = [item for item in RandomSampler(Wrapper(list(range(100))), seed=1)]
+    second = [item for item in RandomSampler(Wrapper(list(range(100))), seed=1)]
+
+    assert first == second
+    assert sorted(first) == list(range(100))
+    assert (np.random.get_state()[1] == state).all()
+
+
+def test_negative_seed():
+    first = [item for item in RandomSampler(Wrapper(list(range(10))), seed=-5)]
+    second = [item for item in RandomSampler(Wrapper(list(range(10))), seed=-5)]
+
+    assert first == second
+    assert sorted(first) == list(range(10))
+
+
+def test_meta():
+    ds = RandomSampler(Wrapper(list(range(10))), seed=1)
+    meta = ds.get_meta()
+    assert meta[0]["seed"] == 1
+    assert meta[0]["epoch"] == 0
+    assert is_reproducible(meta)
+
+    other = RandomSampler(Wrapper(list(range(10))), seed=2)
+    assert meta_hash(meta) != meta_hash(other.get_meta())
+
+    ds.set_epoch(3)
+    assert ds.get_meta()[0]["epoch"] == 3
+    assert meta_hash(meta) != meta_hash(ds.get_meta())
+
+    assert not is_reproducible(RandomSampler(Wrapper([0, 1])).get_meta())
@@ -17,6 +17,7 @@ limitations under the License.
 import os
 import sys
 
+import numpy as np
 import pytest
 
 MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
@@ -62,3 +63,8 @@ def test_wrong_usage():
     with pytest.raises(ValueError):
         ds = Wrapper(DATA)
         ds = RangeSampler(ds)
+
+
+def test_get_batch():
+    ds = RangeSampler(Wrapper(np.arange(10)), 1, 9, 2)
+    assert ds.get_batch([0, 3]).tolist() == [1, 7]
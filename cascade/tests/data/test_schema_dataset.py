@@ -25,6 +25,7 @@ MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(MODULE_PATH))
 
 from cascade.data import Dataset, SchemaModifier, ValidationError
+from cascade.data.validation import SchemaValidator
 
 
 class FiveIdenticalImages(Dataset):
@@ -97,3 +98,69 @@ def test_wrong_schema():
     with pytest.raises(ValidationError) as e:
         item = ds[0]
     assert e.value.error_index == 0
+
+
+def _count_validations(monkeypatch):
+    calls = []
+    validate = SchemaValidator.__call__
+
+    def counting(self, *args, **kwargs):
+        calls.append(1)
+        return validate(self, *args, **kwargs)
+
+    monkeypatch.setattr(SchemaValidator, "__call__", counting)
+    return calls
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        (dict(policy="always"), 15),
+        (dict(policy="once"), 5),
+        (dict(policy="first_k", k=3), 3),
+        (dict(policy="random", p=0.0), 0),
+        (dict(policy="random", p=1.0), 15),
+    ],
+)
+def test_policies(monkeypatch, kwargs, expected):
+    calls = _count_validations(monkeypatch)
+    ds = IDoNothing(FiveIdenticalImages(), **kwargs)
+    for _ in range(3):
+        for i in range(len(ds)):
+            ds[i]
+    assert len(calls) == expected
+
+
+def test_wrapper_is_built_once():
+    ds = IDoNothing(FiveIdenticalImages())
+    assert ds._dataset is ds._dataset
+
+
+class PassThrough(ImagesDataset):
+    pass
+
+
+def test_batch():
+    ds = PassThrough(FiveIdenticalImages(), policy="once")
+    batch = ds.get_batch([0, 2, 4])
+    assert len(batch) == 3
+    assert isinstance(batch[0], AnnotImage)
+
+
+def test_batch_error_index():
+    class Mixed(FiveIdenticalImages):
+        def __getitem__(self, idx):
+            if idx == 3:
+                return BrokenImage(image=[[0.]], segments=["lol"])
+            return super().__getitem__(idx)
+
+    ds = PassThrough(Mixed())
+    ds.get_batch([0, 1, 2])
+    with pytest.raises(ValidationError) as e:
+        ds.get_batch([4, 1, 3, 0])
+    assert e.value.error_index == 3
+
+
+def test_wrong_policy():
+    with pytest.raises(ValueError):
+        IDoNothing(FiveIdenticalImages(), policy="never")
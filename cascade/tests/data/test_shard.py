@@ -0,0 +1,124 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import sys
+
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+from cascade.data import (ApplyModifier, IteratorShard, IteratorWrapper,
+                          RandomSampler, ShardSampler, Wrapper, shard)
+
+
+@pytest.mark.parametrize("mode", ["contiguous", "strided", "hashed"])
+def test_cover(mode):
+    ds = Wrapper(list(range(103)))
+    shards = [[item for item in shard(ds, 4, i, mode=mode)] for i in range(4)]
+
+    assert sorted(sum(shards, [])) == list(range(103))
+    assert all(len(s) > 10 for s in shards)
+    if mode == "contiguous":
+        assert sum(shards, []) == list(range(103))
+    if mode == "strided":
+        assert shards[1][:3] == [1, 5, 9]
+
+
+def test_meta():
+    ds = shard(Wrapper([0, 1, 2, 3]), 2, 1, mode="strided")
+
+    assert isinstance(ds, ShardSampler)
+    meta = ds.get_meta()[0]
+    assert meta["num_shards"] == 2
+    assert meta["shard_id"] == 1
+    assert meta["mode"] == "strided"
+
+
+def test_hashed_key():
+    items = [f"item_{i}" for i in range(50)]
+    first = [item for item in shard(Wrapper(items), 3, 2, mode="hashed", key=str)]
+    # The assignment does not depend on positions
+    second = [item for item in shard(Wrapper(items[::-1]), 3, 2, mode="hashed", key=str)]
+
+    assert sorted(first) == sorted(second)
+
+
+def test_hashed_key_epochs():
+    ds = RandomSampler(Wrapper(list(range(30))), seed=0)
+    ds = shard(ds, 3, 1, mode="hashed", key=str)
+    first = [item for item in ds]
+    ds.set_epoch(1)
+    second = [item for item in ds]
+
+    assert sorted(first) == sorted(second)
+    assert first != second
+
+
+def test_epochs():
+    def shards(epoch):
+        result = []
+        for i in range(3):
+            ds = RandomSampler(Wrapper(list(range(30))), seed=5)
+            ds = shard(ds, 3, i)
+            ds = ApplyModifier(ds, lambda x: x)
+            ds.set_epoch(epoch)
+            result.append([item for item in ds])
+        return result
+
+    first = shards(0)
+    second = shards(1)
+    assert sorted(sum(first, [])) == list(range(30))
+    assert sorted(sum(second, [])) == list(range(30))
+    assert first != second
+    assert shards(1) == second
+
+
+@pytest.mark.parametrize("mode", ["contiguous", "strided", "hashed"])
+def test_empty(mode):
+    shards = [shard(Wrapper([0, 1]), 4, i, mode=mode) for i in range(4)]
+
+    assert sorted(sum([[item for item in s] for s in shards], [])) == [0, 1]
+    assert any(len(s) == 0 for s in shards)
+    empty = next(s for s in shards if len(s) == 0)
+    assert empty.get_batch([]) == []
+    assert empty.get_meta()[0]["len"] == 0
+
+
+def test_iterator():
+    ds = IteratorWrapper(range(10))
+    ds = shard(ds, 3, 0)
+
+    assert isinstance(ds, IteratorShard)
+    assert [item for item in ds] == [0, 3, 6, 9]
+
+    shards = [
+        [item for item in shard(IteratorWrapper(range(50)), 2, i, mode="hashed")]
+        for i in range(2)
+    ]
+    assert sorted(sum(shards, [])) == list(range(50))
+
+
+def test_wrong_usage():
+    with pytest.raises(ValueError):
+        shard(Wrapper([0, 1]), 2, 2)
+    with pytest.raises(ValueError):
+        shard(Wrapper([0, 1]), 0, 0)
+    with pytest.raises(ValueError):
+        shard(Wrapper([0, 1]), 2, 0, mode="random")
+    with pytest.raises(ValueError):
+        shard(IteratorWrapper([0, 1]), 2, 0, mode="contiguous")
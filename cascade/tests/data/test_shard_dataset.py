@@ -0,0 +1,96 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+from cascade.data import (ApplyModifier, IteratorWrapper, ShardDataset,
+                          ShardWriter, Wrapper)
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_roundtrip(tmp_path, workers):
+    items = [{"x": np.arange(i), "y": str(i)} for i in range(100)]
+    ds = Wrapper(items)
+    writer = ShardWriter(ds, str(tmp_path), shard_size_bytes=1024, workers=workers)
+
+    assert len(writer.get_paths()) > 1
+
+    shards = ShardDataset(str(tmp_path))
+    assert len(shards) == 100
+    for i in [0, 17, 50, 99, -1]:
+        assert shards[i]["y"] == items[i]["y"]
+        assert np.array_equal(shards[i]["x"], items[i]["x"])
+
+    streamed = [item["y"] for item in shards]
+    assert streamed == [item["y"] for item in items]
+
+    with pytest.raises(IndexError):
+        shards[100]
+
+
+def test_iterator_source(tmp_path):
+    ShardWriter(IteratorWrapper(iter(range(10))), str(tmp_path))
+    ds = ShardDataset(str(tmp_path))
+    assert len(ds) == 10
+    assert list(ds) == list(range(10))
+
+
+def test_meta(tmp_path):
+    ds = ApplyModifier(Wrapper([0, 1, 2]), lambda x: x + 1)
+    ShardWriter(ds, str(tmp_path))
+    shards = ShardDataset(str(tmp_path))
+
+    meta = shards.get_meta()
+    assert meta[0]["num_shards"] == 1
+    assert meta[0]["data"][0]["name"] == ds.get_meta()[0]["name"]
+    assert list(shards) == [1, 2, 3]
+
+
+def test_rewrite(tmp_path):
+    ShardWriter(Wrapper(list(range(100))), str(tmp_path), shard_size_bytes=64)
+    ShardWriter(Wrapper([0, 1]), str(tmp_path), shard_size_bytes=64)
+    assert list(ShardDataset(str(tmp_path))) == [0, 1]
+
+
+def test_pickle(tmp_path):
+    ShardWriter(Wrapper(list(range(10))), str(tmp_path), shard_size_bytes=16)
+    ds = ShardDataset(str(tmp_path))
+    assert ds[3] == 3
+
+    ds = pickle.loads(pickle.dumps(ds))
+    assert ds[5] == 5
+    ds.close()
+
+
+def test_errors(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ShardDataset(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        ShardWriter(Wrapper([0]), str(tmp_path), shard_size_bytes=0)
+
+    with open(os.path.join(str(tmp_path), "shard_00000.bin"), "wb") as f:
+        f.write(b"not a shard at all")
+    with pytest.raises(ValueError):
+        ShardDataset(str(tmp_path))
@@ -17,12 +17,13 @@ limitations under the License.
 import os
 import sys
 
+import numpy as np
 import pytest
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(SCRIPT_DIR))
 
-from cascade.data import SimpleDataloader
+from cascade.data import SimpleDataloader, Wrapper
 
 
 @pytest.mark.parametrize(
@@ -62,3 +63,18 @@ def test_illegal(arr, bs):
 def test_larger_than_sequence(arr, bs):
     dl = SimpleDataloader(arr, batch_size=bs)
     assert list(dl) == [arr]
+
+
+def test_get_batch():
+    dl = SimpleDataloader(Wrapper(np.arange(5)), batch_size=2)
+    batches = list(dl)
+    assert all(isinstance(batch, list) for batch in batches)
+    assert batches == [[0, 1], [2, 3], [4]]
+
+    dl = SimpleDataloader(Wrapper(np.arange(5)), batch_size=2, collate="array")
+    batches = list(dl)
+    assert all(isinstance(batch, np.ndarray) for batch in batches)
+    assert [batch.tolist() for batch in batches] == [[0, 1], [2, 3], [4]]
+
+    with pytest.raises(ValueError):
+        SimpleDataloader([0, 1], collate="tensor")
@@ -0,0 +1,157 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+from cascade.data import (IteratorDataset, IteratorWrapper, ibatch, ifilter,
+                          iinterleave, imap, iprefetch, iskip, ishuffle, itake)
+
+
+def _square(x):
+    return x * x
+
+
+class Counter(IteratorDataset):
+    """
+    Unbounded stream that defines only __next__
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._i = -1
+
+    def __next__(self):
+        self._i += 1
+        return self._i
+
+
+@pytest.mark.parametrize("workers, backend", [(None, "thread"), (3, "thread"), (2, "process")])
+def test_imap(workers, backend):
+    ds = imap(IteratorWrapper(range(20)), _square, workers=workers, backend=backend, window=4)
+    assert [item for item in ds] == [i * i for i in range(20)]
+
+
+def test_unbounded():
+    ds = Counter()
+    ds = ifilter(ds, lambda x: x % 2)
+    ds = imap(ds, lambda x: x * 10, workers=2)
+    ds = iskip(ds, 1)
+    ds = ibatch(ds, 2)
+    ds = itake(ds, 3)
+
+    assert [item for item in ds] == [[30, 50], [70, 90], [110, 130]]
+
+    names = [m["name"].split(".")[-1] for m in ds.get_meta()]
+    assert names == [
+        "IteratorSlice",
+        "IteratorBatch",
+        "IteratorSlice",
+        "IteratorMap",
+        "IteratorFilter",
+        "Counter",
+    ]
+
+
+def test_ibatch():
+    ds = IteratorWrapper(range(5))
+    assert [item for item in ibatch(ds, 2, drop_last=True)] == [[0, 1], [2, 3]]
+    assert [item for item in ibatch(ds, 2, collate_fn=sum)] == [1, 5, 4]
+
+    with pytest.raises(ValueError):
+        ibatch(ds, 0)
+
+
+def test_ishuffle():
+    ds = ishuffle(IteratorWrapper(range(100)), 10, seed=0)
+
+    first = [item for item in ds]
+    second = [item for item in ds]
+    assert sorted(first) == list(range(100))
+    assert first != list(range(100))
+    assert first != second
+
+    ds.set_epoch(0)
+    assert [item for item in ds] == first
+
+    # Items cannot move earlier than the buffer allows
+    assert all(item <= i + 10 for i, item in enumerate(first))
+
+
+def test_ishuffle_seed():
+    def run(seed):
+        return [item for item in ishuffle(IteratorWrapper(range(50)), 10, seed=seed)]
+
+    assert run(-1) == run(-1)
+    assert sorted(run(-1)) == list(range(50))
+
+    meta = ishuffle(IteratorWrapper(range(5)), 2, seed=-1).get_meta()[0]
+    assert meta["seed"] == -1
+    assert meta["epoch"] == 0
+
+
+def test_iinterleave():
+    ds = iinterleave([IteratorWrapper("ad"), IteratorWrapper("b"), IteratorWrapper("cef")])
+
+    assert "".join(ds) == "abcdef"
+    assert ds.get_meta()[0]["num_interleaved"] == 3
+
+
+def test_iprefetch():
+    class Slow(IteratorDataset):
+        def __iter__(self):
+            for i in range(5):
+                time.sleep(0.01)
+                yield i
+
+    ds = iprefetch(Slow(), 2)
+    assert [item for item in ds] == list(range(5))
+
+    ds = iprefetch(Counter(), 2)
+    for item in ds:
+        if item == 10:
+            break
+    assert item == 10
+
+
+def test_iprefetch_error():
+    class Broken(IteratorDataset):
+        def __iter__(self):
+            yield 0
+            raise ValueError("Broken stream")
+
+    ds = iprefetch(Broken())
+    with pytest.raises(ValueError):
+        [item for item in ds]
+
+
+def test_iprefetch_thread_stops():
+    before = threading.active_count()
+    ds = iprefetch(Counter(), 1)
+    iterator = iter(ds)
+    next(iterator)
+    iterator.close()
+
+    deadline = time.time() + 5
+    while threading.active_count() > before and time.time() < deadline:
+        time.sleep(0.05)
+    assert threading.active_count() == before
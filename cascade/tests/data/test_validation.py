@@ -16,7 +16,7 @@ limitations under the License.
 
 import os
 import sys
-from typing import Dict, List
+from typing import Any, Dict, List
 
 import pydantic
 import pytest
@@ -25,6 +25,7 @@ MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(MODULE_PATH))
 
 from cascade.data import ValidationError, validate_in
+from cascade.data.validation import SchemaFactory
 
 
 def test_empty_sig():
@@ -152,3 +153,64 @@ def test_custom_types():
     # This will fail since type is checked
     with pytest.raises(ValidationError):
         validate_in(identity)(None)
+
+
+def test_any_is_not_wrapped():
+    def add(a: Any, b):
+        return a + b
+
+    assert validate_in(add) is add
+
+
+def test_schema_is_built_once(monkeypatch):
+    calls = []
+    build = SchemaFactory.build
+
+    def counting_build(*args, **kwargs):
+        calls.append(1)
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(SchemaFactory, "build", counting_build)
+
+    def add_int(a: int, b: int):
+        return a + b
+
+    f = validate_in(add_int)
+    assert not calls
+    for i in range(10):
+        assert f(i, 1) == i + 1
+    assert len(calls) == 1
+
+
+def test_first_n():
+    def identity(a: int):
+        return a
+
+    f = validate_in(first_n=2)(identity)
+    f(0)
+    with pytest.raises(ValidationError):
+        f("a")
+    assert f("a") == "a"
+
+    with pytest.raises(ValueError):
+        validate_in(identity, first_n=-1)
+
+
+def test_sample():
+    def identity(a: int):
+        return a
+
+    f = validate_in(identity, sample=0.5, seed=0)
+    failed = 0
+    for _ in range(100):
+        try:
+            f("a")
+        except ValidationError:
+            failed += 1
+    assert 20 < failed < 80
+
+    f = validate_in(identity, sample=0.0)
+    assert f("a") == "a"
+
+    with pytest.raises(ValueError):
+        validate_in(identity, sample=2)
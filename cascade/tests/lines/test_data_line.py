@@ -139,3 +139,25 @@ def test_load_obj_meta(tmp_path_str, dataset):
 
     meta = line.load_obj_meta(str(version))
     assert meta[0]["test_param"] == 1
+
+
+def test_legacy_hashes(tmp_path_str):
+    ds = ApplyModifier(Wrapper([0, 1, 2]), add1)
+
+    line = DataLine(tmp_path_str)
+    line.save(ds)
+
+    # Emulate the line written with the md5 of str(meta)
+    with open(os.path.join(tmp_path_str, "0.1", "HASHES"), "w") as f:
+        f.write("\n".join(DataLine._get_legacy_hashes(ds.get_meta())))
+
+    line = DataLine(tmp_path_str)
+    assert str(line.get_version(ds)) == "0.1"
+
+    ds.update_meta({"a": 1})
+    line.save(ds)
+    assert str(line.get_version(ds)) == "0.2"
+
+    line.save(ApplyModifier(ds, add1))
+    assert len(line) == 3
+    assert str(line.get_version(ApplyModifier(ds, add1))) == "1.0"
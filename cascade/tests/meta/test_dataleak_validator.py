@@ -25,6 +25,7 @@ sys.path.append(os.path.dirname(MODULE_PATH))
 
 import cascade.data as cdd
 from cascade import meta as cme
+from cascade.lines import DataLine
 
 
 def test_simple_hash():
@@ -63,3 +64,125 @@ def test_empty():
     test_ds = cdd.Wrapper([0, 1, 2, 3])
 
     cme.DataleakValidator(train_ds, test_ds)
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_join(workers):
+    train_ds = cdd.Wrapper(list(range(0, 10000, 2)))
+    test_ds = cdd.Wrapper(list(range(1, 1000, 2)) + [42, 42])
+
+    with pytest.raises(cme.DataValidationException) as e:
+        cme.DataleakValidator(train_ds, test_ds, workers=workers, chunk_size=100)
+    message = str(e.value)
+    assert "2 repeating pairs" in message
+    assert "1 train items and 2 test items" in message
+    assert "Train indices: [21, 21]" in message
+    assert "Test indices: [500, 501]" in message
+
+
+def test_iterators():
+    train_ds = cdd.IteratorWrapper(iter(["a", "b"]))
+    test_ds = cdd.IteratorWrapper(iter(["b", "c"]))
+    with pytest.raises(cme.DataValidationException):
+        cme.DataleakValidator(train_ds, test_ds)
+
+
+def test_bounded_examples():
+    train_ds = cdd.Wrapper([0] * 100)
+    test_ds = cdd.Wrapper([0] * 100)
+    with pytest.raises(cme.DataValidationException) as e:
+        cme.DataleakValidator(train_ds, test_ds, max_examples=10)
+    assert "10000 repeating pairs" in str(e.value)
+    assert "[0, 0, 0, 0, 0, 0, 0, 0, 0, 0]" in str(e.value)
+
+
+calls = []
+
+
+def counting_md5(x):
+    calls.append(x)
+    return cme.numpy_md5(np.asarray(x))
+
+
+def test_index_dir(tmp_path):
+    calls.clear()
+    train_ds = cdd.Wrapper(list(range(10)))
+    cme.DataleakValidator(
+        train_ds, cdd.Wrapper([10, 11]), hash_fn=counting_md5, index_dir=str(tmp_path)
+    )
+    assert len(calls) == 12
+
+    calls.clear()
+    with pytest.raises(cme.DataValidationException):
+        cme.DataleakValidator(
+            train_ds, cdd.Wrapper([5, 12, 13]), hash_fn=counting_md5, index_dir=str(tmp_path)
+        )
+    assert len(calls) == 3
+
+    with pytest.raises(ValueError):
+        cme.DataleakValidator(train_ds, cdd.Wrapper([10]), index_dir=str(tmp_path))
+
+
+def test_index_in_line(tmp_path):
+    calls.clear()
+    line = DataLine(str(tmp_path))
+    train_ds = cdd.Wrapper(list(range(10)))
+    line.save(train_ds, only_meta=True)
+
+    cme.DataleakValidator(train_ds, cdd.Wrapper([10]), hash_fn=counting_md5, index_dir=line)
+    version_dir = os.path.join(str(tmp_path), str(line.get_version(train_ds)))
+    assert any(name.startswith("hashes_") for name in os.listdir(version_dir))
+
+    calls.clear()
+    cme.DataleakValidator(train_ds, cdd.Wrapper([11]), hash_fn=counting_md5, index_dir=line)
+    assert len(calls) == 1
+
+
+def test_index_closures(tmp_path):
+    def make(salt):
+        return lambda x: cme.numpy_md5(np.append(salt, x))
+
+    # Arrays with the same truncated repr
+    a = np.zeros(2000)
+    b = a.copy()
+    b[1000] = 1
+    train_ds = cdd.Wrapper(list(range(10)))
+    cme.DataleakValidator(train_ds, cdd.Wrapper([10]), hash_fn=make(a), index_dir=str(tmp_path))
+    cme.DataleakValidator(train_ds, cdd.Wrapper([10]), hash_fn=make(b), index_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 4
+
+    class Salt:
+        pass
+
+    salt = Salt()
+    with pytest.warns(UserWarning):
+        cme.DataleakValidator(
+            train_ds,
+            cdd.Wrapper([10]),
+            hash_fn=lambda x: cme.numpy_md5(np.asarray([x, id(salt)])),
+            index_dir=str(tmp_path),
+        )
+    assert len(os.listdir(tmp_path)) == 4
+
+
+def test_index_random_order(tmp_path):
+    items = list(range(10))
+    for seed, epoch in [(0, 0), (1, 0), (0, 1), (0, 0)]:
+        train_ds = cdd.RandomSampler(cdd.Wrapper(items), seed=seed)
+        train_ds.set_epoch(epoch)
+        position = [item for item in train_ds].index(3)
+        with pytest.raises(cme.DataValidationException, match=rf"Train indices: \[{position}\]"):
+            cme.DataleakValidator(
+                train_ds, cdd.Wrapper([3]), hash_fn=counting_md5, index_dir=str(tmp_path)
+            )
+    # Three train orders and one test set
+    assert len(os.listdir(tmp_path)) == 4
+
+    with pytest.warns(UserWarning):
+        cme.DataleakValidator(
+            cdd.RandomSampler(cdd.Wrapper(items)),
+            cdd.Wrapper([10, 11]),
+            hash_fn=counting_md5,
+            index_dir=str(tmp_path),
+        )
+    assert len(os.listdir(tmp_path)) == 5
@@ -0,0 +1,99 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import sys
+from dataclasses import dataclass
+from hashlib import md5
+
+import numpy as np
+import pandas as pd
+import pytest
+
+MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(MODULE_PATH))
+
+from cascade.meta import (hash_array, hash_arrays, hash_object, hash_pandas,
+                          numpy_md5)
+
+
+def test_numpy_md5():
+    x = np.arange(20, dtype=np.float32).reshape(4, 5)
+    assert numpy_md5(x) == md5(x.tobytes()).hexdigest()
+    assert numpy_md5(x.T) == md5(x.T.tobytes()).hexdigest()
+
+
+@pytest.mark.parametrize("algorithm", ["blake2b", "md5"])
+def test_hash_array(algorithm):
+    x = np.arange(12, dtype=np.int32)
+    assert hash_array(x, algorithm) == hash_array(x.copy(), algorithm)
+    assert hash_array(x[::2], algorithm) == hash_array(x[::2].copy(), algorithm)
+    assert hash_array(x, algorithm) != hash_array(x.reshape(3, 4), algorithm)
+    assert hash_array(x, algorithm) != hash_array(x.astype(np.int64), algorithm)
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        hash_array(np.zeros(2), "sha1")
+
+
+def test_hash_arrays():
+    rows = np.random.default_rng(0).random((100, 3))
+    hashes = hash_arrays(rows)
+
+    assert hashes.dtype == np.uint64
+    assert len(set(hashes.tolist())) == 100
+    assert (hash_arrays(list(rows)) == hashes).all()
+    assert (hash_arrays(rows, seed=1) != hashes).all()
+
+    mixed = hash_arrays([np.zeros(3), np.zeros(3, dtype=np.int64), np.zeros(5), np.zeros(3)])
+    assert mixed[0] == mixed[3]
+    assert len(set(mixed.tolist())) == 3
+
+    assert len(hash_arrays([])) == 0
+
+
+def test_hash_pandas():
+    df = pd.DataFrame({"a": [1, 2, 1], "b": ["x", "y", "x"]})
+    rows = hash_pandas(df, index=False)
+    assert rows[0] == rows[2]
+    assert rows[0] != rows[1]
+
+    assert hash_object(df) == hash_object(df.copy())
+    assert hash_object(df) != hash_object(df.rename(columns={"a": "c"}))
+
+
+@dataclass
+class Point:
+    x: int
+    y: float
+
+
+def test_hash_object():
+    obj = {"a": [1, 2.0, "3"], "b": {1, 2}, "c": (None, b"bytes"), "d": np.ones(3)}
+    same = {"d": np.ones(3), "c": (None, b"bytes"), "b": {2, 1}, "a": [1, 2.0, "3"]}
+    assert hash_object(obj) == hash_object(same)
+
+    assert len({hash_object(v) for v in [1, 1.0, "1", True, b"1", [1], (1,)]}) == 7
+    assert hash_object(["ab", "c"]) != hash_object(["a", "bc"])
+    assert hash_object(Point(1, 2.0)) == hash_object(Point(1, 2.0))
+    assert hash_object(Point(1, 2.0)) != hash_object({"x": 1, "y": 2.0})
+    assert hash_object(np.array([1, "a"], dtype=object)) == hash_array(
+        np.array([1, "a"], dtype=object)
+    )
+
+    with pytest.raises(TypeError):
+        hash_object(object())
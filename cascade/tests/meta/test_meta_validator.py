@@ -37,3 +37,27 @@ def test_raise(tmp_path_str):
     pipeline_run(Wrapper([1, 2, 3, 4, 5]), tmp_path_str)
     with pytest.raises(DataValidationException):
         pipeline_run(Wrapper([1, 2, 3, 4, 5, 6]), tmp_path_str)
+
+
+def test_fingerprint_skips_diff(tmp_path_str, monkeypatch):
+    pipeline_run(Wrapper([1, 2, 3, 4, 5]), tmp_path_str)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("DeepDiff should not be called")
+
+    monkeypatch.setattr("cascade.meta.meta_validator.DeepDiff", fail)
+    pipeline_run(Wrapper([1, 2, 3, 4, 5]), tmp_path_str)
+
+
+def test_without_fingerprint(tmp_path_str):
+    pipeline_run(Wrapper([1, 2, 3, 4, 5]), tmp_path_str)
+    for name in os.listdir(tmp_path_str):
+        if name.endswith(".fingerprint"):
+            os.remove(os.path.join(tmp_path_str, name))
+
+    v = MetaValidator(Wrapper([1, 2, 3, 4, 5]), root=tmp_path_str)
+    assert v.base_meta[0]["len"] == 5
+    assert any(name.endswith(".fingerprint") for name in os.listdir(tmp_path_str))
+
+    with pytest.raises(DataValidationException):
+        pipeline_run(Wrapper([1, 2, 3, 4, 5, 6]), tmp_path_str)
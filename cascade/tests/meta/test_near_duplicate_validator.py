@@ -0,0 +1,134 @@
+"""
+Copyright 2022-2024 Ilia Moiseev
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(MODULE_PATH))
+
+import cascade.data as cdd
+from cascade import meta as cme
+from cascade.meta.near_duplicate_validator import (MinHasher, SimHasher,
+                                                   band_keys, candidate_pairs,
+                                                   choose_bands)
+
+
+def test_minhash_texts():
+    train_ds = cdd.Wrapper(
+        [
+            "the quick brown fox jumps over the lazy dog",
+            "lorem ipsum dolor sit amet, consectetur adipiscing elit",
+            "completely unrelated sentence about data pipelines",
+        ]
+    )
+    test_ds = cdd.Wrapper(
+        [
+            "a different sentence without any overlap at all",
+            "lorem ipsum dolor sit amet, consectetur adipiscing elit!",
+        ]
+    )
+
+    with pytest.raises(cme.DataValidationException) as e:
+        cme.NearDuplicateValidator(train_ds, test_ds, threshold=0.7)
+    assert "1 similar pairs" in str(e.value)
+    assert "Train indices: [1]" in str(e.value)
+    assert "Test indices: [1]" in str(e.value)
+
+    cme.NearDuplicateValidator(train_ds, cdd.Wrapper(["nothing in common here"]), threshold=0.7)
+
+
+def test_minhash_estimates_jaccard():
+    hasher = MinHasher(num_hashes=256, seed=1)
+    a = set(range(100))
+    b = set(range(50, 150))
+    signatures, valid = hasher([a, b, set()])
+
+    assert valid.tolist() == [True, True, False]
+    similarity = hasher.similarity(signatures[:1], signatures[1:2])[0]
+    assert abs(similarity - 1 / 3) < 0.1
+
+
+def test_simhash_vectors():
+    rng = np.random.default_rng(0)
+    train = rng.standard_normal((500, 16))
+    test = rng.standard_normal((100, 16))
+    test[7] = train[42] * 3 + 0.01 * rng.standard_normal(16)
+
+    with pytest.raises(cme.DataValidationException) as e:
+        cme.NearDuplicateValidator(
+            cdd.Wrapper(train), cdd.Wrapper(test), method="simhash", threshold=0.95
+        )
+    assert "Train indices: [42]" in str(e.value)
+    assert "Test indices: [7]" in str(e.value)
+
+
+def test_iterators_and_features():
+    train_ds = cdd.IteratorWrapper(iter([[1.0, 0.0], [0.0, 1.0]]))
+    test_ds = cdd.IteratorWrapper(iter([[-1.0, 0.1]]))
+    cme.NearDuplicateValidator(
+        train_ds, test_ds, method="simhash", features=np.asarray, threshold=0.9
+    )
+
+
+def test_candidate_pairs():
+    train_keys = np.array([[1, 2], [3, 4], [1, 5]], dtype=np.uint64)
+    test_keys = np.array([[1, 9], [7, 4], [8, 8]], dtype=np.uint64)
+    assert candidate_pairs(train_keys, test_keys).tolist() == [[0, 0], [1, 1], [2, 0]]
+
+
+def test_max_bucket_size():
+    # 20 train and 10 test items share the key in the first band
+    train_keys = np.array([[1, i] for i in range(20)] + [[2, 100]], dtype=np.uint64)
+    test_keys = np.array([[1, 1000 + i] for i in range(10)] + [[2, 200]], dtype=np.uint64)
+    assert len(candidate_pairs(train_keys, test_keys)) == 201
+
+    with pytest.warns(UserWarning, match="1 buckets"):
+        pairs = candidate_pairs(train_keys, test_keys, max_bucket_size=10)
+    assert pairs.tolist() == [[20, 10]]
+
+
+def test_minhash_groups(monkeypatch):
+    sets = [set(range(i, i + 50)) for i in range(5)] + [set()]
+    expected, _ = MinHasher(num_hashes=64)(sets)
+
+    # Forces several groups of hash functions
+    monkeypatch.setattr("cascade.meta.near_duplicate_validator._MAX_HASH_VALUES", 1000)
+    signatures, valid = MinHasher(num_hashes=64)(sets)
+    assert (signatures == expected).all()
+    assert valid.tolist() == [True] * 5 + [False]
+
+
+def test_bands():
+    assert 128 % choose_bands(128, 0.8) == 0
+    assert choose_bands(128, 0.5) > choose_bands(128, 0.9)
+
+    hasher = SimHasher(num_hashes=64)
+    signatures, _ = hasher(np.ones((3, 4)))
+    keys = band_keys(signatures, 8)
+    assert keys.shape == (3, 8)
+    assert (keys[0] == keys[1]).all()
+
+
+def test_errors():
+    ds = cdd.Wrapper(["a"])
+    with pytest.raises(ValueError):
+        cme.NearDuplicateValidator(ds, ds, method="exact")
+    with pytest.raises(ValueError):
+        cme.NearDuplicateValidator(ds, ds, num_hashes=128, bands=3)
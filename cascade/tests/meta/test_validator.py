@@ -17,17 +17,20 @@ limitations under the License.
 import os
 import sys
 
+import numpy as np
 import pytest
 
 MODULE_PATH = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(MODULE_PATH))
 
+from cascade.data import IteratorWrapper, Wrapper
 from cascade.meta import (
     AggregateValidator,
     DataValidationException,
     PredicateValidator,
     Validator,
 )
+from cascade.meta.validator import _FailedItems
 
 
 def test_modifier_interface(number_dataset):
@@ -74,3 +77,60 @@ def test_predicate_list_negative(number_dataset):
                 lambda x: x > float("inf"),
             ],
         )
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_predicate_vectorized(workers):
+    ds = Wrapper(np.arange(1000))
+    PredicateValidator(ds, lambda batch: batch >= 0, vectorized=True, workers=workers)
+
+    with pytest.raises(DataValidationException) as e:
+        PredicateValidator(
+            ds, lambda batch: batch % 100 != 0, vectorized=True, workers=workers, chunk_size=64
+        )
+    assert "10 items" in str(e.value)
+
+
+def test_predicate_workers():
+    ds = Wrapper(list(range(1000)))
+    with pytest.raises(DataValidationException) as e:
+        PredicateValidator(ds, [lambda x: x != 5, lambda x: x < 990], workers=2, chunk_size=10)
+    assert "0: 1 items, e.g. [5]" in str(e.value)
+    assert "1: 10 items" in str(e.value)
+
+
+def test_predicate_max_failures():
+    checked = []
+
+    def check(x):
+        checked.append(x)
+        return False
+
+    with pytest.raises(DataValidationException):
+        PredicateValidator(Wrapper(list(range(1000))), check, max_failures=5, chunk_size=10)
+    assert len(checked) == 10
+
+
+def test_predicate_bounded_examples():
+    failed = _FailedItems(10, np.random.default_rng(0))
+    for start in range(0, 10000, 1000):
+        failed.add(np.arange(start, start + 1000))
+
+    examples = failed.examples()
+    assert failed.count == 10000
+    assert len(examples) == 10
+    assert len(set(examples)) == 10
+    assert max(examples) > 1000
+
+
+def test_predicate_iterator():
+    ds = IteratorWrapper(iter(range(100)))
+    with pytest.raises(DataValidationException) as e:
+        PredicateValidator(ds, lambda x: x != 42, chunk_size=16)
+    assert "[42]" in str(e.value)
+
+
+def test_aggregate_workers(number_dataset):
+    AggregateValidator(number_dataset, [lambda d: len(d) > 0, lambda d: True], workers=2)
+    with pytest.raises(DataValidationException):
+        AggregateValidator(number_dataset, [lambda d: True, lambda d: False], workers=2)
@@ -14,8 +14,10 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import json
 import os
-from typing import Any, Tuple
+from hashlib import blake2b
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
@@ -27,11 +29,28 @@ class TextClassificationFolder(Dataset[T]):
     """
     Dataset to simplify loading of data for text classification.
     Texts of different classes should be placed in different folders.
+
+    Labels are the indices of the class folders sorted by name, so they
+    are the same on every run and on every machine. Before, folders were
+    taken in the order of ``os.listdir``, which is arbitrary, so the labels
+    of an existing dataset may differ from the ones it had before.
+
+    With ``cache_dir`` all texts are packed on the first open
+    into one UTF-8 file with an array of offsets, which is saved in ``cache_dir``
+    and memory-mapped, so that reading an item does not open a file.
+    The data folder itself is not written to. The cache is rebuilt when
+    the modification time of any folder changes, which happens when files
+    are added, removed or renamed, but not when a file is edited in place.
     """
 
     # TODO: can be implemented to be ClassificationFolder and share this functionality with images?
     def __init__(
-        self, path: str, encoding: str = "utf-8", *args: Any, **kwargs: Any
+        self,
+        path: str,
+        encoding: str = "utf-8",
+        *args: Any,
+        cache_dir: Optional[str] = None,
+        **kwargs: Any,
     ) -> None:
         """
         Parameters
@@ -41,29 +60,103 @@ class TextClassificationFolder(Dataset[T]):
             In each folder should be only one class of texts.
         encoding: str, optional
             Encoding that is used to open files.
+        cache_dir: Optional[str], optional
+            The folder where to pack all texts into one memory-mapped file,
+            by default None - texts are read from their files.
+            One folder can keep caches of several datasets
         """
-        super().__init__(*args, *kwargs)
+        super().__init__(*args, **kwargs)
         self._encoding = encoding
         self._root = os.path.abspath(path)
-        folders = os.listdir(self._root)
+        self._cache_dir = os.path.abspath(cache_dir) if cache_dir is not None else None
+
+        folders = self._list_folders()
         self._paths = []
-        self._labels = []
+        labels = []
+        counts = []
         for i, folder in enumerate(folders):
-            files = [name for name in os.listdir(os.path.join(self._root, folder))]
+            files = sorted(os.listdir(os.path.join(self._root, folder)))
             self._paths += [os.path.join(self._root, folder, f) for f in files]
-            self._labels += [i for _ in range(len(files))]
+            labels.append(np.full(len(files), i, dtype=np.int64))
+            counts.append(len(files))
+        self._labels = np.concatenate(labels) if labels else np.zeros(0, dtype=np.int64)
 
-        classes = [
-            (folder, len(os.listdir(os.path.join(self._root, folder))))
-            for folder in folders
-        ]
+        self._blob = None
+        self._offsets = None
+        if self._cache_dir is not None:
+            self._blob, self._offsets = self._open_cache()
+
+        classes = list(zip(folders, counts))
         print(f"Found {len(folders)} classes: {classes}")
 
+    def _list_folders(self) -> List[str]:
+        return sorted(
+            entry.name
+            for entry in os.scandir(self._root)
+            if entry.is_dir() and not entry.name.startswith(".")
+        )
+
+    def _dir_state(self) -> str:
+        folders = self._list_folders()
+        mtimes = [
+            os.stat(os.path.join(self._root, folder)).st_mtime_ns for folder in [""] + folders
+        ]
+        return json.dumps([self._encoding, folders, mtimes])
+
+    def _cache_paths(self) -> Tuple[str, str]:
+        # Caches of different roots can share one folder
+        key = blake2b(self._root.encode("utf-8"), digest_size=8).hexdigest()
+        name = os.path.join(self._cache_dir, f"texts_{key}")
+        return name + ".bin", name + ".npz"
+
+    def _open_cache(self) -> Tuple[np.ndarray, np.ndarray]:
+        blob_path, index_path = self._cache_paths()
+        state = self._dir_state()
+        offsets = None
+        if os.path.exists(blob_path) and os.path.exists(index_path):
+            try:
+                with np.load(index_path, allow_pickle=False) as index:
+                    if str(index["state"]) == state:
+                        offsets = index["offsets"]
+            except Exception:
+                # Broken caches are rebuilt
+                offsets = None
+
+        if offsets is None:
+            offsets = self._build_cache(blob_path, index_path, state)
+
+        if offsets[-1] == 0:
+            return np.zeros(0, dtype=np.uint8), offsets
+        return np.memmap(blob_path, dtype=np.uint8, mode="r"), offsets
+
+    def _build_cache(self, blob_path: str, index_path: str, state: str) -> np.ndarray:
+        os.makedirs(self._cache_dir, exist_ok=True)
+        offsets = np.zeros(len(self._paths) + 1, dtype=np.int64)
+        # Files are written under temporary names first, so that
+        # interrupted runs do not leave partial caches
+        with open(blob_path + ".tmp", "wb") as f:
+            for i, path in enumerate(self._paths):
+                data = self._read(path).encode("utf-8")
+                f.write(data)
+                offsets[i + 1] = offsets[i] + len(data)
+        with open(index_path + ".tmp", "wb") as f:
+            np.savez(f, offsets=offsets, state=state)
+        os.replace(blob_path + ".tmp", blob_path)
+        os.replace(index_path + ".tmp", index_path)
+        return offsets
+
+    def _read(self, path: str) -> str:
+        with open(path, "r", encoding=self._encoding) as f:
+            return " ".join(f.readlines())
+
+    def _get_text(self, index: int) -> str:
+        if self._offsets is None:
+            return self._read(self._paths[index])
+        start, stop = self._offsets[index], self._offsets[index + 1]
+        return self._blob[start:stop].tobytes().decode("utf-8")
+
     def __getitem__(self, index: int) -> Tuple[str, int]:
-        with open(self._paths[index], "r", encoding=self._encoding) as f:
-            text = " ".join(f.readlines())
-            label = self._labels[index]
-        return text, label
+        return self._get_text(index), int(self._labels[index])
 
     def __len__(self) -> int:
         """
@@ -71,6 +164,23 @@ class TextClassificationFolder(Dataset[T]):
         """
         return len(self._paths)
 
+    def get_labels(self) -> np.ndarray:
+        """
+        Returns labels of all items as an array
+        """
+        return self._labels
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Memory map is reopened instead of copying the texts
+        state = self.__dict__.copy()
+        state["_blob"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self._cache_dir is not None:
+            self._blob, self._offsets = self._open_cache()
+
     def get_meta(self) -> Meta:
         meta = super().get_meta()
         meta[0].update(
@@ -79,4 +189,6 @@ class TextClassificationFolder(Dataset[T]):
                 "labels": np.unique(self._labels).tolist(),
             }
         )
+        if self._cache_dir is not None:
+            meta[0]["consolidated"] = True
         return meta
@@ -15,17 +15,17 @@ limitations under the License.
 """
 
 from itertools import cycle
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 from tqdm import trange
 
 from ..base import Meta
 from ..data.dataset import Dataset, T
-from ..data.modifier import Sampler
+from ..data.modifier import IndexSampler
 
 
-class OverSampler(Sampler[T]):
+class OverSampler(IndexSampler[T]):
     """
     Accepts datasets which return tuples of objects and labels in the respected order.
     Isn't lazy - runs through all the items ones to determine key order.
@@ -43,38 +43,35 @@ class OverSampler(Sampler[T]):
     Consider shuffling the dataset after sampling if label order is important.
     """
 
+    _selects_items = True
+
     def __init__(
         self, dataset: Dataset[Tuple[Any, Any]], *args: Any, **kwargs: Any
     ) -> None:
+        indices = self._sample(dataset)
+        print(f"Original length was {len(dataset)} and new is {len(indices)}")
+        super().__init__(dataset, indices, *args, **kwargs)
+
+    @staticmethod
+    def _sample(dataset: Dataset[Tuple[Any, Any]]) -> List[int]:
         labels = [int(dataset[i][1]) for i in trange(len(dataset))]
         ulabels, counts = np.unique(labels, return_counts=True)
         how_much_add = np.max(counts) - counts
 
-        self._add_indices = []
+        indices = list(range(len(dataset)))
         for label_idx, label in enumerate(ulabels):
             k = 0
             for _ in range(how_much_add[label_idx]):
                 while labels[k] != label:
                     k += 1
-                self._add_indices.append(k)
-
-        ln = len(dataset) + len(self._add_indices)
-        print(f"Original length was {len(dataset)} and new is {ln}")
-
-        super().__init__(dataset, num_samples=ln, *args, **kwargs)
-
-    def __getitem__(self, index: int) -> Tuple[Any, Any]:
-        if index < len(self._dataset):
-            return self._dataset[index]
-        else:
-            idx = self._add_indices[index - len(self._dataset)]
-            return self._dataset[idx]
+                indices.append(k)
+        return indices
 
-    def __len__(self) -> int:
-        return len(self._dataset) + len(self._add_indices)
+    def _select(self) -> List[int]:
+        return self._sample(self._dataset)
 
 
-class UnderSampler(Sampler[T]):
+class UnderSampler(IndexSampler[T]):
     """
     Accepts datasets which return tuples of objects and labels.
     Isn't lazy - runs through all the items ones to determine key order.
@@ -92,35 +89,36 @@ class UnderSampler(Sampler[T]):
     Consider shuffling the dataset after sampling if label order is important.
     """
 
+    _selects_items = True
+
     def __init__(
         self, dataset: Dataset[Tuple[Any, Any]], *args: Any, **kwargs: Any
     ) -> None:
+        indices = self._sample(dataset)
+        print(f"Original length was {len(dataset)} and new is {len(indices)}")
+        super().__init__(dataset, indices, *args, **kwargs)
+
+    @staticmethod
+    def _sample(dataset: Dataset[Tuple[Any, Any]]) -> List[int]:
         labels = [int(dataset[i][1]) for i in trange(len(dataset))]
         ulabels, counts = np.unique(labels, return_counts=True)
         min_count = np.min(counts)
 
-        self._rem_indices = []
+        indices = []
         for label in ulabels:
             k = 0
             for _ in range(min_count):
                 while labels[k] != label:
                     k += 1
-                self._rem_indices.append(k)
+                indices.append(k)
                 k += 1
+        return indices
 
-        ln = len(self._rem_indices)
-        print(f"Original length was {len(dataset)} and new is {ln}")
-        super().__init__(dataset, ln, *args, **kwargs)
-
-    def __getitem__(self, index: int) -> Tuple[Any, Any]:
-        idx = self._rem_indices[index]
-        return self._dataset[idx]
-
-    def __len__(self) -> int:
-        return len(self._rem_indices)
+    def _select(self) -> List[int]:
+        return self._sample(self._dataset)
 
 
-class WeighedSampler(Sampler[T]):
+class WeighedSampler(IndexSampler[T]):
     """
     Samples each class certain amount of times.
 
@@ -144,6 +142,8 @@ class WeighedSampler(Sampler[T]):
     cascade.data.RandomSampler
     """
 
+    _selects_items = True
+
     def __init__(
         self,
         dataset: Dataset[Tuple[Any, Any]],
@@ -175,26 +175,29 @@ class WeighedSampler(Sampler[T]):
             if ulabel not in self._partitioning:
                 self._partitioning[ulabel] = count
 
-        self._indices = []
+        indices = self._sample(labels)
+        ln = len(indices)
+        assert ln == sum(
+            partitioning.values()
+        ), "The length should be equal to the sum of partitions - something went wrong"
+        print(f"Original length was {len(dataset)} and new is {ln}")
+        super().__init__(dataset, indices)
+
+    def _sample(self, labels: np.ndarray) -> List[int]:
+        indices = []
         for label in self._partitioning:
             count = 0
             for idx in cycle(np.where(labels == label)[0]):
                 if count >= self._partitioning[label]:
                     break
 
-                self._indices.append(idx)
+                indices.append(idx)
                 count += 1
+        return indices
 
-        ln = len(self._indices)
-        assert ln == sum(
-            partitioning.values()
-        ), "The length should be equal to the sum of partitions - something went wrong"
-        print(f"Original length was {len(dataset)} and new is {ln}")
-        super().__init__(dataset, ln)
-
-    def __getitem__(self, index: int) -> Tuple[Any, Any]:
-        idx = self._indices[index]
-        return self._dataset[idx]
+    def _select(self) -> List[int]:
+        labels = np.asarray([self._dataset[i][1] for i in trange(len(self._dataset))])
+        return self._sample(labels)
 
     def get_meta(self) -> Meta:
         meta = super().get_meta()
@@ -14,7 +14,9 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import asyncio
 import os
+import pickle
 import sys
 
 import cv2
@@ -26,7 +28,9 @@ MODULE_PATH = os.path.dirname(
 )
 sys.path.append(os.path.dirname(MODULE_PATH))
 
+from cascade.data import AsyncDataLoader
 from cascade.utils.vision import FolderImageDataset
+from cascade.utils.vision.folder_image_dataset import _encoded_size
 
 
 @pytest.fixture
@@ -75,3 +79,104 @@ def test_raises(backend, not_image_folder):
 def test_missing_backend(image_folder):
     with pytest.raises(ValueError):
         FolderImageDataset(image_folder, "nonexistingbackend")
+
+
+def test_async(image_folder):
+    ds = FolderImageDataset(image_folder, backend="cv2")
+
+    async def read_all():
+        return [batch async for batch in AsyncDataLoader(ds, batch_size=2)]
+
+    batches = asyncio.run(read_all())
+    assert len(batches) == 1
+    assert [img.shape for img in batches[0]] == [(4, 5, 3), (4, 5, 3)]
+
+
+@pytest.fixture
+def large_image_folder(tmp_path):
+    img = np.random.default_rng(0).integers(0, 255, (64, 96, 3), dtype=np.uint8)
+    for i in range(5):
+        cv2.imwrite(os.path.join(tmp_path, f"{i}.jpg"), img)
+    return tmp_path
+
+
+@pytest.mark.parametrize("backend", ["cv2", "PIL"])
+def test_size(backend, large_image_folder):
+    ds = FolderImageDataset(large_image_folder, backend=backend, size=(20, 10), as_array=True)
+
+    assert ds[0].shape == (10, 20, 3)
+    assert ds[0].dtype == np.uint8
+    assert ds.get_meta()[0]["size"] == [20, 10]
+
+    batch = ds.get_batch([4, 1, 2])
+    assert isinstance(batch, np.ndarray)
+    assert batch.shape == (3, 10, 20, 3)
+
+
+@pytest.mark.parametrize("backend", ["cv2", "PIL"])
+def test_workers(backend, large_image_folder):
+    ds = FolderImageDataset(large_image_folder, backend=backend, as_array=True)
+    expected = [ds[i] for i in range(len(ds))]
+
+    ds = FolderImageDataset(large_image_folder, backend=backend, as_array=True, workers=3)
+    batch = ds.get_batch(range(len(ds)))
+    assert len(batch) == 5
+    assert all((a == b).all() for a, b in zip(batch, expected))
+
+    ds.close()
+    assert ds._executor is None
+    assert len(ds.get_batch([0, 1])) == 2
+    ds.close()
+
+
+@pytest.mark.parametrize("ext", [".jpg", ".png"])
+def test_encoded_size(ext):
+    ok, data = cv2.imencode(ext, np.zeros((48, 80, 3), dtype=np.uint8))
+    assert ok
+    assert _encoded_size(data.ravel()) == (80, 48)
+    assert _encoded_size(np.frombuffer(b"hello", dtype=np.uint8)) is None
+
+
+def test_cv2_reduced(large_image_folder, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("PIL should not be used")
+
+    monkeypatch.setattr("PIL.Image.open", fail)
+    ds = FolderImageDataset(large_image_folder, backend="cv2", size=(24, 16))
+    flag = ds._backend._flag(np.fromfile(ds.get_names()[0], dtype=np.uint8), (24, 16))
+    assert flag == cv2.IMREAD_REDUCED_COLOR_4
+    assert ds[0].shape == (16, 24, 3)
+
+
+def test_cache(large_image_folder, monkeypatch):
+    ds = FolderImageDataset(large_image_folder, backend="cv2", cache_size=2)
+    reads = []
+    read = ds._read
+    monkeypatch.setattr(ds, "_read", lambda index: reads.append(index) or read(index))
+
+    first = ds[0]
+    expected = first.copy()
+    first[:] = 0
+    # Changes of the caller do not get into the cache
+    assert np.array_equal(ds[0], expected)
+    assert reads == [0]
+
+    ds[1]
+    ds[2]
+    ds[0]
+    assert reads == [0, 1, 2, 0]
+
+    ds = FolderImageDataset(large_image_folder, backend="cv2", size=(24, 16), cache_size=4)
+    batch = ds.get_batch([0, 1])
+    expected = batch.copy()
+    ds[0][:] = 0
+    batch[:] = 0
+    assert np.array_equal(ds.get_batch([0, 1]), expected)
+
+    ds = pickle.loads(pickle.dumps(ds))
+    assert np.all(ds[1] == ds[1])
+
+
+def test_get_batch_list(image_folder):
+    ds = FolderImageDataset(image_folder, backend="cv2")
+    assert isinstance(ds.get_batch([0, 1]), list)
@@ -14,14 +14,19 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import asyncio
 import os
+import pickle
 import sys
 
+import numpy as np
+
 MODULE_PATH = os.path.dirname(
     os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 )
 sys.path.append(os.path.dirname(MODULE_PATH))
 
+from cascade.data import AsyncAdapter
 from cascade.utils.nlp import TextClassificationFolder
 
 
@@ -42,3 +47,79 @@ def test_create(tmp_path_str):
 
     assert meta["len"] == 6
     assert len(meta["labels"]) == 3
+
+
+def test_aget(tmp_path_str):
+    for i in range(2):
+        path = os.path.join(tmp_path_str, f"class_{i}")
+        os.mkdir(path)
+        with open(os.path.join(path, "text.txt"), "w") as f:
+            f.write(f"text {i}")
+
+    ds = TextClassificationFolder(tmp_path_str)
+    batch = asyncio.run(AsyncAdapter(ds).aget_batch(range(len(ds))))
+
+    assert sorted(batch) == sorted([ds[i] for i in range(len(ds))])
+
+
+def _make_texts(root, num_classes=3, num_files=4):
+    for i in range(num_classes):
+        path = os.path.join(root, f"class_{i}")
+        os.mkdir(path)
+        for j in range(num_files):
+            with open(os.path.join(path, f"text_{j}.txt"), "w", encoding="utf-8") as f:
+                f.write(f"текст {i} {j}\nline")
+
+
+def test_consolidated(tmp_path_str):
+    root = os.path.join(tmp_path_str, "data")
+    cache_dir = os.path.join(tmp_path_str, "cache")
+    os.mkdir(root)
+    _make_texts(root)
+
+    plain = TextClassificationFolder(root)
+    ds = TextClassificationFolder(root, cache_dir=cache_dir)
+
+    assert len(ds) == 12
+    assert [ds[i] for i in range(len(ds))] == [plain[i] for i in range(len(plain))]
+    assert ds[5] == ("текст 1 1\n line", 1)
+    assert isinstance(ds.get_labels(), np.ndarray)
+    assert ds.get_labels().tolist() == [0] * 4 + [1] * 4 + [2] * 4
+    assert ds.get_meta()[0]["consolidated"]
+    assert "consolidated" not in plain.get_meta()[0]
+    # The data folder is not written to
+    assert sorted(os.listdir(root)) == ["class_0", "class_1", "class_2"]
+    assert len(os.listdir(cache_dir)) == 2
+
+    ds = pickle.loads(pickle.dumps(ds))
+    assert ds[11] == ("текст 2 3\n line", 2)
+
+
+def test_consolidated_invalidation(tmp_path_str):
+    root = os.path.join(tmp_path_str, "data")
+    cache_dir = os.path.join(tmp_path_str, "cache")
+    os.mkdir(root)
+    _make_texts(root, num_classes=2, num_files=2)
+    ds = TextClassificationFolder(root, cache_dir=cache_dir)
+    assert len(ds) == 4
+
+    blob_path = ds._cache_paths()[0]
+    cache_mtime = os.stat(blob_path).st_mtime_ns
+    ds = TextClassificationFolder(root, cache_dir=cache_dir)
+    assert os.stat(blob_path).st_mtime_ns == cache_mtime
+
+    with open(os.path.join(root, "class_1", "new.txt"), "w") as f:
+        f.write("new")
+    ds = TextClassificationFolder(root, cache_dir=cache_dir)
+    assert len(ds) == 5
+    assert ("new", 1) in [ds[i] for i in range(len(ds))]
+
+
+def test_label_order(tmp_path_str):
+    for name in ["b", "c", "a"]:
+        os.mkdir(os.path.join(tmp_path_str, name))
+        with open(os.path.join(tmp_path_str, name, "text.txt"), "w") as f:
+            f.write(name)
+
+    ds = TextClassificationFolder(tmp_path_str)
+    assert [ds[i] for i in range(len(ds))] == [("a", 0), ("b", 1), ("c", 2)]
@@ -24,7 +24,7 @@ MODULE_PATH = os.path.dirname(
 )
 sys.path.append(os.path.dirname(MODULE_PATH))
 
-from cascade.data import Wrapper
+from cascade.data import RandomSampler, Wrapper
 from cascade.utils.samplers import UnderSampler
 
 
@@ -46,3 +46,11 @@ def test(arr, res):
     ds = UnderSampler(ds)
 
     assert res == [ds[i] for i in range(len(ds))]
+
+
+def test_set_epoch():
+    ds = RandomSampler(Wrapper([("a", 0), ("b", 0), ("c", 0), ("d", 1)]), seed=0)
+    ds = UnderSampler(ds)
+    for epoch in range(4):
+        ds.set_epoch(epoch)
+        assert sorted(item[1] for item in ds) == [0, 1]
@@ -14,17 +14,67 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple
 
+import numpy as np
 from typing_extensions import Literal
 
+from ...base import Meta
 from ...data import FolderDataset
 
+Size = Tuple[int, int]
+
 
 class ImageBackend:
-    def read(self, path: str) -> Any:
+    def read(self, path: str, size: Optional[Size] = None) -> Any:
+        """
+        Reads an RGB image. If ``size`` is given as (width, height),
+        the image is resized to it, backends may decode at a reduced
+        resolution to do it faster
+        """
         raise NotImplementedError()
 
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        # Backends keep references to modules, so they are
+        # created again when unpickled, for example in process workers
+        return type(self), ()
+
+
+_JPEG_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _encoded_size(data: np.ndarray) -> Optional[Size]:
+    # Reads (width, height) from the header of encoded PNG or JPEG,
+    # None for other formats or broken headers
+    head = data[:32].tobytes()
+    if head.startswith(b"\x89PNG\r\n\x1a\n") and len(head) >= 24:
+        return int.from_bytes(head[16:20], "big"), int.from_bytes(head[20:24], "big")
+    if not head.startswith(b"\xff\xd8"):
+        return None
+
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Fill bytes before a marker
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            # Markers without a segment
+            i += 2
+            continue
+        if marker in _JPEG_SOF:
+            height = (int(data[i + 5]) << 8) | int(data[i + 6])
+            width = (int(data[i + 7]) << 8) | int(data[i + 8])
+            return width, height
+        i += 2 + ((int(data[i + 2]) << 8) | int(data[i + 3]))
+    return None
+
 
 class CV2Backend(ImageBackend):
     def __init__(self) -> None:
@@ -34,13 +84,38 @@ class CV2Backend(ImageBackend):
         except ImportError as e:
             raise ImportError("cv2 backend requires opencv-python package") from e
         self._cv2 = cv2
+        self._reduced_flags = {
+            2: cv2.IMREAD_REDUCED_COLOR_2,
+            4: cv2.IMREAD_REDUCED_COLOR_4,
+            8: cv2.IMREAD_REDUCED_COLOR_8,
+        }
 
-    def read(self, path: str):
-        img = self._cv2.imread(path)
-        if img is not None:
-            return self._cv2.cvtColor(img, self._cv2.COLOR_BGR2RGB)
-        else:
+    def _flag(self, data: np.ndarray, size: Optional[Size]) -> int:
+        # Largest reduction that keeps the image not smaller than size.
+        # The size of the image is taken from the header of PNG and JPEG
+        if size is None:
+            return self._cv2.IMREAD_COLOR
+        full_size = _encoded_size(data)
+        if full_size is None:
+            return self._cv2.IMREAD_COLOR
+        for factor in (8, 4, 2):
+            if full_size[0] // factor >= size[0] and full_size[1] // factor >= size[1]:
+                return self._reduced_flags[factor]
+        return self._cv2.IMREAD_COLOR
+
+    def read(self, path: str, size: Optional[Size] = None):
+        # The file is read once, the header is parsed from the same bytes
+        try:
+            data = np.fromfile(path, dtype=np.uint8)
+        except OSError as e:
+            raise IOError(f"cv2 failed to read {path}") from e
+        img = self._cv2.imdecode(data, self._flag(data, size)) if len(data) else None
+        if img is None:
             raise IOError(f"cv2 failed to read {path}")
+        img = self._cv2.cvtColor(img, self._cv2.COLOR_BGR2RGB)
+        if size is not None and (img.shape[1], img.shape[0]) != tuple(size):
+            img = self._cv2.resize(img, tuple(size), interpolation=self._cv2.INTER_AREA)
+        return img
 
 
 class PILBackend(ImageBackend):
@@ -49,14 +124,19 @@ class PILBackend(ImageBackend):
         try:
             from PIL import Image
         except ImportError as e:
-            raise ImportError("PIL backend requires opencv-python package") from e
+            raise ImportError("PIL backend requires pillow package") from e
         self._image = Image
 
-    def read(self, path: str):
+    def read(self, path: str, size: Optional[Size] = None):
         try:
             img = self._image.open(path)
+            if size is not None:
+                # Lets JPEG decoder scale down while decoding
+                img.draft("RGB", tuple(size))
             if img.mode != "RGB":
                 img = img.convert("RGB")
+            if size is not None and img.size != tuple(size):
+                img = img.resize(tuple(size), self._image.BILINEAR)
         except Exception as e:
             raise IOError(f"PIL failed to read {path}") from e
         return img
@@ -69,6 +149,15 @@ class FolderImageDataset(FolderDataset):
     invokes opencv imread on image and returns it if it exists.
 
     Supports opencv or pillow backends
+
+    Example
+    -------
+    >>> from cascade.utils.vision import FolderImageDataset
+    >>> ds = FolderImageDataset(
+    ...     "./images", size=(224, 224), as_array=True, workers=8
+    ... )  # doctest: +SKIP
+    >>> ds.get_batch(range(32)).shape  # doctest: +SKIP
+    (32, 224, 224, 3)
     """
 
     def __init__(
@@ -76,6 +165,10 @@ class FolderImageDataset(FolderDataset):
         root: str,
         backend: Literal["cv2", "PIL"] = "PIL",
         *args: Any,
+        size: Optional[Size] = None,
+        as_array: bool = False,
+        workers: Optional[int] = None,
+        cache_size: int = 0,
         **kwargs: Any,
     ) -> None:
         """
@@ -85,6 +178,19 @@ class FolderImageDataset(FolderDataset):
             The folder with images. Should contain image files only
         backend : Literal["cv2", "PIL"], optional
             What library to use to load images, by default "PIL"
+        size : Optional[Tuple[int, int]], optional
+            The (width, height) to resize images to, by default None - original size.
+            JPEG images are decoded at a reduced resolution when it is enough
+        as_array : bool, optional
+            Whether to return uint8 numpy arrays of shape (height, width, 3)
+            instead of PIL images, by default False. cv2 backend always returns arrays
+        workers : Optional[int], optional
+            The number of threads to decode images in ``get_batch``, by default None -
+            decodes in the calling thread. Both libraries release the GIL while decoding
+        cache_size : int, optional
+            The number of decoded images to keep in memory, least recently
+            used images are evicted, by default 0 - no cache. Images
+            from the cache are returned as copies
         """
         super().__init__(root, *args, **kwargs)
 
@@ -95,7 +201,98 @@ class FolderImageDataset(FolderDataset):
         else:
             raise ValueError(f"Only cv2 or PIL backends are supported, got: {backend}")
 
-    def __getitem__(self, index: int):
-        name = self._names[index]
-        img = self._backend.read(name)
+        self._size = tuple(size) if size is not None else None
+        self._as_array = as_array
+        self._workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[int, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _read(self, index: int) -> Any:
+        img = self._backend.read(self._names[index], self._size)
+        if self._as_array and not isinstance(img, np.ndarray):
+            img = np.asarray(img)
+        return img
+
+    def _get(self, index: int) -> Any:
+        # Cached images are shared, they should be copied before
+        # they are returned to the caller
+        if not self._cache_size:
+            return self._read(index)
+
+        index = range(len(self))[index]
+        with self._lock:
+            if index in self._cache:
+                self._cache.move_to_end(index)
+                return self._cache[index]
+
+        img = self._read(index)
+        with self._lock:
+            self._cache[index] = img
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
         return img
+
+    def __getitem__(self, index: int):
+        img = self._get(index)
+        # Changes made by the caller should not get into the cache
+        return img.copy() if self._cache_size else img
+
+    def get_batch(self, indices: Sequence[int]) -> Any:
+        """
+        Decodes images in a thread pool if ``workers`` were given.
+        If ``size`` is given and images are arrays - with the cv2 backend
+        or ``as_array=True`` - returns them stacked into one array
+        of shape (batch, height, width, 3), otherwise returns a list of images
+        """
+        stack = self._size is not None and (
+            self._as_array or isinstance(self._backend, CV2Backend)
+        )
+        # Stacking copies the images anyway
+        get = self._get if stack else self.__getitem__
+        if self._workers and self._workers > 1:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self._workers)
+            images = list(self._executor.map(get, indices))
+        else:
+            images = [get(i) for i in indices]
+
+        if stack and images:
+            return np.stack(images)
+        return images
+
+    def close(self) -> None:
+        """
+        Stops the threads that decode images in ``get_batch``.
+        They are started again when needed
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __del__(self) -> None:
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        state["_lock"] = None
+        state["_cache"] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get_meta(self) -> Meta:
+        meta = super().get_meta()
+        if self._size is not None:
+            meta[0]["size"] = list(self._size)
+        if self._as_array:
+            meta[0]["as_array"] = True
+        return meta